@@ -0,0 +1,202 @@
+# backend/api/http_client.py
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+
+# Status codes worth retrying: rate limited or upstream trouble
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimitExceeded(RuntimeError):
+    """The local quota would make the caller wait longer than allowed."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"NASA API quota exhausted, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket shared by the sync and async paths.
+    `rate` tokens per second are added up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, max_wait: float) -> float:
+        """
+        Take one token and return how long the caller must wait for it.
+        Raises RateLimitExceeded (without taking a token) past max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                raise RateLimitExceeded(wait)
+            self._tokens -= 1
+            return wait
+
+    def drain(self):
+        """Upstream says the quota is used up: start from an empty bucket."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0)
+            self._updated = time.monotonic()
+
+    async def acquire(self, max_wait: float):
+        wait = self._reserve(max_wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, max_wait: float):
+        wait = self._reserve(max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class NasaClient:
+    """
+    Pooled HTTP client for api.nasa.gov.
+
+    - one keep-alive connection pool per process (async and sync)
+    - at most `max_concurrency` requests in flight
+    - token bucket sized to the API key's hourly quota
+    - exponential backoff with jitter on 429/5xx and transport errors,
+      honouring Retry-After
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        rate_per_hour: float,
+        burst: int = 10,
+        max_connections: int = 20,
+        max_concurrency: int = 8,
+        retries: int = 4,
+        backoff: float = 0.5,
+        timeout: float = 15.0,
+        max_wait: float = 30.0,
+    ):
+        self.api_key = api_key
+        self.bucket = TokenBucket(rate_per_hour / 3600.0, min(burst, rate_per_hour))
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = httpx.Timeout(timeout)
+
+        self._sync_client = None
+        self._sync_sem = threading.BoundedSemaphore(max_concurrency)
+        self._async_client = None
+        self._async_sem = None
+        self._loop = None
+        self._init_lock = threading.Lock()
+
+    # ----------------------------
+    # Clients (created lazily, async ones per event loop)
+    # ----------------------------
+    def _sync(self) -> httpx.Client:
+        with self._init_lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(limits=self._limits, timeout=self._timeout)
+            return self._sync_client
+
+    def _async(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._loop is not loop:
+            # AsyncClient and Semaphore are bound to the loop that created them
+            self._async_client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+            self._async_sem = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._async_client
+
+    # ----------------------------
+    # Retry policy
+    # ----------------------------
+    def _delay(self, attempt: int, resp=None):
+        """
+        Seconds to wait before the next attempt, or None to give up now.
+        Raises RateLimitExceeded for a 429 whose Retry-After is past max_wait.
+        """
+        if resp is not None and resp.headers.get("Retry-After"):
+            try:
+                wait = float(resp.headers["Retry-After"])
+            except ValueError:
+                wait = None
+            if wait is not None and wait > self.max_wait:
+                # e.g. hourly quota exhausted: no point holding the request
+                if resp.status_code == 429:
+                    self.bucket.drain()
+                    raise RateLimitExceeded(wait)
+                return None
+            if wait is not None:
+                return wait
+        return min(self.backoff * (2 ** attempt) * (0.5 + random.random()), self.max_wait)
+
+    def _params(self, params):
+        return {"api_key": self.api_key, **(params or {})}
+
+    def _observe(self, resp):
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            self.bucket.drain()
+
+    async def get(self, url: str, params=None, headers=None) -> httpx.Response:
+        """GET with rate limiting, bounded concurrency and retries."""
+        client = self._async()
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire(self.max_wait)
+            try:
+                async with self._async_sem:
+                    resp = await client.get(url, params=self._params(params), headers=headers)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                continue
+
+            self._observe(resp)
+            delay = self._delay(attempt, resp)
+            if resp.status_code not in RETRY_STATUS or attempt == self.retries or delay is None:
+                return resp
+            await asyncio.sleep(delay)
+        return resp
+
+    def get_sync(self, url: str, params=None, headers=None) -> httpx.Response:
+        """Blocking counterpart of get() for code that is not async."""
+        client = self._sync()
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire_sync(self.max_wait)
+            try:
+                with self._sync_sem:
+                    resp = client.get(url, params=self._params(params), headers=headers)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            self._observe(resp)
+            delay = self._delay(attempt, resp)
+            if resp.status_code not in RETRY_STATUS or attempt == self.retries or delay is None:
+                return resp
+            time.sleep(delay)
+        return resp
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        with self._init_lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
@@ -1,15 +1,87 @@
 # backend/api/nasa_api.py
-import requests
-import os
-from backend.config import NASA_API_KEY, BASE_URL
+from backend.config import (
+    NASA_API_KEY,
+    BASE_URL,
+    CACHE_DIR,
+    NEO_CACHE_TTL,
+    NEO_CACHE_STALE_TTL,
+    NEO_CACHE_SIZE,
+    NASA_RATE_LIMIT_PER_HOUR,
+    NASA_MAX_CONCURRENCY,
+)
+from backend.api.http_client import NasaClient
+from backend.api.neo_cache import NeoCache
+
+BROWSE_URL = f"{BASE_URL}/browse"
+
+# Shared, pooled client for every call to api.nasa.gov
+nasa_client = NasaClient(
+    NASA_API_KEY,
+    rate_per_hour=NASA_RATE_LIMIT_PER_HOUR,
+    max_concurrency=NASA_MAX_CONCURRENCY,
+)
+
+
+def _conditional_headers(etag, last_modified):
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _cache_result(resp, etag, last_modified):
+    """(json or None if not modified, etag, last_modified) for NeoCache."""
+    if resp.status_code == 304:
+        return None, etag, last_modified
+    resp.raise_for_status()
+    return resp.json(), resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+
+def _fetch_neo_upstream(asteroid_id: str, etag=None, last_modified=None):
+    """Conditional GET of one NEO from NeoWs."""
+    resp = nasa_client.get_sync(
+        f"{BASE_URL}/{asteroid_id}", headers=_conditional_headers(etag, last_modified)
+    )
+    return _cache_result(resp, etag, last_modified)
+
+
+async def _afetch_neo_upstream(asteroid_id: str, etag=None, last_modified=None):
+    """Async conditional GET of one NEO from NeoWs."""
+    resp = await nasa_client.get(
+        f"{BASE_URL}/{asteroid_id}", headers=_conditional_headers(etag, last_modified)
+    )
+    return _cache_result(resp, etag, last_modified)
+
+
+neo_cache = NeoCache(
+    _fetch_neo_upstream,
+    afetch=_afetch_neo_upstream,
+    db_path=CACHE_DIR / "neo_cache.sqlite",
+    ttl=NEO_CACHE_TTL,
+    stale_ttl=NEO_CACHE_STALE_TTL,
+    maxsize=NEO_CACHE_SIZE,
+)
+
 
 def fetch_neo_by_id(asteroid_id: str):
     """
     Lookup a specific asteroid by its NASA SPK-ID.
     Returns JSON response with orbital and physical data.
+    Served from neo_cache when possible.
     """
-    url = f"{BASE_URL}/{asteroid_id}?api_key={NASA_API_KEY}"
-    resp = requests.get(url)
+    return neo_cache.get(str(asteroid_id))
+
+
+async def afetch_neo_by_id(asteroid_id: str):
+    """Async fetch_neo_by_id for the FastAPI endpoints."""
+    return await neo_cache.aget(str(asteroid_id))
+
+
+async def abrowse_neos(page: int = 0, page_size: int = 20):
+    """One page of the NeoWs browse feed (page_size max 20 upstream)."""
+    resp = await nasa_client.get(BROWSE_URL, params={"page": page, "size": page_size})
     resp.raise_for_status()
     return resp.json()
 
@@ -0,0 +1,291 @@
+# backend/api/neo_cache.py
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class NeoCache:
+    """
+    Two-level cache for NeoWs responses: in-process LRU in front of a
+    SQLite store that survives restarts and is shared by worker processes.
+
+    - entries are fresh for `ttl` seconds
+    - for `stale_ttl` seconds after that they are still served while a
+      background refresh runs (stale-while-revalidate)
+    - refreshes are conditional (If-None-Match / If-Modified-Since)
+    - concurrent misses for the same key share one upstream fetch
+
+    `fetch(key, etag, last_modified)` must return
+    (payload or None if not modified, etag, last_modified); `afetch` is
+    the same as a coroutine and backs the async `aget()` path.
+    """
+
+    def __init__(self, fetch, afetch=None, db_path=None, ttl=6 * 3600, stale_ttl=7 * 24 * 3600, maxsize=512):
+        self.fetch = fetch
+        self.afetch = afetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+
+        self._mem = OrderedDict()  # key -> entry dict
+        self._inflight = {}        # key -> Future
+        self._ainflight = {}       # key -> asyncio.Future
+        self._tasks = set()        # background refresh tasks
+        self._lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "coalesced": 0,
+            "upstream_fetches": 0,
+            "not_modified": 0,
+        }
+
+        self.db_path = db_path
+        self._db = None  # opened on first use
+        self._db_lock = threading.Lock()
+
+    # ----------------------------
+    # Storage tiers
+    # ----------------------------
+    def _mem_get(self, key):
+        entry = self._mem.get(key)
+        if entry is not None:
+            self._mem.move_to_end(key)
+        return entry
+
+    def _mem_put(self, key, entry):
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def _connect(self):
+        """Open the SQLite tier (caller holds _db_lock)."""
+        if self._db is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, payload TEXT NOT NULL, etag TEXT,"
+                " last_modified TEXT, fetched_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key):
+        if self.db_path is None:
+            return None
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT payload, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"value": json.loads(row[0]), "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def _disk_put(self, key, entry):
+        if self.db_path is None:
+            return
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(entry["value"]), entry["etag"], entry["last_modified"], entry["fetched_at"]),
+            )
+            db.commit()
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def _lookup(self, key):
+        """Entry for key from memory, then disk, or None."""
+        entry = self._mem_lookup(key)
+        if entry is None:
+            entry = self._disk_lookup(key)
+        return entry
+
+    def _mem_lookup(self, key):
+        with self._lock:
+            entry = self._mem_get(key)
+            if entry is not None:
+                self.stats["memory_hits"] += 1
+            return entry
+
+    def _disk_lookup(self, key):
+        entry = self._disk_get(key)
+        if entry is not None:
+            with self._lock:
+                self.stats["disk_hits"] += 1
+                self._mem_put(key, entry)
+        return entry
+
+    def _freshness(self, entry) -> str:
+        if entry is None:
+            return "missing"
+        age = time.time() - entry["fetched_at"]
+        if age < self.ttl:
+            return "fresh"
+        if age < self.ttl + self.stale_ttl:
+            with self._lock:
+                self.stats["stale_served"] += 1
+            return "stale"
+        return "expired"
+
+    def get(self, key: str):
+        """Return the cached payload for key, fetching upstream if needed."""
+        entry = self._lookup(key)
+        state = self._freshness(entry)
+        if state == "fresh":
+            return entry["value"]
+        if state == "stale":
+            self._refresh_in_background(key, entry)
+            return entry["value"]
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return self._coalesced_fetch(key, entry).result()
+
+    async def aget(self, key: str):
+        """Async get(): upstream fetches go through `afetch`, SQLite runs off the event loop."""
+        entry = self._mem_lookup(key)
+        if entry is None and self.db_path is not None:
+            entry = await asyncio.to_thread(self._disk_lookup, key)
+        state = self._freshness(entry)
+        if state == "fresh":
+            return entry["value"]
+        if state == "stale":
+            if key not in self._ainflight:
+                task = asyncio.create_task(self._aquiet_refresh(key, entry))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry["value"]
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return await self._acoalesced_fetch(key, entry)
+
+    async def _acoalesced_fetch(self, key, entry):
+        fut = self._ainflight.get(key)
+        if fut is not None:
+            with self._lock:
+                self.stats["coalesced"] += 1
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._ainflight[key] = fut
+        try:
+            payload, etag, last_modified = await self.afetch(key, *self._validators(entry))
+            new_entry = self._remember(key, entry, payload, etag, last_modified)
+            if self.db_path is not None:
+                await asyncio.to_thread(self._disk_put, key, new_entry)
+            fut.set_result(new_entry["value"])
+            return new_entry["value"]
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._ainflight.pop(key, None)
+
+    async def _aquiet_refresh(self, key, entry):
+        try:
+            await self._acoalesced_fetch(key, entry)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key} failed: {e}")
+
+    def _coalesced_fetch(self, key, entry) -> Future:
+        """Start an upstream fetch for key, or join the one already running."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.stats["coalesced"] += 1
+                return fut
+            fut = Future()
+            self._inflight[key] = fut
+
+        try:
+            fut.set_result(self._fetch_and_store(key, entry))
+        except BaseException as e:
+            fut.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return fut
+
+    def _refresh_in_background(self, key, entry):
+        with self._lock:
+            if key in self._inflight:
+                return
+        t = threading.Thread(target=self._quiet_refresh, args=(key, entry), daemon=True)
+        t.start()
+
+    def _quiet_refresh(self, key, entry):
+        fut = self._coalesced_fetch(key, entry)
+        if fut.exception() is not None:
+            # keep serving the stale copy; next request retries
+            logger.warning(f"Background refresh of {key} failed: {fut.exception()}")
+
+    def _validators(self, entry):
+        if entry is None:
+            return None, None
+        return entry["etag"], entry["last_modified"]
+
+    def _fetch_and_store(self, key, entry):
+        payload, etag, last_modified = self.fetch(key, *self._validators(entry))
+        return self._store(key, entry, payload, etag, last_modified)
+
+    def _store(self, key, entry, payload, etag, last_modified):
+        new_entry = self._remember(key, entry, payload, etag, last_modified)
+        self._disk_put(key, new_entry)
+        return new_entry["value"]
+
+    def _remember(self, key, entry, payload, etag, last_modified) -> dict:
+        """New entry for a fetch result, kept in memory (not yet on disk)."""
+        with self._lock:
+            self.stats["upstream_fetches"] += 1
+        if payload is None:
+            # 304 Not Modified: keep the payload, restart its TTL
+            with self._lock:
+                self.stats["not_modified"] += 1
+            payload = entry["value"]
+
+        new_entry = {
+            "value": payload,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        with self._lock:
+            self._mem_put(key, new_entry)
+        return new_entry
+
+    # ----------------------------
+    # Maintenance
+    # ----------------------------
+    def forget(self, key: str):
+        """Drop key from this process's memory tier only (the disk tier is shared)."""
+        with self._lock:
+            self._mem.pop(key, None)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._mem.pop(key, None)
+        if self.db_path is not None:
+            with self._db_lock:
+                db = self._connect()
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                db.commit()
+
+    def info(self) -> dict:
+        with self._lock:
+            return {**self.stats, "memory_size": len(self._mem), "maxsize": self.maxsize}
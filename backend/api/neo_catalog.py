@@ -0,0 +1,651 @@
+# backend/api/neo_catalog.py
+"""
+Local NEO catalog filled from the NeoWs browse feed.
+
+    python -m backend.api.neo_catalog [--pages N] [--concurrency 4] [--restart]
+
+    python -m backend.api.neo_catalog --refresh [--ids 2099942,3542519]
+
+Pages are fetched concurrently through the shared NasaClient and each page
+is committed together with its "done" marker, so an interrupted ingest
+resumes from the pages that are still missing.
+
+A refresh re-reads the feed (or just the given ids) and only touches what
+changed. Each NEO row carries the element-set hash the propagator uses and
+the record version the result store keys on. A full refresh still fetches
+every browse page, so its cost grows with the catalog size. Pages whose
+content digest is unchanged are skipped without being parsed, but they are
+still downloaded. --ids is the incremental path: it costs one request per
+given NEO. Records whose hashes still match are not rewritten. For the
+rest, the dependent caches are dropped: the NEO lookup cache entry, cached
+ephemerides and memoized orbits of the old element set, and stored
+simulation results. Each refresh's diff is kept in the refresh_log table.
+
+Other processes (the API and its simulation workers) learn about a
+refresh through the invalidations table. Every refresh appends a row with
+a new generation number. get_neo() and aget_neo() compare the latest
+generation with the last one they applied. If there are newer rows, they
+first drop this process's in-memory copies of the changed records. These
+two functions are the single record source for every simulation path:
+the catalog first, then NeoWs through neo_cache.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from backend.config import BASE_URL, NEO_CATALOG_PATH
+from backend.api.http_client import RateLimitExceeded
+from backend.api.nasa_api import (
+    BROWSE_URL, afetch_neo_by_id, extract_key_fields, fetch_neo_by_id, nasa_client, neo_cache,
+)
+from backend.memo import discard_memos
+from backend.result_store import record_version, result_store
+from backend.simulation.ephemeris import element_set_hash, invalidate_ephemerides
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20  # NeoWs browse maximum
+
+# Orbital elements stored as typed columns (raw strings stay in orbital_data)
+ELEMENT_COLUMNS = [
+    "semi_major_axis",
+    "eccentricity",
+    "inclination",
+    "ascending_node_longitude",
+    "perihelion_argument",
+    "mean_anomaly",
+    "epoch_osculation",
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS neos (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    diameter_km REAL,
+    diameter_min_km REAL,
+    hazardous INTEGER,
+    {", ".join(f"{c} REAL" for c in ELEMENT_COLUMNS)},
+    orbit_determination_date TEXT,
+    element_hash TEXT,
+    record_version TEXT,
+    orbital_data TEXT,
+    close_approach TEXT,
+    raw TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS neos_name ON neos(name);
+CREATE INDEX IF NOT EXISTS neos_diameter ON neos(diameter_km);
+CREATE INDEX IF NOT EXISTS neos_hazardous ON neos(hazardous);
+CREATE TABLE IF NOT EXISTS ingest_pages (
+    page INTEGER PRIMARY KEY,
+    count INTEGER,
+    fetched_at REAL,
+    digest TEXT,
+    ids TEXT
+);
+CREATE TABLE IF NOT EXISTS ingest_meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS refresh_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL,
+    finished_at REAL,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS invalidations (
+    generation INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL,
+    asteroid_ids TEXT,
+    element_hashes TEXT
+);
+"""
+
+# Columns added after the first release, for catalogs created before them
+MIGRATIONS = {
+    "neos": [("element_hash", "TEXT"), ("record_version", "TEXT")],
+    "ingest_pages": [("digest", "TEXT"), ("ids", "TEXT")],
+}
+
+SUMMARY_COLUMNS = ["id", "name", "diameter_km", "diameter_min_km", "hazardous"] + ELEMENT_COLUMNS
+
+# Column layout of the Parquet / Arrow export (see backend/columnar.py)
+EXPORT_COLUMNS = [
+    ("id", "string"),
+    ("name", "string"),
+    ("diameter_km", "float64"),
+    ("diameter_min_km", "float64"),
+    ("hazardous", "bool_"),
+] + [(c, "float64") for c in ELEMENT_COLUMNS] + [
+    ("orbit_determination_date", "string"),
+    ("element_hash", "string"),
+    ("record_version", "string"),
+    ("close_approach", "string"),  # JSON list, as stored
+    ("updated_at", "float64"),
+]
+
+
+_initialized = set()  # catalog paths whose schema this process has set up
+_init_lock = threading.Lock()
+_readers = threading.local()  # per-thread read connections, by path
+_applied = {}  # catalog path -> last invalidation generation applied in this process
+_applied_lock = threading.Lock()
+
+
+def connect(db_path: Path = NEO_CATALOG_PATH) -> sqlite3.Connection:
+    """New connection; the schema and migrations run once per catalog per process."""
+    with _init_lock:
+        if db_path not in _initialized:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            for table, columns in MIGRATIONS.items():
+                have = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+                for name, kind in columns:
+                    if name not in have:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+            conn.commit()
+            _initialized.add(db_path)
+            return conn
+    return sqlite3.connect(str(db_path), timeout=30)
+
+
+def _reader(db_path: Path) -> sqlite3.Connection:
+    """This thread's long-lived connection for the serving queries below."""
+    conns = getattr(_readers, "conns", None)
+    if conns is None:
+        conns = _readers.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = conns[db_path] = connect(db_path)
+    return conn
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_neo(neo_json: dict) -> dict:
+    """One catalog row: extract_key_fields() plus the typed orbital elements."""
+    key = extract_key_fields(neo_json)
+    orbital = key["orbital_data"] or {}
+    row = {
+        "id": str(key["id"]),
+        "name": key["name"],
+        "diameter_km": _to_float(key["diameter_km"]),
+        "diameter_min_km": _to_float(
+            neo_json["estimated_diameter"]["kilometers"].get("estimated_diameter_min")
+        ),
+        "hazardous": int(bool(neo_json.get("is_potentially_hazardous_asteroid"))),
+        "orbit_determination_date": orbital.get("orbit_determination_date"),
+        "element_hash": element_set_hash(orbital),
+        "record_version": record_version(key),
+        "orbital_data": json.dumps(orbital),
+        "close_approach": json.dumps(key["close_approach"]),
+        "raw": json.dumps(neo_json),
+        "updated_at": time.time(),
+    }
+    for c in ELEMENT_COLUMNS:
+        row[c] = _to_float(orbital.get(c))
+    return row
+
+
+def upsert_neos(conn: sqlite3.Connection, rows: list):
+    if not rows:
+        return
+    cols = list(rows[0])
+    conn.executemany(
+        f"INSERT OR REPLACE INTO neos ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+        [tuple(r[c] for c in cols) for r in rows],
+    )
+
+
+# ----------------------------
+# Ingest
+# ----------------------------
+async def _fetch_page(page: int) -> dict:
+    while True:
+        try:
+            resp = await nasa_client.get(BROWSE_URL, params={"page": page, "size": PAGE_SIZE})
+        except RateLimitExceeded as e:
+            # Bulk ingest can afford to wait for the quota to refill
+            await asyncio.sleep(e.retry_after)
+            continue
+        resp.raise_for_status()
+        return resp.json()
+
+
+def _page_digest(neos: list) -> str:
+    return hashlib.sha256(json.dumps(neos, sort_keys=True).encode()).hexdigest()
+
+
+def _mark_page(conn: sqlite3.Connection, page: int, neos: list):
+    conn.execute(
+        "INSERT OR REPLACE INTO ingest_pages (page, count, fetched_at, digest, ids) VALUES (?, ?, ?, ?, ?)",
+        (page, len(neos), time.time(), _page_digest(neos), json.dumps([str(n.get("id")) for n in neos])),
+    )
+
+
+def _store_page(conn: sqlite3.Connection, page: int, data: dict):
+    neos = data.get("near_earth_objects", [])
+    rows = [normalize_neo(n) for n in neos]
+    with conn:
+        upsert_neos(conn, rows)
+        _mark_page(conn, page, neos)
+    return len(rows)
+
+
+async def ingest_catalog(
+    db_path: Path = NEO_CATALOG_PATH,
+    concurrency: int = 4,
+    max_pages: int = None,
+    restart: bool = False,
+) -> dict:
+    """
+    Fetch the browse feed into the catalog, skipping pages already stored.
+    Returns a summary of what this run did.
+    """
+    conn = connect(db_path)
+    if restart:
+        with conn:
+            conn.execute("DELETE FROM ingest_pages")
+            conn.execute("DELETE FROM ingest_meta")
+
+    # Page 0 tells us how many pages there are
+    first = await _fetch_page(0)
+    total_pages = int(first["page"]["total_pages"])
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO ingest_meta VALUES ('total_pages', ?)", (str(total_pages),))
+        conn.execute(
+            "INSERT OR REPLACE INTO ingest_meta VALUES ('total_elements', ?)",
+            (str(first["page"]["total_elements"]),),
+        )
+    stored = _store_page(conn, 0, first)
+
+    done = {r[0] for r in conn.execute("SELECT page FROM ingest_pages")}
+    todo = [p for p in range(total_pages) if p not in done]
+    if max_pages is not None:
+        todo = todo[:max_pages]
+    print(f"Catalog: {len(done)}/{total_pages} pages present, fetching {len(todo)}")
+
+    queue = asyncio.Queue()
+    for p in todo:
+        queue.put_nowait(p)
+    failed = []
+
+    async def worker():
+        nonlocal stored
+        while not queue.empty():
+            page = queue.get_nowait()
+            try:
+                stored += _store_page(conn, page, await _fetch_page(page))
+            except Exception as e:
+                # Left unmarked, so the next run picks it up again
+                failed.append(page)
+                logger.warning(f"Page {page} failed: {e}")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    remaining = total_pages - conn.execute("SELECT COUNT(*) FROM ingest_pages").fetchone()[0]
+    conn.close()
+    return {
+        "pages_fetched": len(todo) - len(failed),
+        "pages_failed": failed,
+        "pages_remaining": remaining,
+        "records_stored": stored,
+    }
+
+
+# ----------------------------
+# Refresh
+# ----------------------------
+async def _fetch_neo(asteroid_id: str):
+    """NeoWs lookup record for asteroid_id, or None if NeoWs no longer has it."""
+    while True:
+        try:
+            resp = await nasa_client.get(f"{BASE_URL}/{asteroid_id}")
+        except RateLimitExceeded as e:
+            await asyncio.sleep(e.retry_after)
+            continue
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return resp.json()
+
+
+def _stored_versions(conn: sqlite3.Connection, ids) -> dict:
+    """id -> stored hashes, determination date and name, for those of ids in the catalog."""
+    ids = list(ids)
+    out = {}
+    for lo in range(0, len(ids), 500):
+        chunk = ids[lo:lo + 500]
+        rows = conn.execute(
+            "SELECT id, element_hash, record_version, orbit_determination_date, name, raw FROM neos "
+            f"WHERE id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        )
+        for rid, el_hash, rec_ver, determined, name, raw in rows:
+            legacy = el_hash is None or rec_ver is None
+            if legacy:
+                # Stored before the hashes were: derive them from the raw record
+                key = extract_key_fields(json.loads(raw))
+                el_hash, rec_ver = element_set_hash(key["orbital_data"] or {}), record_version(key)
+            out[rid] = {"element_hash": el_hash, "record_version": rec_ver,
+                        "orbit_determination_date": determined, "name": name, "legacy": legacy}
+    return out
+
+
+def _apply_changes(conn: sqlite3.Connection, neos: list, diff: dict, stale_hashes: set):
+    """Diff NeoWs records against the catalog and write only the ones that changed."""
+    rows = [normalize_neo(n) for n in neos]
+    old = _stored_versions(conn, [r["id"] for r in rows])
+    changed, backfill = [], []
+    for row in rows:
+        prev = old.get(row["id"])
+        if prev is None:
+            diff["added"].append(row["id"])
+        elif prev["element_hash"] != row["element_hash"]:
+            diff["orbit_changed"].append({
+                "id": row["id"],
+                "name": row["name"],
+                "old_determination": prev["orbit_determination_date"],
+                "new_determination": row["orbit_determination_date"],
+                "old_element_hash": prev["element_hash"],
+                "new_element_hash": row["element_hash"],
+            })
+            stale_hashes.add(prev["element_hash"])
+        elif prev["record_version"] != row["record_version"]:
+            diff["updated"].append(row["id"])
+        else:
+            diff["unchanged"] += 1
+            if prev["legacy"]:
+                backfill.append((row["element_hash"], row["record_version"], row["id"]))
+            continue
+        changed.append(row)
+    with conn:
+        upsert_neos(conn, changed)
+        conn.executemany("UPDATE neos SET element_hash = ?, record_version = ? WHERE id = ?", backfill)
+
+
+def _remove(conn: sqlite3.Connection, ids, diff: dict, stale_hashes: set):
+    old = _stored_versions(conn, ids)
+    with conn:
+        conn.executemany("DELETE FROM neos WHERE id = ?", [(i,) for i in old])
+    diff["removed"].extend(old)
+    stale_hashes.update(v["element_hash"] for v in old.values())
+
+
+def invalidate_dependents(asteroid_ids, element_hashes) -> dict:
+    """
+    Drop what was derived from the old records: NEO lookup cache entries and
+    stored results of asteroid_ids, and the ephemerides and memoized orbits
+    of element_hashes. Returns how much was removed.
+    """
+    for asteroid_id in asteroid_ids:
+        neo_cache.invalidate(str(asteroid_id))
+    return {
+        "neo_cache": len(asteroid_ids),
+        "results": sum(result_store.invalidate_asteroid(i) for i in asteroid_ids),
+        "ephemeris_files": invalidate_ephemerides(element_hashes),
+        "memo_entries": discard_memos(element_hashes),
+    }
+
+
+async def _refresh_ids(conn, ids, concurrency: int, diff: dict, stale_hashes: set):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(asteroid_id):
+        async with limit:
+            try:
+                return asteroid_id, await _fetch_neo(asteroid_id)
+            except Exception as e:
+                diff["failed"].append(asteroid_id)
+                logger.warning(f"{asteroid_id} failed: {e}")
+                return asteroid_id, False
+
+    results = await asyncio.gather(*(one(str(i)) for i in ids))
+    _apply_changes(conn, [neo for _, neo in results if neo], diff, stale_hashes)
+    _remove(conn, [i for i, neo in results if neo is None], diff, stale_hashes)
+
+
+async def _refresh_pages(conn, concurrency: int, max_pages: int, diff: dict, stale_hashes: set):
+    first = await _fetch_page(0)
+    total_pages = int(first["page"]["total_pages"])
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO ingest_meta VALUES ('total_pages', ?)", (str(total_pages),))
+        conn.execute(
+            "INSERT OR REPLACE INTO ingest_meta VALUES ('total_elements', ?)",
+            (str(first["page"]["total_elements"]),),
+        )
+    known = {r[0]: (r[1], r[2]) for r in conn.execute("SELECT page, digest, ids FROM ingest_pages")}
+    pages = list(range(total_pages))[:max_pages]
+    seen = set()
+
+    def handle(page: int, data: dict):
+        neos = data.get("near_earth_objects", [])
+        digest, ids = known.get(page, (None, None))
+        if digest is not None and digest == _page_digest(neos):
+            # Same content as last time: nothing on this page changed
+            diff["pages_unchanged"] += 1
+            seen.update(json.loads(ids))
+            return
+        diff["pages_changed"] += 1
+        seen.update(str(n.get("id")) for n in neos)
+        _apply_changes(conn, neos, diff, stale_hashes)
+        with conn:
+            _mark_page(conn, page, neos)
+
+    handle(0, first)
+    queue = asyncio.Queue()
+    for p in pages[1:]:
+        queue.put_nowait(p)
+
+    async def worker():
+        while not queue.empty():
+            page = queue.get_nowait()
+            try:
+                handle(page, await _fetch_page(page))
+            except Exception as e:
+                diff["failed"].append(page)
+                logger.warning(f"Page {page} failed: {e}")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    # Only a complete walk can tell that an object is gone from the feed
+    if len(pages) == total_pages and not diff["failed"]:
+        stored = {r[0] for r in conn.execute("SELECT id FROM neos")}
+        _remove(conn, stored - seen, diff, stale_hashes)
+        with conn:
+            conn.execute("DELETE FROM ingest_pages WHERE page >= ?", (total_pages,))
+
+
+async def refresh_catalog(
+    db_path: Path = NEO_CATALOG_PATH,
+    concurrency: int = 4,
+    ids: list = None,
+    max_pages: int = None,
+) -> dict:
+    """
+    Bring the catalog up to date, writing only changed records and dropping
+    only the caches derived from them. With ids just those NEOs are looked
+    up; otherwise the browse feed is walked. Returns the diff of this
+    refresh, which is also appended to refresh_log.
+    """
+    started = time.time()
+    diff = {
+        "mode": "ids" if ids else "browse",
+        "added": [],
+        "orbit_changed": [],
+        "updated": [],
+        "removed": [],
+        "unchanged": 0,
+        "pages_changed": 0,
+        "pages_unchanged": 0,
+        "failed": [],
+    }
+    stale_hashes = set()
+    conn = connect(db_path)
+    try:
+        if ids:
+            await _refresh_ids(conn, ids, concurrency, diff, stale_hashes)
+        else:
+            await _refresh_pages(conn, concurrency, max_pages, diff, stale_hashes)
+        stale_ids = [c["id"] for c in diff["orbit_changed"]] + diff["updated"] + diff["removed"]
+        diff["invalidated"] = invalidate_dependents(stale_ids, stale_hashes)
+        diff["elapsed_s"] = round(time.time() - started, 3)
+        with conn:
+            conn.execute(
+                "INSERT INTO refresh_log (started_at, finished_at, summary) VALUES (?, ?, ?)",
+                (started, time.time(), json.dumps(diff)),
+            )
+            if stale_ids or stale_hashes:
+                conn.execute(
+                    "INSERT INTO invalidations (created_at, asteroid_ids, element_hashes) VALUES (?, ?, ?)",
+                    (time.time(), json.dumps(sorted(stale_ids)), json.dumps(sorted(stale_hashes))),
+                )
+    finally:
+        conn.close()
+    return diff
+
+
+# ----------------------------
+# Serving (sync: async callers run these with asyncio.to_thread)
+# ----------------------------
+def catalog_available(db_path: Path = NEO_CATALOG_PATH) -> bool:
+    return db_path.exists()
+
+
+def _summary(row) -> dict:
+    return dict(zip(SUMMARY_COLUMNS, row)) | {"hazardous": bool(row[4])}
+
+
+def browse_catalog(page: int = 0, page_size: int = 20, db_path: Path = NEO_CATALOG_PATH) -> dict:
+    """One page of catalog summaries, in the same envelope as NeoWs browse."""
+    conn = _reader(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM neos").fetchone()[0]
+    rows = conn.execute(
+        f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM neos ORDER BY id LIMIT ? OFFSET ?",
+        (page_size, page * page_size),
+    ).fetchall()
+    return {
+        "near_earth_objects": [_summary(r) for r in rows],
+        "page": {
+            "size": page_size,
+            "total_elements": total,
+            "total_pages": (total + page_size - 1) // page_size,
+            "number": page,
+        },
+    }
+
+
+def get_catalog_neo(asteroid_id: str, db_path: Path = NEO_CATALOG_PATH):
+    """Full NeoWs record for asteroid_id from the catalog, or None."""
+    row = _reader(db_path).execute("SELECT raw FROM neos WHERE id = ?", (str(asteroid_id),)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def sync_invalidations(db_path: Path = NEO_CATALOG_PATH) -> int:
+    """
+    Apply refreshes published since this process last looked: drop its
+    in-memory NEO lookup entries, memoized orbits and ephemerides of the
+    changed records (the refresh already cleared the shared disk caches).
+    Returns the number of invalidations applied.
+    """
+    conn = _reader(db_path)
+    latest = conn.execute("SELECT MAX(generation) FROM invalidations").fetchone()[0] or 0
+    with _applied_lock:
+        applied = _applied.get(db_path)
+        _applied[db_path] = max(latest, applied or 0)
+    if applied is None or latest <= applied:
+        # First look: nothing was cached from the catalog before it
+        return 0
+
+    ids, hashes = set(), set()
+    rows = conn.execute(
+        "SELECT asteroid_ids, element_hashes FROM invalidations WHERE generation > ? AND generation <= ?",
+        (applied, latest),
+    ).fetchall()
+    for asteroid_ids, element_hashes in rows:
+        ids.update(json.loads(asteroid_ids))
+        hashes.update(json.loads(element_hashes))
+    for asteroid_id in ids:
+        neo_cache.forget(asteroid_id)
+    discard_memos(hashes)
+    invalidate_ephemerides(hashes, disk=False)
+    return len(rows)
+
+
+def _catalog_record(asteroid_id: str, db_path: Path = NEO_CATALOG_PATH):
+    if not catalog_available(db_path):
+        return None
+    sync_invalidations(db_path)
+    return get_catalog_neo(asteroid_id, db_path)
+
+
+def get_neo(asteroid_id: str, db_path: Path = NEO_CATALOG_PATH) -> dict:
+    """
+    Full NeoWs record: the local catalog first, then the cached upstream
+    fetch. Every simulation path reads records through here (or aget_neo).
+    """
+    record = _catalog_record(str(asteroid_id), db_path)
+    return record if record is not None else fetch_neo_by_id(asteroid_id)
+
+
+async def aget_neo(asteroid_id: str, db_path: Path = NEO_CATALOG_PATH) -> dict:
+    """Async get_neo(): SQLite in a worker thread, upstream through the async client."""
+    record = await asyncio.to_thread(_catalog_record, str(asteroid_id), db_path)
+    return record if record is not None else await afetch_neo_by_id(asteroid_id)
+
+
+def export_rows(db_path: Path = NEO_CATALOG_PATH) -> list:
+    """Every catalog row as a flat dict of EXPORT_COLUMNS, ordered by id."""
+    names = [c for c, _ in EXPORT_COLUMNS]
+    rows = _reader(db_path).execute(f"SELECT {', '.join(names)} FROM neos ORDER BY id").fetchall()
+    out = [dict(zip(names, r)) for r in rows]
+    for row in out:
+        row["hazardous"] = bool(row["hazardous"])
+    return out
+
+
+def catalog_changes(limit: int = 10, db_path: Path = NEO_CATALOG_PATH) -> list:
+    """The most recent refresh diffs, newest first."""
+    rows = _reader(db_path).execute(
+        "SELECT id, started_at, finished_at, summary FROM refresh_log ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [{"id": r[0], "started_at": r[1], "finished_at": r[2], **json.loads(r[3])} for r in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest the NeoWs browse feed into the local catalog")
+    parser.add_argument("--db", type=Path, default=NEO_CATALOG_PATH)
+    parser.add_argument("--pages", type=int, default=None, help="Max pages to fetch this run")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--restart", action="store_true", help="Forget progress and fetch every page")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Update changed records instead of ingesting (re-fetches every browse page)")
+    parser.add_argument("--ids", default=None,
+                        help="Comma-separated NEO ids to refresh (implies --refresh; the incremental path)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.refresh or args.ids:
+        ids = [i.strip() for i in args.ids.split(",") if i.strip()] if args.ids else None
+        diff = asyncio.run(refresh_catalog(args.db, args.concurrency, ids=ids, max_pages=args.pages))
+        print(f"✅ {len(diff['added'])} added, {len(diff['orbit_changed'])} orbits changed, "
+              f"{len(diff['updated'])} updated, {len(diff['removed'])} removed, {diff['unchanged']} unchanged "
+              f"({diff['pages_unchanged']} pages skipped) in {diff['elapsed_s']}s")
+        for c in diff["orbit_changed"]:
+            print(f"   {c['id']} {c['name']}: {c['old_determination']} -> {c['new_determination']}")
+        print(f"   invalidated {diff['invalidated']}")
+    else:
+        summary = asyncio.run(
+            ingest_catalog(args.db, concurrency=args.concurrency, max_pages=args.pages, restart=args.restart)
+        )
+        print(f"✅ {summary}")
@@ -1,16 +1,49 @@
 # backend/app.py
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from pathlib import Path
 import traceback
+import asyncio
+import json
+import os
+import threading
+import httpx
+import logging
+import time
+import uuid
 
 # Import your existing logic
 from backend.api.nasa_api import fetch_neo_by_id
-from backend.api.nasa_api import fetch_neo_by_id, extract_key_fields
-from backend.data.dem_loader import get_local_elevation
-from backend.main import run_simulation
+from backend.api.nasa_api import fetch_neo_by_id, extract_key_fields, neo_cache
+from backend.api.nasa_api import abrowse_neos, nasa_client
+from backend.api.http_client import RateLimitExceeded
+from backend.api.neo_catalog import (
+    EXPORT_COLUMNS as CATALOG_EXPORT_COLUMNS, aget_neo, browse_catalog, catalog_available, catalog_changes,
+    export_rows, get_neo,
+)
+from backend.main import STORED_RESULT_COLUMNS, run_simulation
+from backend.batch import RESULT_COLUMNS, expand_scenarios, iter_ndjson, run_batch
+from backend.columnar import FORMATS as COLUMNAR_FORMATS, iter_arrow_stream, iter_parquet
+from backend.executor import ExecutorBusy, executor
+from backend.jobs import TERMINAL as JOB_TERMINAL, batch_scenarios, job_queue
+from backend.result_store import result_store
+from backend.memo import clear_memos, memo_stats, merge_memo_stats
+from backend.metrics import HTTP_SECONDS, register_collector, render as render_metrics, server_timing
+from backend.config import CACHE_DIR
+from backend.warmup import start_warmup, warmup_status
+from backend.simulation.hazard_map import (
+    FORMATS as HAZARD_FORMATS, LAYERS as HAZARD_LAYERS, MAX_ZOOM as HAZARD_MAX_ZOOM,
+    UnknownScenario, build_scenario, load_scenario, render_tile, valid_scenario_key,
+)
+from backend.simulation.tsunami import tsunami_report
+from backend.simulation.screening import RANK_KEYS as SCREENING_RANK_KEYS, run_screening
+from backend.simulation.monte_carlo import MAX_SAMPLES as MC_MAX_SAMPLES, run_monte_carlo
+from backend.simulation.usgs_data import USGS_DIR, get_elevation, get_elevations, raster_cache_info
+from backend.simulation.tile_index import find_tiles, list_tiles
+from backend.simulation.ephemeris import element_set_hash, ephemeris_cache_info, get_ephemeris, today_jd, to_jd
 
 app = FastAPI(title="Meteor Defender Simulation API", version="0.2")
 
@@ -23,6 +56,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
+@app.middleware("http")
+async def time_requests(request, call_next):
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, so ids don't explode the series
+        route = request.scope.get("route")
+        HTTP_SECONDS.observe(
+            time.perf_counter() - t0,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status),
+        )
+
 # -------------------------
 # Models
 # -------------------------
@@ -69,14 +125,66 @@ class SimulateRequest(BaseModel):
     dem_source: Optional[str] = Field("auto", description="DEM source: auto/usgs/srtm/gebco")
     propagate_days: Optional[int] = Field(30, ge=0, description="Days to propagate the orbit forward")
 
+class ElevationBatchRequest(BaseModel):
+    lats: List[float] = Field(..., description="Latitudes in degrees")
+    lons: List[float] = Field(..., description="Longitudes in degrees (same length as lats)")
+    source: Optional[str] = Field("auto", description="DEM source: auto/usgs/srtm/gebco")
+
+class HazardRequest(BaseModel):
+    asteroid_id: str = Field(..., description="NASA NEO SPK-ID or asteroid id")
+    impact_lat: float = Field(..., ge=-90, le=90, description="Impact latitude in degrees")
+    impact_lon: float = Field(..., ge=-180, le=180, description="Impact longitude in degrees")
+    dem_source: Optional[str] = Field("auto", description="DEM source for the land/sea mask")
+
+class TsunamiRequest(BaseModel):
+    asteroid_id: str = Field(..., description="NASA NEO SPK-ID or asteroid id")
+    impact_lat: float = Field(..., ge=-85, le=85, description="Impact latitude in degrees")
+    impact_lon: float = Field(..., ge=-180, le=180, description="Impact longitude in degrees")
+    radius_km: float = Field(3000.0, gt=0, le=10000, description="Half-size of the modelled region")
+    cell_deg: float = Field(0.1, ge=0.01, le=2.0, description="Bathymetry grid resolution (coarsened for large regions)")
+    include_grids: bool = Field(False, description="Also return the full arrival-time and amplitude grids")
+
+class ScreeningRequest(BaseModel):
+    start: Optional[str] = Field(None, description="JD or ISO date (default: now)")
+    stop: Optional[str] = Field(None, description="JD or ISO date (default: start + days)")
+    days: float = Field(365.0, gt=0, description="Window length when stop is not given")
+    step_days: float = Field(1.0, gt=0, le=10, description="Sweep step in days")
+    threshold_au: float = Field(0.05, gt=0, le=0.5, description="Report approaches closer than this (AU)")
+    hazardous_only: bool = Field(False, description="Only objects flagged potentially hazardous")
+    limit: int = Field(100, ge=1, le=10000, description="Max encounters returned")
+    rank_by: str = Field("distance", pattern=f"^({'|'.join(SCREENING_RANK_KEYS)})$",
+                         description="Rank by miss distance (closest first) or energy (largest first)")
+
+class MonteCarloRequest(BaseModel):
+    asteroid_id: str = Field(..., description="NASA NEO SPK-ID or asteroid id")
+    impact_lat: float = Field(0.0, description="Impact latitude in degrees")
+    impact_lon: float = Field(0.0, description="Impact longitude in degrees")
+    n_samples: int = Field(100_000, ge=1, le=MC_MAX_SAMPLES, description="Number of Monte Carlo samples")
+    seed: Optional[int] = Field(None, description="RNG seed for reproducible runs")
+
+class BatchSimulateRequest(BaseModel):
+    scenarios: Optional[List[dict]] = Field(None, description="Explicit scenarios (asteroid_id, impact_lat, impact_lon, ...)")
+    asteroids: Optional[List[str]] = Field(None, description="Asteroid ids for a grid run (with sites)")
+    sites: Optional[List[dict]] = Field(None, description="Impact sites ({lat, lon}) for a grid run")
+    dem_source: Optional[str] = Field("auto", description="Default DEM source: auto/usgs/srtm/gebco")
+    propagate_days: Optional[int] = Field(30, ge=0, description="Default propagation window in days")
+    format: Optional[str] = Field("ndjson", description="Output format: ndjson, parquet or arrow (IPC stream)")
+
+class JobRequest(BaseModel):
+    kind: str = Field("simulate", description="Job kind: simulate, batch or screening")
+    params: dict = Field(..., description="SimulateRequest (simulate), BatchSimulateRequest (batch) or ScreeningRequest (screening) fields")
+
 class SimulateResponse(BaseModel):
     result_path: Optional[str]
+    result_key: Optional[str]
     timestamp_utc: str
     asteroid: AsteroidInfo
     orbit: OrbitalElements
     energy: EnergyInfo
     consequences: Consequences
 
+JOB_PARAM_MODELS = {"simulate": SimulateRequest, "batch": BatchSimulateRequest, "screening": ScreeningRequest}
+
 # -------------------------
 # Health
 # -------------------------
@@ -84,25 +192,158 @@ class SimulateResponse(BaseModel):
 def health():
     return {"status": "ok", "app": "Meteor Defender Backend"}
 
+@app.get("/ready")
+def ready():
+    """200 once the scientific stack is imported, 503 while still warming (WARMUP=0: imports on first call)."""
+    status = warmup_status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+@app.on_event("startup")
+def warm_scientific_stack():
+    start_warmup()
+    if os.getenv("WARMUP", "1") != "0":
+        # Spawn the simulation workers now rather than on the first request
+        threading.Thread(target=executor.start, name="executor-start", daemon=True).start()
+
+    # Picks up jobs a previous process left queued or running
+    job_queue.start()
+
+@app.on_event("shutdown")
+def stop_executor():
+    executor.shutdown()
+
+# -------------------------
+# Metrics
+# -------------------------
+@register_collector
+def _cache_counters():
+    neo, eph = neo_cache.info(), ephemeris_cache_info()
+    counters = [
+        ("neo_memory", neo, "memory_hits", "misses"),
+        ("neo_disk", neo, "disk_hits", None),
+        ("raster", raster_cache_info(), "hits", "misses"),
+        ("ephemeris_memory", eph, "memory_hits", "misses"),
+        ("ephemeris_disk", eph, "disk_hits", None),
+        ("result_store", result_store.stats, "hits", "misses"),
+    ]
+    memos = merge_memo_stats([memo_stats()] + executor.worker_memo_stats())
+    counters += [(f"memo_{name}", st, "hits", "misses") for name, st in memos.items()]
+
+    for cache, st, hits, misses in counters:
+        yield ("meteor_cache_hits_total", "counter", "Cache hits", {"cache": cache}, st[hits])
+        if misses:
+            yield ("meteor_cache_misses_total", "counter", "Cache misses", {"cache": cache}, st[misses])
+
+@register_collector
+def _executor_gauges():
+    info = executor.info()
+    for key in ("workers", "pending", "max_pending"):
+        yield (f"meteor_executor_{key}", "gauge", f"Simulation executor {key}", {}, info[key])
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition: stage/HTTP latency histograms and cache counters."""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4")
+
 # -------------------------
 # NEO endpoints
 # -------------------------
+@app.get("/api/neo/cache/stats")
+def neo_cache_stats():
+    return neo_cache.info()
+
+def _neo_error(e: Exception, what: str) -> HTTPException:
+    if isinstance(e, RateLimitExceeded):
+        return HTTPException(status_code=429, detail=str(e))
+    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
+        return HTTPException(status_code=404, detail=f"{what}: not found")
+    return HTTPException(status_code=500, detail=f"{what}: {e}")
+
+# Declared before /api/neo/{asteroid_id} so "browse" is not taken as an id
+@app.get("/api/neo/browse")
+async def neo_browse(page: int = Query(0, ge=0), page_size: int = Query(20, ge=1, le=50)):
+    try:
+        if catalog_available():
+            return await asyncio.to_thread(browse_catalog, page=page, page_size=page_size)
+        # No local catalog yet: proxy the upstream feed
+        return await abrowse_neos(page=page, page_size=min(page_size, 20))
+    except Exception as e:
+        raise _neo_error(e, "NEO browse failed")
+
+@app.get("/api/neo/catalog/changes")
+def neo_catalog_changes(limit: int = Query(10, ge=1, le=100)):
+    """Diffs of the latest catalog refreshes (python -m backend.api.neo_catalog --refresh)."""
+    if not catalog_available():
+        return []
+    return catalog_changes(limit)
+
+@app.get("/api/neo/catalog/export")
+def neo_catalog_export(format: str = Query("parquet", pattern="^(parquet|arrow)$")):
+    """The whole local catalog as Parquet or an Arrow IPC stream."""
+    if not catalog_available():
+        raise HTTPException(status_code=503, detail="NEO catalog not ingested (python -m backend.api.neo_catalog)")
+    return _stream_records(export_rows(), CATALOG_EXPORT_COLUMNS, format)
+
 @app.get("/api/neo/{asteroid_id}")
-def neo_lookup(asteroid_id: str):
+async def neo_lookup(asteroid_id: str):
     try:
-        return fetch_neo_by_id(asteroid_id)
+        return await aget_neo(asteroid_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"NEO lookup failed: {e}")
+        raise _neo_error(e, "NEO lookup failed")
 
-@app.get("/api/neo/browse")
-def neo_browse(page: int = Query(0, ge=0), page_size: int = Query(20, ge=1, le=50)):
+@app.on_event("shutdown")
+async def close_nasa_client():
+    await nasa_client.aclose()
+
+# -------------------------
+# Orbit ephemeris
+# -------------------------
+@app.get("/api/orbit/{asteroid_id}/ephemeris")
+async def orbit_ephemeris(
+    asteroid_id: str,
+    start: Optional[str] = Query(None, description="JD or ISO date (default: 0h UTC today)"),
+    stop: Optional[str] = Query(None, description="JD or ISO date (default: start + 365 d)"),
+    step: float = Query(1.0, gt=0, description="Step in days"),
+    format: str = Query("json", pattern="^(json|binary)$"),
+):
     try:
-        if 'nasa_browse_neos' in globals() and callable(nasa_browse_neos):
-            return nasa_browse_neos(page=page, page_size=page_size)
-        else:
-            raise RuntimeError("browse_neos helper not implemented in backend.api.nasa_api")
+        orbital_data = (await aget_neo(asteroid_id))["orbital_data"]
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"NEO browse failed: {e}")
+        raise _neo_error(e, "NEO lookup failed")
+
+    try:
+        # Default to the start of the day so repeated calls share one cache entry
+        start_jd = to_jd(start) if start is not None else today_jd()
+        stop_jd = to_jd(stop) if stop is not None else start_jd + 365.0
+        times, pos, cache = get_ephemeris(orbital_data, start_jd, stop_jd, step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    meta = {
+        "id": asteroid_id,
+        "element_hash": element_set_hash(orbital_data),
+        "frame": "heliocentric ecliptic J2000",
+        "units": "AU",
+        "start_jd": float(times[0]),
+        "step_days": step,
+        "count": len(times),
+    }
+    if format == "binary":
+        # Little-endian float32 (count, 3) x/y/z; time axis is in the headers
+        headers = {f"X-Ephemeris-{k.replace('_', '-')}": str(v) for k, v in meta.items()}
+        headers["X-Cache"] = cache
+        return Response(content=pos.astype("<f4").tobytes(), media_type="application/octet-stream", headers=headers)
+
+    return {
+        **meta,
+        "cache": cache,
+        "t_jd": times.tolist(),
+        "x": pos[:, 0].tolist(),
+        "y": pos[:, 1].tolist(),
+        "z": pos[:, 2].tolist(),
+    }
 
 # -------------------------
 # DEM / Elevation endpoint
@@ -110,45 +351,365 @@ def neo_browse(page: int = Query(0, ge=0), page_size: int = Query(20, ge=1, le=5
 @app.get("/api/elevation")
 def elevation(lat: float = Query(...), lon: float = Query(...), source: Optional[str] = Query("auto")):
     try:
-        elev = get_local_elevation(lat, lon)
+        elev = get_elevation(lat, lon, source)
         return {"lat": lat, "lon": lon, "elevation_m": elev}
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"No DEM found for {lat},{lon}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Elevation lookup failed: {e}")
 
+MAX_BATCH_POINTS = 100_000
+
+@app.post("/api/elevation/batch")
+def elevation_batch(req: ElevationBatchRequest):
+    if len(req.lats) != len(req.lons):
+        raise HTTPException(status_code=422, detail="lats and lons must have the same length")
+    if len(req.lats) > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_POINTS} points per batch")
+    try:
+        elevs = get_elevations(req.lats, req.lons, req.source)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch elevation lookup failed: {e}")
+
+    # Same order as the request; null where no DEM covers the point
+    values = [None if v != v else round(v, 2) for v in elevs.tolist()]
+    return {
+        "count": len(values),
+        "source": req.source,
+        "missing": sum(v is None for v in values),
+        "elevation_m": values,
+    }
+
+@app.get("/api/elevation/cache")
+def elevation_cache_stats():
+    return raster_cache_info()
+
 # -------------------------
 # Simulation endpoint
 # -------------------------
+SIMULATE_QUEUE_TIMEOUT = 10.0
+# ?profile=true dumps a cProfile of the run; off unless explicitly enabled
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = CACHE_DIR / "profiles"
+
 @app.post("/api/simulate", response_model=SimulateResponse)
-def simulate(req: SimulateRequest):
+def simulate(req: SimulateRequest, response: Response, profile: bool = Query(False)):
+    if profile and not PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (set PROFILING_ENABLED=1)")
+    profile_id = uuid.uuid4().hex if profile else None
     try:
-        out = run_simulation(
+        # CPU-bound: runs on a pool worker so this API process stays responsive
+        future = executor.submit(
+            run_simulation,
             asteroid_id=req.asteroid_id,
             impact_lat=req.impact_lat,
             impact_lon=req.impact_lon,
             dem_source=req.dem_source,
             propagate_days=req.propagate_days,
+            timeout=SIMULATE_QUEUE_TIMEOUT,
+            profile_path=PROFILE_DIR / f"{profile_id}.prof" if profile_id else None,
         )
+        out = future.result()
+
+        response.headers["Server-Timing"] = server_timing(future.spans)
+        if profile_id:
+            response.headers["X-Profile-Id"] = profile_id
 
-        out_file = Path(__file__).resolve().parents[1] / "data" / "simulation_result.json"
+        out_file = result_store.path_for(out["result_key"])
         out_path = str(out_file) if out_file.exists() else None
 
         return {"result_path": out_path, **out}
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         tb = traceback.format_exc()
         raise HTTPException(status_code=500, detail={"error": str(e), "trace": tb})
 
+@app.get("/api/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """pstats dump of a profiled /api/simulate run (open with pstats or snakeviz)."""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (set PROFILING_ENABLED=1)")
+    try:
+        uuid.UUID(hex=profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile id")
+    path = PROFILE_DIR / f"{profile_id}.prof"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+MAX_BATCH_SCENARIOS = 200_000
+
+def _stream_records(rows, columns, fmt: str) -> StreamingResponse:
+    """Records as NDJSON, Parquet (one row group per batch) or an Arrow IPC stream."""
+    if fmt == "parquet":
+        return StreamingResponse(iter_parquet(rows, columns), media_type=COLUMNAR_FORMATS[fmt])
+    if fmt == "arrow":
+        return StreamingResponse(iter_arrow_stream(rows, columns), media_type=COLUMNAR_FORMATS[fmt])
+    return StreamingResponse(iter_ndjson(rows), media_type="application/x-ndjson")
+
+@app.post("/api/simulate/batch")
+def simulate_batch(req: BatchSimulateRequest):
+    """Many scenarios in one request, streamed back as NDJSON, Parquet or an Arrow IPC stream."""
+    if req.format not in ("ndjson", "parquet", "arrow"):
+        raise HTTPException(status_code=400, detail="format must be ndjson, parquet or arrow")
+    spec = req.scenarios if req.scenarios is not None else {
+        "asteroids": req.asteroids or [], "sites": req.sites or [],
+    }
+    n = len(spec) if req.scenarios is not None else len(spec["asteroids"]) * len(spec["sites"])
+    if n > MAX_BATCH_SCENARIOS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SCENARIOS} scenarios per batch")
+    try:
+        scenarios = expand_scenarios(spec, req.dem_source, req.propagate_days)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = run_batch(scenarios, executor=executor)
+    # A client disconnect closes the generator, which cancels unstarted chunks
+    return _stream_records(rows, RESULT_COLUMNS, req.format)
+
+@app.get("/api/simulate/executor")
+def simulate_executor_stats():
+    return executor.info()
+
+@app.post("/api/simulate/montecarlo")
+def simulate_monte_carlo(req: MonteCarloRequest):
+    try:
+        raw = get_neo(req.asteroid_id)
+    except Exception as e:
+        raise _neo_error(e, "NEO lookup failed")
+
+    try:
+        key = extract_key_fields(raw)
+        d_min = raw["estimated_diameter"]["kilometers"]["estimated_diameter_min"]
+        # Thousands of samples: run on a worker, not the API process
+        out = executor.submit(
+            run_monte_carlo,
+            key,
+            diameter_min_km=d_min,
+            n_samples=req.n_samples,
+            seed=req.seed,
+            impact_lat=req.impact_lat,
+            impact_lon=req.impact_lon,
+            timeout=SIMULATE_QUEUE_TIMEOUT,
+        ).result()
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"asteroid": {"id": req.asteroid_id, "name": key.get("name")}, **out}
+
+# -------------------------
+# Hazard map tiles
+# -------------------------
+def _hazard_info(scenario: dict) -> dict:
+    return {
+        **scenario,
+        "max_zoom": HAZARD_MAX_ZOOM,
+        "layers": {name: {k: spec[k] for k in ("unit", "floor", "ceiling")} for name, spec in HAZARD_LAYERS.items()},
+        "tile_url": f"/api/hazard/{scenario['key']}/{{layer}}/{{z}}/{{x}}/{{y}}.png",
+    }
+
+@app.post("/api/hazard")
+async def create_hazard_map(req: HazardRequest):
+    """Set up a hazard scenario; the map then fetches its layers from tile_url."""
+    try:
+        raw = await aget_neo(req.asteroid_id)
+    except Exception as e:
+        raise _neo_error(e, "NEO lookup failed")
+    try:
+        scenario = await asyncio.to_thread(
+            build_scenario, extract_key_fields(raw), req.impact_lat, req.impact_lon, req.dem_source
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _hazard_info(scenario)
+
+@app.get("/api/hazard/{key}")
+def get_hazard_map(key: str):
+    if not valid_scenario_key(key):
+        raise HTTPException(status_code=404, detail="Unknown hazard scenario")
+    try:
+        return _hazard_info(load_scenario(key))
+    except UnknownScenario:
+        raise HTTPException(status_code=404, detail="Unknown hazard scenario")
+
+@app.get("/api/hazard/{key}/{layer}/{z}/{x}/{y:int}.{fmt}")
+def get_hazard_tile(key: str, layer: str, z: int, x: int, y: int, fmt: str):
+    # Keys become a directory name under HAZARD_TILE_DIR
+    if not valid_scenario_key(key):
+        raise HTTPException(status_code=404, detail="Unknown hazard scenario")
+    try:
+        scenario = load_scenario(key)
+        data = render_tile(scenario, layer, z, x, y, fmt)
+    except UnknownScenario:
+        raise HTTPException(status_code=404, detail="Unknown hazard scenario")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Keys are content hashes, so a tile never changes
+    return Response(content=data, media_type=HAZARD_FORMATS[fmt],
+                    headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+@app.post("/api/tsunami")
+def simulate_tsunami_endpoint(req: TsunamiRequest):
+    """Arrival times and coastal amplitudes over GEBCO bathymetry."""
+    try:
+        raw = get_neo(req.asteroid_id)
+    except Exception as e:
+        raise _neo_error(e, "NEO lookup failed")
+    try:
+        # Solving a continental grid takes seconds: keep it off the API process
+        return executor.submit(
+            tsunami_report, extract_key_fields(raw), req.impact_lat, req.impact_lon,
+            req.radius_km, req.cell_deg, req.include_grids, timeout=SIMULATE_QUEUE_TIMEOUT,
+        ).result()
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=f"Bathymetry not available: {e}")
+
+# -------------------------
+# Close-approach screening
+# -------------------------
+@app.post("/api/screening")
+def screen_close_approaches(req: ScreeningRequest):
+    """Ranked Earth encounters across the local catalog (POST /api/jobs with kind "screening" for long windows)."""
+    if not catalog_available():
+        raise HTTPException(status_code=503, detail="NEO catalog not ingested (python -m backend.api.neo_catalog)")
+    try:
+        return executor.submit(run_screening, **jsonable_encoder(req), timeout=SIMULATE_QUEUE_TIMEOUT).result()
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/memo/stats")
+def memo_stats_endpoint():
+    """Per-stage memo hit rates, summed over this process and the pool workers."""
+    snapshots = [memo_stats()] + executor.worker_memo_stats()
+    return {"processes": len(snapshots), "stages": merge_memo_stats(snapshots)}
+
+@app.delete("/api/memo")
+def clear_memo():
+    """Clears this process's memos (pool workers keep theirs until they restart)."""
+    clear_memos()
+    return {"cleared": True}
+
+@app.get("/api/results/stats")
+def result_store_stats():
+    return result_store.info()
+
+@app.get("/api/results/export")
+def results_export(format: str = Query("parquet", pattern="^(parquet|arrow)$")):
+    """Every stored simulation result, flattened like SimulateResponse, as Parquet or an Arrow IPC stream."""
+    return _stream_records(result_store.iter_results(), STORED_RESULT_COLUMNS, format)
+
+@app.get("/api/results/{key}")
+def stored_result(key: str):
+    if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+        raise HTTPException(status_code=400, detail="Result keys are 64 hex characters")
+    out = result_store.get(key)
+    if out is None:
+        raise HTTPException(status_code=404, detail="No stored result for this key")
+    return out
+
+# -------------------------
+# Simulation jobs
+# -------------------------
+JOB_EVENT_POLL_S = 0.5
+
+@app.post("/api/jobs", status_code=202)
+def submit_job(req: JobRequest):
+    model = JOB_PARAM_MODELS.get(req.kind)
+    if model is None:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {req.kind}")
+    try:
+        params = jsonable_encoder(model(**req.params))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    params.pop("format", None)  # batch jobs always store NDJSON
+    if req.kind == "batch":
+        # Reject a bad scenario spec now rather than as a failed job
+        try:
+            batch_scenarios(params)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return job_queue.submit(req.kind, params)
+
+def _job_or_404(job_id: str) -> dict:
+    job = job_queue.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.get("/api/jobs/{job_id}")
+def job_status(job_id: str):
+    return _job_or_404(job_id)
+
+@app.get("/api/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = _job_or_404(job_id)
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    full = job_queue.get(job_id)
+    if full["result_file"]:
+        return FileResponse(job_queue.jobs_dir / full["result_file"], media_type="application/x-ndjson")
+    return full["result"]
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    _job_or_404(job_id)
+    if not job_queue.cancel(job_id):
+        job = job_queue.status(job_id)
+        if job["status"] == "running":
+            raise HTTPException(status_code=409, detail=f"A running {job['kind']} job cannot be cancelled")
+        raise HTTPException(status_code=409, detail="Job already finished")
+    return {"id": job_id, "cancel_requested": True}
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: a "progress" event on every change, then one "end" event."""
+    _job_or_404(job_id)
+
+    async def stream():
+        last = None
+        while True:
+            # status() may read SQLite: keep it off the event loop
+            job = await asyncio.to_thread(job_queue.status, job_id)
+            state = (job["status"], job["done"], job["total"])
+            if state != last:
+                last = state
+                yield f"event: progress\ndata: {json.dumps(job)}\n\n"
+            if job["status"] in JOB_TERMINAL:
+                yield f"event: end\ndata: {json.dumps({'status': job['status']})}\n\n"
+                return
+            await asyncio.sleep(JOB_EVENT_POLL_S)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 # -------------------------
 # Static helper: list available USGS tiles
 # -------------------------
 @app.get("/api/usgs/tiles")
-def list_usgs_tiles():
+def list_usgs_tiles(lat: Optional[float] = Query(None), lon: Optional[float] = Query(None)):
     try:
-        tiles = []
-        p = Path(__file__).resolve().parents[1] / "data" / "usgs"
-        if p.exists():
-            tiles = [t.name for t in p.glob("*.tif")]
-        return {"count": len(tiles), "tiles": tiles}
+        if not USGS_DIR.exists():
+            return {"count": 0, "tiles": [], "bounds": []}
+        if lat is not None and lon is not None:
+            # Only the tiles covering the given point
+            names = {t.name for t in find_tiles(USGS_DIR, lat, lon)}
+            entries = [t for t in list_tiles(USGS_DIR) if t["name"] in names]
+        else:
+            entries = list_tiles(USGS_DIR)
+        return {
+            "count": len(entries),
+            "tiles": [t["name"] for t in entries],
+            "bounds": entries,
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not list tiles: {e}")
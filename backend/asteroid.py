@@ -1,13 +1,9 @@
-import requests
 import os
-from backend.config import NASA_API_KEY, BASE_URL
-
-print("API KEY:", NASA_API_KEY)
+from backend.api.nasa_api import BROWSE_URL, nasa_client
 
 
 def get_sample_asteroids(limit=10):
-    url = f"{BASE_URL}?api_key={NASA_API_KEY}"
-    resp = requests.get(url)
+    resp = nasa_client.get_sync(BROWSE_URL, params={"size": min(limit, 20)})
     resp.raise_for_status()
     data = resp.json()
 
@@ -0,0 +1,403 @@
+"""
+Batch simulation: many asteroids x many impact sites.
+
+    python -m backend.main batch scenarios.json --out results.ndjson
+    python -m backend.main batch grid.json --out results.parquet --format parquet
+
+Scenario files are JSON (a list of scenarios, or {"asteroids": [...],
+"sites": [...]} for the full cross product), NDJSON, or CSV with
+asteroid_id, impact_lat, impact_lon and optional dem_source /
+propagate_days columns.
+
+Each asteroid is fetched and propagated once however many sites it is
+paired with, elevations are read per DEM source with get_elevations()
+(one window read per tile), and the physics runs over a whole chunk of
+scenarios as arrays. Results stream out one record per scenario, in
+input order, as NDJSON, Parquet or an Arrow IPC stream (backend/columnar.py).
+
+Records have the same fields as run_simulation() results (positions from
+the vectorized propagator agree with poliastro's), minus result_key and
+timestamp_utc, plus the batch-only "scenario" index, "error",
+orbit.propagate_days and impact_location.dem_source.
+"""
+import csv
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from backend import columnar
+from backend.api.nasa_api import extract_key_fields
+from backend.api.neo_catalog import get_neo
+from backend.metrics import span
+from backend.simulation.impact_energy import classify_risk
+from backend.simulation.physics import impact_consequences
+from backend.simulation.propagator import ELEMENT_KEYS, elements_from_orbital_data, propagate_elements, true_anomaly
+from backend.simulation.usgs_data import get_elevations
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+MIN_POOL_CHUNK = 256
+
+# Flat column layout for columnar output (dotted paths into a result record)
+RESULT_COLUMNS = [
+    ("scenario", "int64"),
+    ("error", "string"),
+    ("asteroid.id", "string"),
+    ("asteroid.name", "string"),
+    ("asteroid.diameter_km", "float64"),
+    ("asteroid.velocity_kps_sample", "float64"),
+    ("asteroid.approach_date", "string"),
+    ("asteroid.miss_distance_km_sample", "float64"),
+    ("orbit.epoch_jd", "float64"),
+    ("orbit.semi_major_axis_AU", "float64"),
+    ("orbit.eccentricity", "float64"),
+    ("orbit.inclination_deg", "float64"),
+    ("orbit.raan_deg", "float64"),
+    ("orbit.argp_deg", "float64"),
+    ("orbit.true_anomaly_deg", "float64"),
+    ("orbit.propagate_days", "int64"),
+    ("orbit.heliocentric_current.x_AU", "float64"),
+    ("orbit.heliocentric_current.y_AU", "float64"),
+    ("orbit.heliocentric_current.z_AU", "float64"),
+    ("orbit.heliocentric_future.x_AU", "float64"),
+    ("orbit.heliocentric_future.y_AU", "float64"),
+    ("orbit.heliocentric_future.z_AU", "float64"),
+    ("energy.joules", "float64"),
+    ("energy.megatons_tnt", "float64"),
+    ("energy.risk_text", "string"),
+    ("consequences.impact_location.lat", "float64"),
+    ("consequences.impact_location.lon", "float64"),
+    ("consequences.impact_location.elevation_m", "float64"),
+    ("consequences.impact_location.dem_source", "string"),
+    ("consequences.crater_km", "float64"),
+    ("consequences.seismic_mw", "float64"),
+    ("consequences.tsunami_m_at_200km", "float64"),
+    ("consequences.atmospheric_changes.temperature_rise_C", "float64"),
+    ("consequences.atmospheric_changes.pressure_wave_hPa", "float64"),
+    ("consequences.atmospheric_changes.wind_speed_kmh", "float64"),
+]
+# Columns that only batch records have (not run_simulation() results)
+BATCH_ONLY_COLUMNS = {
+    "scenario", "error", "orbit.propagate_days", "consequences.impact_location.dem_source",
+}
+
+
+# -------------------------
+# Scenario input
+# -------------------------
+def normalize_scenario(s: dict, dem_source: str = "auto", propagate_days: int = 30) -> dict:
+    """One scenario with defaults filled in; accepts lat/lon as short aliases."""
+    lat = s.get("impact_lat", s.get("lat"))
+    lon = s.get("impact_lon", s.get("lon"))
+    if s.get("asteroid_id") in (None, "") or lat in (None, "") or lon in (None, ""):
+        raise ValueError(f"Scenario needs asteroid_id, impact_lat and impact_lon: {s}")
+    return {
+        "asteroid_id": str(s["asteroid_id"]),
+        "impact_lat": float(lat),
+        "impact_lon": float(lon),
+        "dem_source": str(s.get("dem_source") or dem_source).lower(),
+        "propagate_days": int(propagate_days if s.get("propagate_days") in (None, "") else s["propagate_days"]),
+    }
+
+
+def expand_scenarios(spec, dem_source: str = "auto", propagate_days: int = 30) -> list:
+    """
+    Scenarios from a list of dicts, or from a grid spec
+    {"asteroids": [ids], "sites": [{"lat", "lon"}, ...]} (every asteroid at
+    every site). Grid-level dem_source / propagate_days act as defaults.
+    """
+    if isinstance(spec, dict):
+        dem_source = spec.get("dem_source", dem_source)
+        propagate_days = spec.get("propagate_days", propagate_days)
+        if "scenarios" in spec:
+            spec = spec["scenarios"]
+        else:
+            spec = [
+                {"asteroid_id": a, **site}
+                for a in spec.get("asteroids") or []
+                for site in spec.get("sites") or []
+            ]
+    return [normalize_scenario(s, dem_source, propagate_days) for s in spec]
+
+
+def load_scenarios(path, dem_source: str = "auto", propagate_days: int = 30) -> list:
+    """Read a .json, .ndjson/.jsonl or .csv scenario file."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, newline="") as fh:
+        if suffix == ".csv":
+            spec = list(csv.DictReader(fh))
+        elif suffix in (".ndjson", ".jsonl"):
+            spec = [json.loads(line) for line in fh if line.strip()]
+        else:
+            spec = json.load(fh)
+    return expand_scenarios(spec, dem_source, propagate_days)
+
+
+# -------------------------
+# Per-asteroid work (once per id)
+# -------------------------
+def _load_neo(asteroid_id: str) -> dict:
+    key = extract_key_fields(get_neo(asteroid_id))
+
+    ca = key["close_approach"][0] if key.get("close_approach") else {}
+    return {
+        "name": key.get("name", "UNKNOWN"),
+        "diameter_km": float(key.get("diameter_km", 0.0)),
+        "velocity_kps": float(ca.get("velocity_kps", 0.0)),
+        "miss_distance_km": float(ca["miss_distance_km"]) if ca else None,
+        "approach_date": ca.get("date", "N/A"),
+        "orbital_data": key.get("orbital_data", {}),
+    }
+
+
+def _lookup_error(e: Exception) -> str:
+    # Upstream errors embed the request URL (and API key); keep only the status
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if status is not None:
+        return f"NEO lookup failed: HTTP {status}"
+    return f"NEO lookup failed: {e}"
+
+
+class _AsteroidCache:
+    """NEO records and propagated positions, shared across chunks of one batch."""
+
+    def __init__(self):
+        self.neos = {}       # id -> _load_neo() dict, or a LookupError saying why not
+        self.positions = {}  # (id, days) -> (2, 3) array: current, future
+
+    def neo(self, asteroid_id: str):
+        if asteroid_id not in self.neos:
+            try:
+                self.neos[asteroid_id] = _load_neo(asteroid_id)
+            except Exception as e:
+                # Stored as a plain LookupError so it pickles to pool workers
+                self.neos[asteroid_id] = LookupError(_lookup_error(e))
+        return self.neos[asteroid_id]
+
+    def propagate(self, pairs):
+        """Fill positions for (id, days) pairs, one vectorized pass per distinct days."""
+        todo = {}
+        for aid, days in pairs:
+            if (aid, days) not in self.positions and not isinstance(self.neos[aid], Exception):
+                todo.setdefault(days, []).append(aid)
+
+        for days, ids in todo.items():
+            el = elements_from_orbital_data([self.neos[a]["orbital_data"] for a in ids])
+            # Only time since epoch matters: "current" is the element epoch
+            el["epoch_osculation"] = np.zeros(len(ids))
+            r = propagate_elements(*(el[k] for k in ELEMENT_KEYS), np.array([0.0, float(days)]))
+            for aid, pos in zip(ids, r):
+                self.positions[(aid, days)] = pos
+
+
+# -------------------------
+# Batch runner
+# -------------------------
+def _xyz(v) -> dict:
+    return {"x_AU": float(v[0]), "y_AU": float(v[1]), "z_AU": float(v[2])}
+
+
+def _true_anomaly_deg(mean_anomaly_deg, ecc):
+    # At the element epoch, like orbit.nu in run_simulation()
+    if mean_anomaly_deg is None or ecc is None or not 0 <= ecc < 1:
+        return None
+    return float(np.degrees(true_anomaly(np.radians(mean_anomaly_deg), ecc)))
+
+
+def _orbit_record(od: dict, days: int, pos) -> dict:
+    def num(k):
+        try:
+            return float(od.get(k))
+        except (TypeError, ValueError):
+            return None
+
+    return {
+        "epoch_jd": num("epoch_osculation"),
+        "semi_major_axis_AU": num("semi_major_axis"),
+        "eccentricity": num("eccentricity"),
+        "inclination_deg": num("inclination"),
+        "raan_deg": num("ascending_node_longitude"),
+        "argp_deg": num("perihelion_argument"),
+        "true_anomaly_deg": _true_anomaly_deg(num("mean_anomaly"), num("eccentricity")),
+        "propagate_days": days,
+        "heliocentric_current": _xyz(pos[0]),
+        "heliocentric_future": _xyz(pos[1]),
+    }
+
+
+def _batch_elevations(chunk):
+    """
+    Elevations for a chunk, one get_elevations() call per DEM source, and
+    per-scenario error messages (None where the lookup did not fail).
+    A missing DEM leaves the elevation null; any other read error becomes
+    the error of that source's scenarios.
+    """
+    lats = np.array([s["impact_lat"] for s in chunk])
+    lons = np.array([s["impact_lon"] for s in chunk])
+    sources = np.array([s["dem_source"] for s in chunk])
+    out = np.full(len(chunk), np.nan)
+    errors = [None] * len(chunk)
+    for src in np.unique(sources):
+        mask = sources == src
+        try:
+            out[mask] = get_elevations(lats[mask], lons[mask], src)
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"DEM lookup failed for source {src}: {e}")
+        except Exception as e:
+            logger.warning(f"DEM read failed for source {src}: {e}")
+            for j in np.nonzero(mask)[0]:
+                errors[j] = f"DEM read failed: {e}"
+    return out, errors
+
+
+def _run_chunk(chunk, offset: int, cache: _AsteroidCache):
+    with span("batch_neo"):
+        neos = [cache.neo(s["asteroid_id"]) for s in chunk]
+    with span("batch_propagate"):
+        cache.propagate({(s["asteroid_id"], s["propagate_days"]) for s in chunk})
+    with span("batch_elevation"):
+        elevations, dem_errors = _batch_elevations(chunk)
+
+    ok = [not isinstance(n, Exception) for n in neos]
+    diam = np.array([n["diameter_km"] if good else 0.0 for n, good in zip(neos, ok)])
+    vel = np.array([n["velocity_kps"] if good else 0.0 for n, good in zip(neos, ok)])
+    with span("batch_physics"), np.errstate(divide="ignore"):
+        phys = {k: v.tolist() for k, v in impact_consequences(diam, vel, tsunami_distance_km=200).items()}
+
+    for j, (s, n) in enumerate(zip(chunk, neos)):
+        row = {"scenario": offset + j}
+        if not ok[j] or dem_errors[j]:
+            row["asteroid"] = {"id": s["asteroid_id"]}
+            row["error"] = str(n) if not ok[j] else dem_errors[j]
+            yield row
+            continue
+
+        elev = elevations[j]
+        energy_j = phys["energy_j"][j]
+        row.update({
+            "asteroid": {
+                "id": s["asteroid_id"],
+                "name": n["name"],
+                "diameter_km": n["diameter_km"],
+                "velocity_kps_sample": n["velocity_kps"],
+                "approach_date": n["approach_date"],
+                "miss_distance_km_sample": n["miss_distance_km"],
+            },
+            "orbit": _orbit_record(
+                n["orbital_data"], s["propagate_days"],
+                cache.positions[(s["asteroid_id"], s["propagate_days"])],
+            ),
+            "energy": {
+                "joules": energy_j,
+                "megatons_tnt": phys["energy_mt"][j],
+                "risk_text": classify_risk(energy_j),
+            },
+            "consequences": {
+                "impact_location": {
+                    "lat": s["impact_lat"],
+                    "lon": s["impact_lon"],
+                    "elevation_m": None if elev != elev else round(float(elev), 2),
+                    "dem_source": s["dem_source"],
+                },
+                "crater_km": phys["crater_km"][j],
+                "seismic_mw": phys["seismic_mw"][j],
+                "tsunami_m_at_200km": phys["tsunami_m"][j],
+                "atmospheric_changes": {
+                    "temperature_rise_C": round(phys["temperature_rise_C"][j], 2),
+                    "pressure_wave_hPa": round(phys["pressure_wave_hPa"][j], 2),
+                    "wind_speed_kmh": round(phys["wind_speed_kmh"][j], 2),
+                },
+            },
+        })
+        yield row
+
+
+def run_chunk_task(chunk, offset: int, neos: dict) -> list:
+    """Pool worker entry point: one chunk, with its NEO records already loaded."""
+    cache = _AsteroidCache()
+    cache.neos.update(neos)
+    return list(_run_chunk(chunk, offset, cache))
+
+
+def run_batch(scenarios, chunk_size: int = CHUNK_SIZE, executor=None):
+    """
+    Yield one result record per scenario, in order.
+
+    Scenarios are normalize_scenario() dicts. A failed NEO lookup or DEM
+    read only affects the records concerned, which carry an "error" field
+    instead of results. With a ScenarioExecutor the NEO records are loaded here
+    once and the chunks run on its worker processes.
+    """
+    cache = _AsteroidCache()
+    if executor is None:
+        for start in range(0, len(scenarios), chunk_size):
+            yield from _run_chunk(scenarios[start:start + chunk_size], start, cache)
+        return
+
+    for aid in dict.fromkeys(s["asteroid_id"] for s in scenarios):
+        cache.neo(aid)
+    # Enough chunks to keep every worker busy, but not so small that IPC dominates
+    per_worker = -(-len(scenarios) // (4 * max(1, executor.max_workers)))
+    chunk_size = max(MIN_POOL_CHUNK, min(chunk_size, per_worker))
+    for rows in executor.map_chunks(run_chunk_task, scenarios, chunk_size, cache.neos):
+        yield from rows
+
+
+# -------------------------
+# Output
+# -------------------------
+def _finite(obj):
+    # JSON has no NaN/inf; report them as null
+    if isinstance(obj, float):
+        return obj if obj == obj and obj not in (float("inf"), float("-inf")) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    return obj
+
+
+def iter_ndjson(rows):
+    """NDJSON bytes, one line per record (suitable for a StreamingResponse)."""
+    for row in rows:
+        yield (json.dumps(_finite(row)) + "\n").encode()
+
+
+def flatten_result(row: dict) -> dict:
+    """Record -> {dotted column: value} for every RESULT_COLUMNS entry (None if absent)."""
+    return columnar.flatten(row, RESULT_COLUMNS)
+
+
+def write_parquet(rows, sink, row_group_size: int = 50_000) -> int:
+    """
+    Stream records into a Parquet file (path or binary file object), one
+    row group per row_group_size records. Returns the number of rows.
+    """
+    return columnar.write_parquet(rows, sink, RESULT_COLUMNS, row_group_size)
+
+
+def run_batch_file(scenario_path, out_path, fmt: str = None, dem_source: str = "auto",
+                   propagate_days: int = 30, executor=None) -> int:
+    """CLI entry point: scenario file in, NDJSON, Parquet or Arrow stream out. Returns the record count."""
+    scenarios = load_scenarios(scenario_path, dem_source, propagate_days)
+    if fmt is None:
+        ext = Path(out_path).suffix.lower()
+        fmt = "parquet" if ext == ".parquet" else "arrow" if ext in (".arrow", ".arrows") else "ndjson"
+    print(f"Running {len(scenarios)} scenarios "
+          f"({len({s['asteroid_id'] for s in scenarios})} asteroids) -> {out_path} [{fmt}]")
+
+    rows = run_batch(scenarios, executor=executor)
+    if fmt in columnar.FORMATS:
+        count = columnar.write_file(rows, out_path, RESULT_COLUMNS, fmt)
+    elif fmt == "ndjson":
+        count = 0
+        with open(out_path, "wb") as fh:
+            for line in iter_ndjson(rows):
+                fh.write(line)
+                count += 1
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+    print(f"✅ Wrote {count} records to {out_path}")
+    return count
@@ -0,0 +1,76 @@
+"""
+Process-pool scaling.
+
+    python -m backend.benchmarks.bench_executor [--objects 20000] [--steps 365] [--workers 1,2,4,8]
+
+Runs the same CPU-bound job (propagate a synthetic catalog over a daily
+grid, then the physics core for every object) inline and on
+ScenarioExecutor pools of increasing size, and reports throughput and
+parallel efficiency relative to one worker.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from backend.benchmarks.bench_propagation import EPOCH_JD, synthetic_catalog
+from backend.executor import ScenarioExecutor
+from backend.simulation.physics import impact_consequences
+from backend.simulation.propagator import ELEMENT_KEYS, propagate_elements
+
+
+def orbit_and_physics_task(objects, offset: int, steps: int) -> float:
+    """One chunk of synthetic objects; returns a checksum so results can be compared."""
+    n = len(objects)
+    el = synthetic_catalog(n, seed=offset)
+    r = propagate_elements(*(el[k] for k in ELEMENT_KEYS), EPOCH_JD + np.arange(steps, dtype=np.float64))
+    rng = np.random.default_rng(offset)
+    phys = impact_consequences(rng.uniform(0.01, 1.0, n), rng.uniform(11, 40, n))
+    return float(np.nansum(np.linalg.norm(r, axis=-1)) + phys["energy_mt"].sum())
+
+
+def run(executor, n_objects: int, steps: int, chunk: int):
+    objects = list(range(n_objects))
+    t0 = time.perf_counter()
+    checksum = sum(executor.map_chunks(orbit_and_physics_task, objects, chunk, steps))
+    return time.perf_counter() - t0, checksum
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=365)
+    parser.add_argument("--chunk", type=int, default=500)
+    parser.add_argument("--workers", default=None, help="Comma-separated pool sizes (default 1,2,4,... up to the CPU count)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        sizes = [int(w) for w in args.workers.split(",")]
+    else:
+        sizes = sorted({1, cpus} | {2 ** k for k in range(1, 8) if 2 ** k < cpus})
+
+    dt, ref = run(ScenarioExecutor(max_workers=0), args.objects, args.steps, args.chunk)
+    print(f"inline:     {dt:7.3f} s  ({args.objects / dt:,.0f} objects/s)")
+
+    # Speed-up is always relative to a measured one-worker pool, even if --workers leaves it out
+    base = None
+    for w in [1] + [w for w in sizes if w != 1]:
+        pool = ScenarioExecutor(max_workers=w, max_pending=2 * w)
+        try:
+            pool.start()  # warm-up is not part of the measurement
+            dt, checksum = run(pool, args.objects, args.steps, args.chunk)
+        finally:
+            pool.shutdown()
+        if w == 1:
+            base = dt
+            if 1 not in sizes:
+                continue
+        status = "OK" if np.isclose(checksum, ref) else "MISMATCH"
+        print(f"{w:2d} workers: {dt:7.3f} s  ({args.objects / dt:,.0f} objects/s, "
+              f"speed-up {base / dt:.2f}x, efficiency {base / dt / w * 100:.0f}%) {status}")
+
+
+if __name__ == "__main__":
+    main()
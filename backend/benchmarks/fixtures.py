@@ -0,0 +1,132 @@
+"""
+Offline fixtures for the benchmark suite.
+
+- make_dem_fixtures() writes synthetic GeoTIFFs laid out like backend/data
+  (usgs/ 1-degree tiles, srtm/srtm_sample.tif, gebco/gebco_sample.tif), so
+  DEM_DATA_DIR can point at them. The terrain is a deterministic function of
+  lat/lon with land and sea, and some nodata, so every code path is hit.
+- load_neo_fixture() returns a recorded NeoWs lookup response (Apophis).
+- serve_neo_fixture() serves that record on a local port as a stand-in for
+  the NeoWs API (use its URL as NASA_NEO_BASE_URL).
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+NEO_FIXTURE = FIXTURES_DIR / "neo_2099942.json"
+
+# Bump when the generated rasters change so cached copies are rebuilt
+DEM_FIXTURE_VERSION = "1"
+NODATA = -32768
+
+# 2 x 2 one-degree USGS tiles (named by their north-west corner), 1/1200 deg pixels
+USGS_TILES = [(29, -90), (29, -89), (30, -90), (30, -89)]
+USGS_RES = 1 / 1200
+# Regional SRTM-like raster and a global GEBCO-like one
+SRTM_BOUNDS = (-100.0, 20.0, -80.0, 40.0)  # left, bottom, right, top
+SRTM_RES = 0.02
+GEBCO_RES = 0.25
+
+
+def terrain(lats, lons) -> np.ndarray:
+    """Smooth synthetic elevation (m): continents up to ~3 km, oceans down to ~-5 km."""
+    lat_r, lon_r = np.radians(lats), np.radians(lons)
+    z = (
+        2500 * np.sin(3 * lon_r) * np.cos(2 * lat_r)
+        + 1500 * np.cos(5 * lat_r + 1.0)
+        + 120 * np.sin(40 * lon_r) * np.sin(35 * lat_r)
+        - 800
+    )
+    return z
+
+
+def _write_raster(path: Path, left: float, top: float, res: float, width: int, height: int, dtype):
+    import rasterio
+    from rasterio.transform import from_origin
+
+    cols = left + (np.arange(width) + 0.5) * res
+    rows = top - (np.arange(height) + 0.5) * res
+    lons, lats = np.meshgrid(cols, rows)
+    data = terrain(lats, lons).astype(dtype)
+    # A nodata patch in the corner exercises the fallback paths
+    data[: height // 20, : width // 20] = NODATA
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with rasterio.open(
+        path, "w", driver="GTiff", width=width, height=height, count=1, dtype=dtype,
+        crs="EPSG:4326", transform=from_origin(left, top, res, res), nodata=NODATA,
+        tiled=True, blockxsize=256, blockysize=256, compress="deflate",
+    ) as dst:
+        dst.write(data, 1)
+
+
+def make_dem_fixtures(root: Path) -> Path:
+    """Write (once per DEM_FIXTURE_VERSION) the synthetic DEM tree under root."""
+    root = Path(root)
+    stamp = root / ".fixture_version"
+    if stamp.exists() and stamp.read_text() == DEM_FIXTURE_VERSION:
+        return root
+
+    n = round(1 / USGS_RES)
+    for top, left in USGS_TILES:
+        name = f"USGS_1_n{top:02d}w{-left:03d}_synthetic.tif"
+        _write_raster(root / "usgs" / name, left, top, USGS_RES, n, n, "float32")
+
+    left, bottom, right, top = SRTM_BOUNDS
+    _write_raster(
+        root / "srtm" / "srtm_sample.tif", left, top, SRTM_RES,
+        round((right - left) / SRTM_RES), round((top - bottom) / SRTM_RES), "int16",
+    )
+    _write_raster(
+        root / "gebco" / "gebco_sample.tif", -180.0, 90.0, GEBCO_RES,
+        round(360 / GEBCO_RES), round(180 / GEBCO_RES), "int16",
+    )
+    stamp.write_text(DEM_FIXTURE_VERSION)
+    return root
+
+
+def usgs_points(n: int, seed: int = 0):
+    """Random (lats, lons) inside the synthetic USGS tiles."""
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(28.0, 30.0, n)
+    lons = rng.uniform(-90.0, -88.0, n)
+    return lats, lons
+
+
+def global_points(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-80.0, 80.0, n), rng.uniform(-180.0, 180.0, n)
+
+
+def load_neo_fixture() -> dict:
+    return json.loads(NEO_FIXTURE.read_text())
+
+
+class _NeoHandler(BaseHTTPRequestHandler):
+    record = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        # Any id gets the recorded body, relabelled so per-id caches stay distinct
+        asteroid_id = self.path.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+        body = dict(self.record, id=asteroid_id, neo_reference_id=asteroid_id)
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve_neo_fixture():
+    """Start a local NeoWs stand-in. Returns (server, base URL for NASA_NEO_BASE_URL)."""
+    handler = type("NeoHandler", (_NeoHandler,), {"record": load_neo_fixture()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, name="neo-fixture", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/neo"
@@ -0,0 +1,79 @@
+"""
+Import cost of the API, per module.
+
+    python -m backend.benchmarks.startup_time [--module backend.app] [--top 25] [--json out.json]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter,
+so nothing is cached, and reports the wall time plus the modules with the
+largest cumulative import time. Pass --json to keep a record that can be
+diffed between commits.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def measure(module: str) -> dict:
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = {"self_ms": int(self_us) / 1000, "cumulative_ms": int(cum_us) / 1000}
+    return {"module": module, "wall_s": round(wall, 3), "modules": modules}
+
+
+def top_level(modules: dict) -> dict:
+    """Self time summed per top-level package (numpy, rasterio, backend, ...)."""
+    totals = {}
+    for name, t in modules.items():
+        root = name.split(".")[0]
+        totals[root] = totals.get(root, 0.0) + t["self_ms"]
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="backend.app")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", type=Path, default=None, help="Write the full measurement here")
+    args = parser.parse_args()
+
+    result = measure(args.module)
+    print(f"import {args.module}: {result['wall_s']:.3f} s wall (including interpreter start)")
+
+    print(f"\nTop {args.top} modules by cumulative import time:")
+    ranked = sorted(result["modules"].items(), key=lambda kv: -kv[1]["cumulative_ms"])
+    for name, t in ranked[:args.top]:
+        print(f"  {t['cumulative_ms']:9.1f} ms  {name}")
+
+    print("\nSelf time per top-level package:")
+    for root, ms in list(top_level(result["modules"]).items())[:args.top]:
+        print(f"  {ms:9.1f} ms  {root}")
+
+    if args.json:
+        result["packages_ms"] = top_level(result["modules"])
+        args.json.write_text(json.dumps(result, indent=2))
+        print(f"\n✅ Saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Offline benchmark suite with stored baselines.
+
+    python -m backend.benchmarks.suite [--only elevation,orbit,physics,api]
+                                       [--save-baseline] [--baseline PATH]
+                                       [--threshold 1.25] [--json out.json]
+
+Everything runs against local fixtures (see backend/benchmarks/fixtures.py):
+synthetic GeoTIFFs for the DEM lookups and a recorded NeoWs response served
+from a local stand-in for the NASA API, so no network or real DEM data is
+needed. Groups:
+
+- elevation: get_elevation() per source and get_elevations() batches
+- orbit:     orbit_from_elements() + propagate_orbit() on the NEO fixture,
+             and the vectorized propagator for comparison
+- physics:   impact_consequences() scalar and vectorized, Monte Carlo
+- api:       /api/simulate under concurrent load (cold: a new impact site
+             per request, warm: the same site again), against a uvicorn
+             server started on a free local port
+
+Every metric is seconds per operation (lower is better), the median of
+several repeats. --save-baseline stores the run; later runs are compared
+with it and any metric slower than baseline x threshold is flagged as a
+REGRESSION (exit status 1). Baselines are machine-specific: save one per
+machine, or compare against one taken on the same runner in CI.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+from backend.benchmarks.fixtures import (
+    global_points, load_neo_fixture, make_dem_fixtures, serve_neo_fixture, usgs_points,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_FIXTURES = REPO_ROOT / "backend" / "data" / "bench_fixtures"
+GROUPS = ("elevation", "orbit", "physics", "api")
+DEFAULT_THRESHOLD = 1.25
+
+
+def measure(fn, repeat: int = 5) -> dict:
+    """Median/min seconds per call of fn(), timeit-style (auto-ranged loop count)."""
+    fn()  # warm caches and imports outside the measurement
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    per_call = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"seconds": statistics.median(per_call), "min_seconds": min(per_call), "calls": number * repeat}
+
+
+def skipped(reason: str) -> dict:
+    return {"skipped": reason}
+
+
+# -------------------------
+# Groups
+# -------------------------
+def bench_elevation(repeat: int) -> dict:
+    from backend.simulation.usgs_data import get_elevation, get_elevations
+
+    lats, lons = usgs_points(10_000)
+    glats, glons = global_points(10_000)
+    single = iter(range(10 ** 9))
+
+    def one(source, pts):
+        def call():
+            k = next(single) % 1000
+            try:
+                return get_elevation(pts[0][k], pts[1][k], source)
+            except (FileNotFoundError, ValueError):
+                # Points in the fixtures' nodata patches: a miss is still a lookup
+                return None
+        return call
+
+    return {
+        "elevation.single.usgs": measure(one("usgs", (lats, lons)), repeat),
+        "elevation.single.srtm": measure(one("srtm", (lats, lons)), repeat),
+        "elevation.single.gebco": measure(one("gebco", (glats, glons)), repeat),
+        "elevation.batch10k.usgs": measure(lambda: get_elevations(lats, lons, "usgs"), repeat),
+        "elevation.batch10k.auto": measure(lambda: get_elevations(glats, glons, "auto"), repeat),
+    }
+
+
+def bench_orbit(repeat: int) -> dict:
+    from backend.api.nasa_api import extract_key_fields
+    from backend.simulation.propagator import ELEMENT_KEYS, elements_from_orbital_data, propagate_elements
+
+    orbital_data = extract_key_fields(load_neo_fixture())["orbital_data"]
+    el = elements_from_orbital_data([orbital_data])
+    times = float(orbital_data["epoch_osculation"]) + np.arange(365, dtype=np.float64)
+    out = {
+        "orbit.vectorized.365d": measure(
+            lambda: propagate_elements(*(el[k] for k in ELEMENT_KEYS), times), repeat
+        ),
+    }
+
+    try:
+        from backend.simulation.orbital import orbit_from_elements, propagate_orbit
+
+        orbit = orbit_from_elements(orbital_data)
+    except ImportError as e:
+        reason = f"poliastro not available ({e})"
+        out["orbit.from_elements"] = skipped(reason)
+        out["orbit.propagate.30d"] = skipped(reason)
+        return out
+
+    out["orbit.from_elements"] = measure(lambda: orbit_from_elements(orbital_data), repeat)
+    out["orbit.propagate.30d"] = measure(lambda: propagate_orbit(orbit, 30), repeat)
+    return out
+
+
+def bench_physics(repeat: int) -> dict:
+    from backend.api.nasa_api import extract_key_fields
+    from backend.simulation.monte_carlo import run_monte_carlo
+    from backend.simulation.physics import impact_consequences
+
+    neo = load_neo_fixture()
+    key = extract_key_fields(neo)
+    d_min = neo["estimated_diameter"]["kilometers"]["estimated_diameter_min"]
+    rng = np.random.default_rng(0)
+    diam, vel = rng.uniform(0.01, 2.0, 100_000), rng.uniform(11.0, 40.0, 100_000)
+
+    return {
+        "physics.scalar": measure(lambda: impact_consequences(0.5, 20.0), repeat),
+        "physics.vector100k": measure(lambda: impact_consequences(diam, vel), repeat),
+        "physics.montecarlo100k": measure(
+            lambda: run_monte_carlo(key, d_min, n_samples=100_000, seed=1), repeat
+        ),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_api(env: dict, port: int, timeout: float = 180.0):
+    """uvicorn backend.app:app on a local port; returns once /ready answers 200."""
+    import httpx
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API server exited with status {proc.returncode}")
+        try:
+            resp = httpx.get(f"http://127.0.0.1:{port}/ready", timeout=2)
+        except httpx.HTTPError:
+            time.sleep(0.5)
+            continue
+        if resp.status_code == 200:
+            return proc
+        status = resp.json()
+        if status.get("finished"):
+            # Warm-up is over but an import failed: simulations cannot run
+            failed = {k: v for k, v in status["modules"].items() if v != "loaded"}
+            proc.terminate()
+            raise RuntimeError(f"API server not ready: {failed}")
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("API server did not become ready in time")
+
+
+async def _load(url: str, bodies: list, concurrency: int) -> dict:
+    import httpx
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(client, body):
+        async with sem:
+            t0 = time.perf_counter()
+            resp = await client.post(url, json=body)
+            latencies.append(time.perf_counter() - t0)
+            if resp.status_code != 200:
+                errors.append(f"{resp.status_code}: {resp.text[:200]}")
+
+    async with httpx.AsyncClient(timeout=120) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(client, b) for b in bodies))
+        wall = time.perf_counter() - t0
+
+    if errors:
+        return skipped(f"{len(errors)}/{len(bodies)} requests failed, first: {errors[0]}")
+    lat = np.array(latencies)
+    return {
+        # Wall time per request at this concurrency (inverse throughput)
+        "seconds": wall / len(bodies),
+        "p50_seconds": float(np.percentile(lat, 50)),
+        "p95_seconds": float(np.percentile(lat, 95)),
+        "calls": len(bodies),
+        "concurrency": concurrency,
+    }
+
+
+def bench_api(repeat: int, dem_dir: Path, requests: int = 200, concurrency: int = 16) -> dict:
+    try:
+        import httpx  # noqa: F401
+        import uvicorn  # noqa: F401
+    except ImportError as e:
+        return {"api.simulate.cold": skipped(str(e)), "api.simulate.warm": skipped(str(e))}
+
+    server, neo_url = serve_neo_fixture()
+    work = Path(tempfile.mkdtemp(prefix="meteor-bench-"))
+    env = dict(
+        os.environ,
+        NASA_NEO_BASE_URL=neo_url,
+        NASA_API_KEY="bench",
+        NASA_RATE_LIMIT_PER_HOUR="1e9",
+        DEM_DATA_DIR=str(dem_dir),
+        METEOR_CACHE_DIR=str(work / "cache"),
+        METEOR_RESULTS_DIR=str(work / "results"),
+        METEOR_JOBS_DIR=str(work / "jobs"),
+        NEO_CATALOG_PATH=str(work / "no_catalog.sqlite"),
+        LOG_LEVEL="WARNING",
+    )
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/simulate"
+    try:
+        proc = _start_api(env, port)
+    except RuntimeError as e:
+        server.shutdown()
+        return {"api.simulate.cold": skipped(str(e)), "api.simulate.warm": skipped(str(e))}
+    try:
+        lats, lons = usgs_points(requests * repeat, seed=7)
+        cold = [
+            {"asteroid_id": "2099942", "impact_lat": float(a), "impact_lon": float(o)}
+            for a, o in zip(lats, lons)
+        ]
+        warm = [{"asteroid_id": "2099942", "impact_lat": 29.5, "impact_lon": -89.5}] * requests
+
+        asyncio.run(_load(url, warm[:concurrency], concurrency))  # first NEO fetch, pool warm-up
+        cold_runs = [
+            asyncio.run(_load(url, cold[i * requests:(i + 1) * requests], concurrency))
+            for i in range(repeat)
+        ]
+        warm_runs = [asyncio.run(_load(url, warm, concurrency)) for _ in range(repeat)]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+        server.shutdown()
+
+    return {"api.simulate.cold": _median_run(cold_runs), "api.simulate.warm": _median_run(warm_runs)}
+
+
+def _median_run(runs: list) -> dict:
+    failed = [r for r in runs if "skipped" in r]
+    if failed:
+        return failed[0]
+    return sorted(runs, key=lambda r: r["seconds"])[len(runs) // 2]
+
+
+# -------------------------
+# Baselines
+# -------------------------
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """(name, baseline s, current s, ratio, verdict) for metrics present in both runs."""
+    rows = []
+    for name, cur in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "seconds" not in base or "seconds" not in cur:
+            continue
+        ratio = cur["seconds"] / base["seconds"]
+        if ratio > threshold:
+            verdict = "REGRESSION"
+        elif ratio < 1 / threshold:
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, base["seconds"], cur["seconds"], ratio, verdict))
+    return rows
+
+
+def _fmt(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.3f} s "
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(GROUPS), help="Comma-separated groups to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES, help="Where synthetic DEMs are generated")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Flag metrics slower than baseline x threshold")
+    parser.add_argument("--json", type=Path, default=None, help="Also write this run here")
+    parser.add_argument("--api-requests", type=int, default=200)
+    parser.add_argument("--api-concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+
+    dem_dir = make_dem_fixtures(args.fixtures)
+    # Must be set before backend.simulation.usgs_data is imported
+    os.environ["DEM_DATA_DIR"] = str(dem_dir)
+
+    results = {}
+    for group in groups:
+        print(f"Running {group} benchmarks...", flush=True)
+        if group == "api":
+            results.update(bench_api(args.repeat, dem_dir, args.api_requests, args.api_concurrency))
+        else:
+            results.update(globals()[f"bench_{group}"](args.repeat))
+
+    run = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "machine": machine_info(), "results": results}
+
+    print()
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"  {name:28s}  skipped: {r['skipped']}")
+        else:
+            extra = f"  p95 {_fmt(r['p95_seconds'])}" if "p95_seconds" in r else ""
+            print(f"  {name:28s} {_fmt(r['seconds'])}{extra}")
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("machine") != run["machine"]:
+            print("\n⚠️ Baseline was recorded on a different machine; ratios are only indicative")
+        print(f"\nAgainst {args.baseline} (threshold {args.threshold:.2f}x):")
+        for name, base, cur, ratio, verdict in compare(results, baseline, args.threshold):
+            print(f"  {name:28s} {_fmt(base)} -> {_fmt(cur)}  {ratio:5.2f}x  {verdict}")
+            if verdict == "REGRESSION":
+                regressions.append(name)
+
+    if args.json:
+        args.json.write_text(json.dumps(run, indent=2))
+        print(f"\n✅ Saved to {args.json}")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2))
+        print(f"\n✅ Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# backend/columnar.py
+"""
+Arrow and Parquet output for streams of records.
+
+A column layout is a list of (dotted path, Arrow type name) pairs, such as
+batch.RESULT_COLUMNS. Each record is flattened along it, so nested
+simulation results and flat catalog rows go through the same writers.
+Records are gathered into record batches of batch_rows. Each batch becomes
+one Parquet row group, with per-column min/max statistics so readers can
+skip row groups, or one Arrow IPC stream message.
+
+The iter_* functions yield the encoded bytes as each batch is written, so
+an HTTP response can stream a large export without building it in memory.
+pyarrow is imported only when one of the writers is used.
+"""
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+FORMATS = {"parquet": PARQUET_MEDIA_TYPE, "arrow": ARROW_STREAM_MEDIA_TYPE}
+
+DEFAULT_BATCH_ROWS = 50_000
+# Batches for streamed responses: small enough that bytes start flowing early
+STREAM_BATCH_ROWS = 5_000
+PARQUET_COMPRESSION = "zstd"
+
+
+def flatten(row: dict, columns) -> dict:
+    """Record -> {dotted column: value} for every column (None if absent)."""
+    flat = {}
+    for col, _ in columns:
+        value = row
+        for part in col.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        flat[col] = value
+    return flat
+
+
+def arrow_schema(columns):
+    import pyarrow as pa
+
+    return pa.schema([(col, getattr(pa, typ)()) for col, typ in columns])
+
+
+def record_batches(rows, columns, batch_rows: int = DEFAULT_BATCH_ROWS):
+    """pyarrow RecordBatches of up to batch_rows flattened records (none for no rows)."""
+    import pyarrow as pa
+
+    schema = arrow_schema(columns)
+    names = [col for col, _ in columns]
+    data, n = {c: [] for c in names}, 0
+    for row in rows:
+        for col, value in flatten(row, columns).items():
+            data[col].append(value)
+        n += 1
+        if n >= batch_rows:
+            yield pa.RecordBatch.from_pydict(data, schema=schema)
+            data, n = {c: [] for c in names}, 0
+    if n:
+        yield pa.RecordBatch.from_pydict(data, schema=schema)
+
+
+def _parquet_writer(sink, schema):
+    import pyarrow.parquet as pq
+
+    return pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION, write_statistics=True)
+
+
+def write_parquet(rows, sink, columns, row_group_size: int = DEFAULT_BATCH_ROWS) -> int:
+    """
+    Stream records into a Parquet file (path or binary file object), one
+    row group per row_group_size records. Returns the number of rows.
+    """
+    import pyarrow as pa
+
+    count = 0
+    with _parquet_writer(sink, arrow_schema(columns)) as writer:
+        for batch in record_batches(rows, columns, row_group_size):
+            writer.write_table(pa.Table.from_batches([batch]))
+            count += batch.num_rows
+    return count
+
+
+def write_arrow_stream(rows, sink, columns, batch_rows: int = DEFAULT_BATCH_ROWS) -> int:
+    """Records as an Arrow IPC stream (path or binary file object). Returns the number of rows."""
+    import pyarrow as pa
+
+    count = 0
+    with pa.ipc.new_stream(sink, arrow_schema(columns)) as writer:
+        for batch in record_batches(rows, columns, batch_rows):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+class _Chunks:
+    """Write-only file object that holds what was written until drain()."""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_parquet(rows, columns, row_group_size: int = STREAM_BATCH_ROWS):
+    """write_parquet() as a byte stream: one piece per row group, then the footer."""
+    import pyarrow as pa
+
+    sink = _Chunks()
+    with _parquet_writer(sink, arrow_schema(columns)) as writer:
+        for batch in record_batches(rows, columns, row_group_size):
+            writer.write_table(pa.Table.from_batches([batch]))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_arrow_stream(rows, columns, batch_rows: int = STREAM_BATCH_ROWS):
+    """write_arrow_stream() as a byte stream: the schema first, then one message per batch."""
+    import pyarrow as pa
+
+    sink = _Chunks()
+    with pa.ipc.new_stream(sink, arrow_schema(columns)) as writer:
+        yield sink.drain()
+        for batch in record_batches(rows, columns, batch_rows):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def write_file(rows, path, columns, fmt: str = None) -> int:
+    """Parquet or Arrow stream file, by fmt or else the path's extension (.parquet, .arrow/.arrows)."""
+    fmt = fmt or ("parquet" if str(path).endswith(".parquet") else "arrow")
+    if fmt == "parquet":
+        return write_parquet(rows, str(path), columns)
+    if fmt == "arrow":
+        return write_arrow_stream(rows, str(path), columns)
+    raise ValueError(f"Unknown columnar format: {fmt}")
@@ -1,8 +1,36 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load .env file
 load_dotenv()
 
 NASA_API_KEY = os.getenv("NASA_API_KEY", "DEMO_KEY")
-BASE_URL = "https://api.nasa.gov/neo/rest/v1/neo"
\ No newline at end of file
+# Overridable so tests can point at a local stub server
+BASE_URL = os.getenv("NASA_NEO_BASE_URL", "https://api.nasa.gov/neo/rest/v1/neo")
+
+# Local caches (backend/data is git-ignored)
+CACHE_DIR = Path(os.getenv("METEOR_CACHE_DIR", Path(__file__).resolve().parent / "data" / "cache"))
+
+# Content-addressed simulation results (see backend/result_store.py)
+RESULTS_DIR = Path(os.getenv("METEOR_RESULTS_DIR", Path(__file__).resolve().parent / "data" / "results"))
+
+# Simulation job store (state, progress and results of /api/jobs)
+JOBS_DIR = Path(os.getenv("METEOR_JOBS_DIR", Path(__file__).resolve().parent / "data" / "jobs"))
+
+# Local NEO catalog filled by `python -m backend.api.neo_catalog`
+NEO_CATALOG_PATH = Path(
+    os.getenv("NEO_CATALOG_PATH", Path(__file__).resolve().parent / "data" / "neo_catalog.sqlite")
+)
+
+# NEO response cache: fresh for NEO_CACHE_TTL seconds, then served stale
+# for up to NEO_CACHE_STALE_TTL seconds while it refreshes in the background
+NEO_CACHE_TTL = int(os.getenv("NEO_CACHE_TTL", 6 * 3600))
+NEO_CACHE_STALE_TTL = int(os.getenv("NEO_CACHE_STALE_TTL", 7 * 24 * 3600))
+NEO_CACHE_SIZE = int(os.getenv("NEO_CACHE_SIZE", 512))
+
+# NASA API client: hourly quota (DEMO_KEY allows 30/h, personal keys 1000/h)
+NASA_RATE_LIMIT_PER_HOUR = float(
+    os.getenv("NASA_RATE_LIMIT_PER_HOUR", 30 if NASA_API_KEY == "DEMO_KEY" else 1000)
+)
+NASA_MAX_CONCURRENCY = int(os.getenv("NASA_MAX_CONCURRENCY", 8))
@@ -0,0 +1,296 @@
+# backend/executor.py
+"""
+Process pool for CPU-bound simulation work.
+
+Orbit propagation, raster decoding and the physics kernels hold the GIL,
+so one API worker only ever uses one core. ScenarioExecutor keeps a pool
+of warm worker processes (WARM_MODULES and the simulation modules already
+imported) and hands them work:
+
+- submit() for a single call, with backpressure: at most max_pending
+  tasks are queued, further submits wait (or raise ExecutorBusy).
+- map_chunks() for batch work: items are cut into chunks, at most
+  max_pending chunks are in flight, results come back in input order,
+  and closing the generator (or cancel()) cancels what has not started.
+
+If a worker dies (segfault, OOM kill), the whole pool is broken. Tasks in
+flight then fail with BrokenProcessPool. The next submit() replaces the
+pool with a fresh, warmed-up one. map_chunks() re-runs each failed chunk
+once on the new pool.
+
+SIM_WORKERS=0 runs everything inline in the calling process instead.
+"""
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.warmup import WARM_MODULES
+
+logger = logging.getLogger(__name__)
+
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", str(os.cpu_count() or 1)))
+SIM_MAX_PENDING = int(os.getenv("SIM_MAX_PENDING", str(max(4, 2 * SIM_WORKERS))))
+# Workers must not inherit the API's threads and open sockets
+START_METHOD = os.getenv("SIM_START_METHOD", "spawn")
+
+# Imported in every worker before it accepts work
+WORKER_MODULES = WARM_MODULES + [
+    "backend.simulation.physics",
+    "backend.simulation.propagator",
+    "backend.simulation.usgs_data",
+    "backend.batch",
+    "backend.main",
+]
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when the pending queue stays full for longer than the caller waits."""
+
+
+def _warm_worker(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f"Worker {os.getpid()} could not import {name}: {e}")
+
+
+def _ping():
+    return os.getpid()
+
+
+def _tracked(fn, args, kwargs, profile_path=None):
+    """
+    Run fn on a worker and send back, with its result, the timing spans it
+    recorded and that worker's memo counters (optionally under cProfile).
+    """
+    from backend.memo import memo_stats
+    from backend.metrics import profiled, trace
+
+    with trace() as spans, profiled(profile_path):
+        result = fn(*args, **kwargs)
+    return result, os.getpid(), memo_stats(), spans
+
+
+class _TaskFuture(Future):
+    """The caller's view of a pool task: fn's plain result, cancellable like the task itself."""
+
+    def __init__(self, inner):
+        super().__init__()
+        self._inner = inner
+        self.spans = []
+
+    def cancel(self):
+        return self._inner.cancel()
+
+
+class _InlineFuture:
+    """Result holder with the Future methods callers use, for SIM_WORKERS=0."""
+
+    def __init__(self, fn, args, kwargs, profile_path=None):
+        from backend.metrics import profiled, trace
+
+        self._exc = None
+        self._result = None
+        with trace() as self.spans:
+            try:
+                with profiled(profile_path):
+                    self._result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._exc = e
+
+    def result(self, timeout=None):
+        if self._exc is not None:
+            raise self._exc
+        return self._result
+
+    def cancel(self):
+        return False
+
+    def done(self):
+        return True
+
+
+class ScenarioExecutor:
+    def __init__(self, max_workers: int = SIM_WORKERS, max_pending: int = SIM_MAX_PENDING,
+                 start_method: str = START_METHOD):
+        self.max_workers = max_workers
+        self.max_pending = max(1, max_pending)
+        self.start_method = start_method
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._futures = set()
+        self._worker_memo = {}  # pid -> latest memo_stats() from that worker
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0, "restarts": 0}
+
+    @property
+    def inline(self) -> bool:
+        return self.max_workers <= 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_warm_worker,
+            initargs=(WORKER_MODULES,),
+        )
+
+    def _warm(self, pool: ProcessPoolExecutor):
+        # One ping per worker forces them all to spawn and run the initializer
+        for f in [pool.submit(_ping) for _ in range(self.max_workers)]:
+            f.result()
+
+    def start(self):
+        """Create the pool and wait until every worker has finished its imports."""
+        if self.inline:
+            return
+        with self._lock:
+            if self._pool is not None:
+                return
+            self._pool = pool = self._new_pool()
+        self._warm(pool)
+
+    def _restart(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Replace a pool broken by a dead worker (once, however many callers notice)."""
+        with self._lock:
+            replaced = self._pool is broken
+            if replaced:
+                self._pool = self._new_pool()
+                self.stats["restarts"] += 1
+            pool = self._pool
+        if replaced:
+            logger.warning("A simulation worker died; restarting the process pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._warm(pool)
+        return pool
+
+    def shutdown(self, cancel: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=cancel)
+
+    def _done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+            if future.cancelled():
+                self.stats["cancelled"] += 1
+            elif future.exception() is not None:
+                self.stats["failed"] += 1
+            else:
+                self.stats["completed"] += 1
+        self._slots.release()
+
+    def _resolve(self, outer: _TaskFuture, inner):
+        if inner.cancelled():
+            Future.cancel(outer)
+            outer.set_running_or_notify_cancel()
+        elif inner.exception() is not None:
+            outer.set_exception(inner.exception())
+        else:
+            from backend.metrics import STAGE_SECONDS
+
+            result, pid, memo, spans = inner.result()
+            with self._lock:
+                self._worker_memo[pid] = memo
+            for stage, seconds in spans:
+                STAGE_SECONDS.observe(seconds, stage)
+            outer.spans = spans
+            outer.set_result(result)
+
+    def submit(self, fn, *args, timeout: float = None, profile_path=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker and return its Future. fn must be
+        a picklable module-level function. Waits for a free slot when
+        max_pending tasks are already queued; raises ExecutorBusy if none
+        frees up within timeout seconds. The future's .spans holds the
+        timing spans fn recorded; profile_path dumps a cProfile of the call.
+        """
+        if self.inline:
+            return _InlineFuture(fn, args, kwargs, profile_path)
+        self.start()
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise ExecutorBusy(f"{self.max_pending} simulation tasks already pending")
+        pool = self._pool
+        try:
+            try:
+                inner = pool.submit(_tracked, fn, args, kwargs, profile_path)
+            except BrokenProcessPool:
+                inner = self._restart(pool).submit(_tracked, fn, args, kwargs, profile_path)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.add(inner)
+            self.stats["submitted"] += 1
+        inner.add_done_callback(self._done)
+        outer = _TaskFuture(inner)
+        inner.add_done_callback(lambda f: self._resolve(outer, f))
+        return outer
+
+    def map_chunks(self, fn, items, chunk_size: int, *args):
+        """
+        Yield fn(chunk, offset, *args) for consecutive chunks of items, in
+        order. Submission stops max_pending chunks ahead of the consumer, so
+        a slow reader holds back the producer. Closing the generator cancels
+        every chunk that has not started yet. A chunk lost to a dead worker
+        is run once more; a second failure is raised.
+        """
+        chunks = ((items[i:i + chunk_size], i) for i in range(0, len(items), chunk_size))
+        if self.inline:
+            for chunk, offset in chunks:
+                yield fn(chunk, offset, *args)
+            return
+
+        def result(entry):
+            future, chunk, offset = entry
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                logger.warning(f"Chunk at {offset} lost to a dead worker; retrying it")
+                return self.submit(fn, chunk, offset, *args).result()
+
+        in_flight = []  # (future, chunk, offset)
+        try:
+            for chunk, offset in chunks:
+                # Backpressure: never run further ahead than max_pending chunks
+                while len(in_flight) >= self.max_pending:
+                    yield result(in_flight.pop(0))
+                in_flight.append((self.submit(fn, chunk, offset, *args), chunk, offset))
+            while in_flight:
+                yield result(in_flight.pop(0))
+        finally:
+            for f, _, _ in in_flight:
+                f.cancel()
+
+    def cancel(self) -> int:
+        """Cancel every queued task that has not started. Returns how many."""
+        with self._lock:
+            pending = list(self._futures)
+        return sum(f.cancel() for f in pending)
+
+    def worker_memo_stats(self) -> list:
+        """Latest memo counters reported by each worker process."""
+        with self._lock:
+            return list(self._worker_memo.values())
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "mode": "inline" if self.inline else self.start_method,
+                "started": self._pool is not None,
+                "max_pending": self.max_pending,
+                "pending": len(self._futures),
+                **self.stats,
+            }
+
+
+executor = ScenarioExecutor()
@@ -0,0 +1,388 @@
+# backend/jobs.py
+"""
+Asynchronous simulation jobs.
+
+POST /api/jobs returns a job id straight away; the work runs on a local
+worker thread (CPU-heavy parts still go to the process pool in
+backend/executor.py), so long runs no longer hold an HTTP request open.
+Job state, progress and results live in a SQLite store under JOBS_DIR and
+survive restarts; batch results are written as NDJSON files next to it.
+No external broker is needed.
+
+Several API processes can share one store. Each job records the process
+that owns it, and that process refreshes the job's heartbeat while it is
+queued or running. A job is taken over (requeued by another process) only
+once its heartbeat is older than JOB_LEASE_S, i.e. its owner is gone.
+Cancelling sets a cancel_requested flag in the store. The owner checks it
+before a job starts and whenever it flushes progress, so any process can
+cancel any job. A running simulate or screening job is a single pool task
+and cannot be stopped part-way; cancel() refuses it.
+
+Job kinds:
+- "simulate": one run_simulation() call; params are SimulateRequest fields
+- "batch": a scenario list or asteroid x site grid (see backend/batch.py)
+- "screening": a close-approach screen of the local catalog
+  (see backend/simulation/screening.py)
+"""
+import json
+import os
+import queue
+import sqlite3
+import socket
+import threading
+import time
+import uuid
+
+from backend.config import JOBS_DIR
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_KINDS = ("simulate", "batch", "screening")
+TERMINAL = ("succeeded", "failed", "cancelled")
+# Progress is written to SQLite at most this often (memory is always current)
+PROGRESS_FLUSH_S = 0.5
+# Owners refresh their jobs' heartbeat this often; a job whose heartbeat is
+# older than the lease belongs to a dead process and may be taken over
+JOB_HEARTBEAT_S = float(os.getenv("JOB_HEARTBEAT_S", "5"))
+JOB_LEASE_S = float(os.getenv("JOB_LEASE_S", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    error TEXT,
+    result TEXT,
+    result_file TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    heartbeat REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+"""
+
+# Columns added after the first release: (name, type), applied by ALTER TABLE
+MIGRATIONS = [("owner", "TEXT"), ("heartbeat", "REAL"), ("cancel_requested", "INTEGER NOT NULL DEFAULT 0")]
+
+JOB_FIELDS = ["id", "kind", "params", "status", "done", "total", "error",
+              "result", "result_file", "created_at", "started_at", "finished_at", "owner"]
+# Kinds whose work is one pool task: they can be cancelled only while queued
+SINGLE_TASK_KINDS = ("simulate", "screening")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, jobs_dir=JOBS_DIR, workers: int = JOB_WORKERS):
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._live = {}  # id -> job dict for queued/running jobs
+        self._cancel = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = False
+        # Unique per process (and per queue), so a restarted pid is a new owner
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    # -------------------------
+    # Store
+    # -------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.jobs_dir / "jobs.sqlite"), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            have = {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}
+            for name, kind in MIGRATIONS:
+                if name not in have:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+            self._local.conn = conn
+        return conn
+
+    def _save(self, job: dict):
+        row = dict(job)
+        row["params"] = json.dumps(row["params"])
+        if row.get("result") is not None:
+            row["result"] = json.dumps(row["result"])
+        fields = JOB_FIELDS + ["heartbeat"]
+        conn = self._conn()
+        with conn:
+            # Every write by the owner doubles as a heartbeat. An upsert, so a
+            # cancel_requested flag set by another process is kept
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(fields)}) "
+                f"VALUES ({', '.join('?' * len(fields))}) "
+                f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{f} = excluded.{f}' for f in fields[1:])}",
+                tuple(row.get(f) for f in JOB_FIELDS) + (time.time(),),
+            )
+
+    def _load(self, job_id: str):
+        row = self._conn().execute(
+            f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_FIELDS, row))
+        job["params"] = json.loads(job["params"])
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def start(self):
+        """Start the worker threads and take over unfinished jobs whose owner is gone."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._reclaim()
+        for k in range(self.workers):
+            threading.Thread(target=self._work, name=f"job-worker-{k}", daemon=True).start()
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+
+    def _reclaim(self) -> int:
+        """Requeue queued/running jobs whose owner's lease expired. Returns how many."""
+        stale = time.time() - JOB_LEASE_S
+        conn = self._conn()
+        ids = [r[0] for r in conn.execute(
+            "SELECT id FROM jobs WHERE status IN ('queued', 'running') "
+            "AND owner IS NOT ? AND (heartbeat IS NULL OR heartbeat < ?) ORDER BY created_at",
+            (self.owner, stale))]
+        taken = 0
+        for job_id in ids:
+            # Conditional update: of several processes starting together, only one wins
+            with conn:
+                won = conn.execute(
+                    "UPDATE jobs SET owner = ?, heartbeat = ? WHERE id = ? "
+                    "AND status IN ('queued', 'running') AND (heartbeat IS NULL OR heartbeat < ?)",
+                    (self.owner, time.time(), job_id, stale),
+                ).rowcount
+            if not won:
+                continue
+            job = self._load(job_id)
+            job.update(status="queued", done=0, started_at=None, owner=self.owner)
+            self._enqueue(job)
+            taken += 1
+        return taken
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(JOB_HEARTBEAT_S)
+            try:
+                conn = self._conn()
+                with conn:
+                    conn.execute(
+                        "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                        (time.time(), self.owner),
+                    )
+                # Jobs of processes that died after this one started
+                self._reclaim()
+            except sqlite3.Error:
+                pass
+
+    def submit(self, kind: str, params: dict) -> dict:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of {', '.join(JOB_KINDS)}")
+        self.start()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "done": 0,
+            "total": None,
+            "error": None,
+            "result": None,
+            "result_file": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "owner": self.owner,
+        }
+        self._enqueue(job)
+        return self.status(job["id"])
+
+    def _enqueue(self, job: dict):
+        with self._lock:
+            self._live[job["id"]] = job
+        self._save(job)
+        self._queue.put(job["id"])
+
+    def get(self, job_id: str):
+        """Full job record (including the result), or None."""
+        with self._lock:
+            live = self._live.get(job_id)
+            if live is not None:
+                return {k: v for k, v in live.items() if not k.startswith("_")}
+        return self._load(job_id)
+
+    def status(self, job_id: str):
+        """Job record without params or result payload, plus a progress fraction."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.pop("params", None)
+        job.pop("result", None)
+        job.pop("result_file", None)
+        if job["status"] == "succeeded":
+            job["progress"] = 1.0
+        elif job["total"]:
+            job["progress"] = job["done"] / job["total"]
+        else:
+            job["progress"] = None
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a job, whichever process owns it. Returns
+        False if it has already finished, or is a running single-task job.
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] in TERMINAL:
+            return False
+        # Conditional on the stored status, so a job that starts meanwhile is not flagged
+        cancellable = ("queued",) if job["kind"] in SINGLE_TASK_KINDS else ("queued", "running")
+        conn = self._conn()
+        with conn:
+            flagged = conn.execute(
+                f"UPDATE jobs SET cancel_requested = 1 WHERE id = ? "
+                f"AND status IN ({', '.join('?' * len(cancellable))})",
+                (job_id, *cancellable),
+            ).rowcount
+        if flagged:
+            with self._lock:
+                self._cancel.add(job_id)
+        return bool(flagged)
+
+    def result_path(self, job_id: str):
+        return self.jobs_dir / f"{job_id}.ndjson"
+
+    # -------------------------
+    # Workers
+    # -------------------------
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._live.get(job_id)
+            if job is None:
+                continue
+            self._run(job)
+
+    def _check_cancel(self, job: dict):
+        with self._lock:
+            if job["id"] in self._cancel:
+                raise JobCancelled()
+
+    def _poll_cancel(self, job: dict):
+        """Pick up a cancel requested through the store (possibly by another process)."""
+        row = self._conn().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+        if row and row[0]:
+            with self._lock:
+                self._cancel.add(job["id"])
+
+    def _progress(self, job: dict, done: int, total=None, force: bool = False):
+        with self._lock:
+            job["done"] = done
+            if total is not None:
+                job["total"] = total
+        now = time.monotonic()
+        if force or now - job.get("_flushed", 0) >= PROGRESS_FLUSH_S:
+            job["_flushed"] = now
+            self._save(job)
+            self._poll_cancel(job)
+
+    def _run(self, job: dict):
+        with self._lock:
+            job.update(status="running", started_at=time.time())
+        self._save(job)
+        # After the save: a cancel flagged from now on is refused for single-task jobs
+        self._poll_cancel(job)
+        try:
+            self._check_cancel(job)
+            if job["kind"] == "simulate":
+                self._run_simulate(job)
+            elif job["kind"] == "screening":
+                self._run_screening(job)
+            else:
+                self._run_batch(job)
+            status, error = "succeeded", None
+        except JobCancelled:
+            status, error = "cancelled", None
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+        with self._lock:
+            job.update(status=status, error=error, finished_at=time.time())
+            self._cancel.discard(job["id"])
+        self._save(job)
+        with self._lock:
+            self._live.pop(job["id"], None)
+
+    def _run_simulate(self, job: dict):
+        from backend.executor import executor
+        from backend.main import run_simulation
+
+        self._progress(job, 0, total=1, force=True)
+        job["result"] = executor.submit(run_simulation, **job["params"]).result()
+        self._progress(job, 1, force=True)
+
+    def _run_screening(self, job: dict):
+        from backend.executor import executor
+        from backend.simulation.screening import run_screening
+
+        self._progress(job, 0, total=1, force=True)
+        job["result"] = executor.submit(run_screening, **job["params"]).result()
+        self._progress(job, 1, force=True)
+
+    def _run_batch(self, job: dict):
+        from backend.batch import iter_ndjson, run_batch
+        from backend.executor import executor
+
+        scenarios = batch_scenarios(job["params"])
+        self._progress(job, 0, total=len(scenarios), force=True)
+
+        path = self.result_path(job["id"])
+        tmp = path.with_suffix(".tmp")
+        rows = run_batch(scenarios, executor=executor)
+        done = 0
+        try:
+            with open(tmp, "wb") as fh:
+                for line in iter_ndjson(rows):
+                    fh.write(line)
+                    done += 1
+                    self._progress(job, done)
+                    self._check_cancel(job)
+        except BaseException:
+            rows.close()  # cancels chunks still queued on the pool
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, path)
+        job["result_file"] = path.name
+        job["result"] = {"records": done, "format": "ndjson"}
+        self._progress(job, done, force=True)
+
+
+def batch_scenarios(params: dict) -> list:
+    """Scenarios of a batch job from its BatchSimulateRequest params (ValueError if invalid)."""
+    from backend.batch import expand_scenarios
+
+    p = dict(params)
+    defaults = {k: p.pop(k) for k in ("dem_source", "propagate_days") if p.get(k) is not None}
+    explicit = p.pop("scenarios", None)
+    spec = explicit if explicit is not None else p
+    return expand_scenarios(spec, **defaults)
+
+
+job_queue = JobQueue()
@@ -3,12 +3,14 @@
 Integrated asteroid impact simulation runner (Steps 1-5).
 """
 
-import json
-from pathlib import Path
+import copy
+import logging
+import os
 from datetime import datetime
 
 # NASA / orbital
-from backend.api.nasa_api import fetch_neo_by_id, extract_key_fields
+from backend.api.nasa_api import extract_key_fields
+from backend.api.neo_catalog import get_neo
 from backend.simulation.orbital import (
     orbit_from_elements,
     propagate_orbit,
@@ -16,39 +18,60 @@ from backend.simulation.orbital import (
 )
 
 # Energy + risk
-from backend.simulation.impact_energy import compute_kinetic_energy, classify_risk
+from backend.simulation.impact_energy import classify_risk
+from backend.simulation.physics import impact_consequences
 
 # Consequences + DEM
-from backend.simulation.consequences import (
-    estimate_crater_size,
-    estimate_seismic_magnitude,
-    estimate_tsunami_height,
-)
-from backend.data.dem_loader import get_local_elevation
+from backend.simulation.consequences import get_local_elevation
 from backend.simulation.atmosphere import estimate_atmospheric_changes
 
-# Output path
-DATA_DIR = Path(__file__).resolve().parents[1] / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-OUT_PATH = DATA_DIR / "simulation_result.json"
+# Results, keyed by their inputs
+from backend.batch import BATCH_ONLY_COLUMNS, RESULT_COLUMNS as BATCH_RESULT_COLUMNS
+from backend.memo import Memo
+from backend.metrics import span
+from backend.result_store import record_version, result_key, result_store
+from backend.simulation.ephemeris import element_set_hash
+from backend.simulation.usgs_data import dem_version
+
+logger = logging.getLogger(__name__)
+
+# Per-stage memos; keys embed the NEO record / element set / DEM version
+result_memo = Memo("result", 256)
+orbit_memo = Memo("orbit", 1024)
+propagation_memo = Memo("propagation", 4096)
+elevation_memo = Memo("elevation", 65536)
+
+# Impact sites within this many degrees share one elevation lookup (~11 m)
+ELEVATION_QUANTUM_DEG = float(os.getenv("ELEVATION_QUANTUM_DEG", "1e-4"))
+
+# Column layout of run_simulation() results (SimulateResponse) for columnar export
+STORED_RESULT_COLUMNS = [("result_key", "string"), ("timestamp_utc", "string")] + [
+    c for c in BATCH_RESULT_COLUMNS if c[0] not in BATCH_ONLY_COLUMNS
+]
 
 
 def pretty_print_vec(name, vec):
     try:
         x, y, z = vec
-        print(f"{name}: X={x:.6f} AU, Y={y:.6f} AU, Z={z:.6f} AU")
+        logger.info(f"{name}: X={x:.6f} AU, Y={y:.6f} AU, Z={z:.6f} AU")
     except Exception:
-        print(f"{name}: {vec}")
+        logger.info(f"{name}: {vec}")
 
 
-def get_elevation_from_usgs_tiles(lat, lon):
-    """Wrapper around get_local_elevation (returns 0.0 if fails)."""
+def get_elevation_from_usgs_tiles(lat, lon, source="auto", dem_ver=None):
+    """Wrapper around get_local_elevation (returns 0.0 if fails), memoized per quantized site."""
+    q = ELEVATION_QUANTUM_DEG
+    mkey = (round(lat / q), round(lon / q), source, dem_ver or dem_version())
+    elev = elevation_memo.get(mkey)
+    if elev is not None:
+        return elev
     try:
-        elev = get_local_elevation(lat, lon)
-        print(f"✅ Elevation at ({lat}, {lon}): {elev:.2f} m")
+        elev = get_local_elevation(lat, lon, source)
+        logger.debug("Elevation at (%s, %s): %.2f m", lat, lon, elev)
+        elevation_memo.put(mkey, elev)
         return elev
     except Exception as e:
-        print(f"⚠️ DEM lookup failed at ({lat},{lon}): {e}")
+        logger.warning(f"DEM lookup failed at ({lat},{lon}): {e}")
         return 0.0
 
 
@@ -58,16 +81,31 @@ def run_simulation(
     impact_lon: float = -80.5,
     dem_source: str = "auto",
     propagate_days: int = 30,
+    use_store: bool = True,
 ):
-    print("=== ASTEROID SIMULATION ===")
-    print(f"Time (UTC): {datetime.utcnow().isoformat()}")
+    logger.info(f"Simulation for {asteroid_id} at ({impact_lat}, {impact_lon})")
 
     # ----------------------------
     # Step 1: Fetch asteroid data
     # ----------------------------
-    print("\n[1] Fetching asteroid data from NASA...")
-    raw = fetch_neo_by_id(asteroid_id)
-    key = extract_key_fields(raw)
+    with span("neo_fetch"):
+        raw = get_neo(asteroid_id)
+        key = extract_key_fields(raw)
+
+    # Same record version + site + options + DEM files -> same result
+    with span("result_lookup"):
+        dem_ver = dem_version()
+        store_key = result_key(record_version(key), impact_lat, impact_lon, dem_source, propagate_days, dem_ver)
+        cached = None
+        if use_store:
+            cached = result_memo.get(store_key)
+            if cached is None:
+                cached = result_store.get(store_key)
+                if cached is not None:
+                    result_memo.put(store_key, cached)
+    if cached is not None:
+        logger.info(f"Served from result store ({store_key[:12]})")
+        return copy.deepcopy(cached)
 
     name = key.get("name", "UNKNOWN")
     diameter_km = float(key.get("diameter_km", 0.0))
@@ -80,70 +118,74 @@ def run_simulation(
         miss_km = None
         approach_date = "N/A"
 
-    print(f"Asteroid: {name} (ID {asteroid_id})")
-    print(f"Diameter: {diameter_km:.3f} km")
-    print(f"Velocity (sample): {vel_kps:.3f} km/s")
-    print(f"Miss distance (sample): {miss_km} km")
-    print(f"Approach date: {approach_date}")
+    logger.info(f"[1] Asteroid: {name} (ID {asteroid_id})")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Diameter: {diameter_km:.3f} km")
+        logger.debug(f"Velocity (sample): {vel_kps:.3f} km/s")
+        logger.debug(f"Miss distance (sample): {miss_km} km")
+        logger.debug(f"Approach date: {approach_date}")
 
     # ----------------------------
     # Step 2: Orbital mechanics
     # ----------------------------
-    print("\n[2] Orbit propagation...")
-    orbit = orbit_from_elements(key["orbital_data"])
-    future_orbit = propagate_orbit(orbit, days=propagate_days)
-
-    print("\n=== ORBITAL ELEMENTS ===")
-    print(f"Semi-major axis [AU]: {orbit.a.to('AU').value:.6f}")
-    print(f"Eccentricity: {orbit.ecc.value:.6f}")
-    print(f"Inclination [deg]: {orbit.inc.to('deg').value:.6f}")
-    print(f"RAAN [deg]: {orbit.raan.to('deg').value:.6f}")
-    print(f"ArgPeri [deg]: {orbit.argp.to('deg').value:.6f}")
-    print(f"True anomaly [deg]: {orbit.nu.to('deg').value:.6f}")
-
-    current_pos = get_heliocentric_coordinates(orbit)
-    future_pos = get_heliocentric_coordinates(future_orbit)
+    el_hash = element_set_hash(key["orbital_data"])
+    with span("orbit"):
+        orbit = orbit_memo.get_or_compute(el_hash, lambda: orbit_from_elements(key["orbital_data"]))
+    with span("propagate"):
+        future_orbit = propagation_memo.get_or_compute(
+            (el_hash, propagate_days), lambda: propagate_orbit(orbit, days=propagate_days)
+        )
+        current_pos = get_heliocentric_coordinates(orbit)
+        future_pos = get_heliocentric_coordinates(future_orbit)
 
-    print("\n=== HELIOCENTRIC COORDS ===")
-    pretty_print_vec("Current", current_pos)
-    pretty_print_vec(f"After {propagate_days} days", future_pos)
+    logger.info("[2] Orbit propagated")
+    # The astropy unit conversions below cost more than the log call itself
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Semi-major axis [AU]: {orbit.a.to('AU').value:.6f}")
+        logger.debug(f"Eccentricity: {orbit.ecc.value:.6f}")
+        logger.debug(f"Inclination [deg]: {orbit.inc.to('deg').value:.6f}")
+        logger.debug(f"RAAN [deg]: {orbit.raan.to('deg').value:.6f}")
+        logger.debug(f"ArgPeri [deg]: {orbit.argp.to('deg').value:.6f}")
+        logger.debug(f"True anomaly [deg]: {orbit.nu.to('deg').value:.6f}")
+        pretty_print_vec("Current", current_pos)
+        pretty_print_vec(f"After {propagate_days} days", future_pos)
 
     # ----------------------------
     # Step 3: Energy + risk
     # ----------------------------
-    print("\n[3] Computing impact energy & risk...")
-    energy_j = compute_kinetic_energy(diameter_km, vel_kps)
-    energy_mt = energy_j / 4.184e15
-    risk_text = classify_risk(energy_j)
-    print(f"Energy: {energy_j:.3e} J ({energy_mt:.3f} MT TNT)")
-    print(f"Risk: {risk_text}")
+    with span("physics"):
+        # Mass and energy are computed once and shared by every model below
+        phys = impact_consequences(diameter_km, vel_kps, tsunami_distance_km=200)
+        energy_j = float(phys["energy_j"])
+        energy_mt = float(phys["energy_mt"])
+        risk_text = classify_risk(energy_j)
+    logger.info(f"[3] Energy: {energy_j:.3e} J ({energy_mt:.3f} MT TNT), risk: {risk_text}")
 
     # ----------------------------
     # Step 4: Consequences
     # ----------------------------
-    print(f"\n[4] Consequences at impact site ({impact_lat}, {impact_lon})...")
-    elevation_m = get_elevation_from_usgs_tiles(impact_lat, impact_lon)
+    with span("elevation"):
+        elevation_m = get_elevation_from_usgs_tiles(impact_lat, impact_lon, dem_source, dem_ver)
 
-    crater_km = estimate_crater_size(diameter_km, vel_kps)
-    seismic_mw = estimate_seismic_magnitude(energy_j)
-    tsunami_m = estimate_tsunami_height(diameter_km, vel_kps, distance_km=200)
+    crater_km = float(phys["crater_km"])
+    seismic_mw = float(phys["seismic_mw"])
+    tsunami_m = float(phys["tsunami_m"])
 
-    print(f"Crater diameter: {crater_km:.3f} km")
-    print(f"Seismic magnitude: {seismic_mw:.2f} Mw")
-    print(f"Tsunami at 200 km: {tsunami_m:.3f} m")
+    logger.info(f"[4] Consequences at ({impact_lat}, {impact_lon}): crater {crater_km:.3f} km, "
+                f"Mw {seismic_mw:.2f}, tsunami at 200 km {tsunami_m:.3f} m")
 
     # ----------------------------
     # Step 5: Atmospheric changes
     # ----------------------------
     atmo = estimate_atmospheric_changes(energy_j, impact_lat, impact_lon)
-    print(f"Estimated temperature rise: {atmo['temperature_rise_C']} °C")
-    print(f"Estimated pressure wave: {atmo['pressure_wave_hPa']} hPa")
-    print(f"Estimated wind speed: {atmo['wind_speed_kmh']} km/h")
+    logger.info(f"[5] Atmosphere: +{atmo['temperature_rise_C']} °C, "
+                f"{atmo['pressure_wave_hPa']} hPa, {atmo['wind_speed_kmh']} km/h")
 
     # ----------------------------
     # Build unified result dict
     # ----------------------------
     result = {
+        "result_key": store_key,
         "timestamp_utc": datetime.utcnow().isoformat(),
         "asteroid": {
             "id": asteroid_id,
@@ -187,18 +229,59 @@ def run_simulation(
     }
 
     # Save to disk
-    try:
-        with open(OUT_PATH, "w") as fh:
-            json.dump(result, fh, indent=2)
-        print(f"\n✅ Results saved to {OUT_PATH}")
-    except Exception as e:
-        print(f"❌ Could not save results: {e}")
+    with span("result_store"):
+        try:
+            path = result_store.put(store_key, result, asteroid_id=key.get("id") or asteroid_id)
+            result_memo.put(store_key, copy.deepcopy(result))
+            logger.info(f"Results saved to {path}")
+        except Exception as e:
+            logger.error(f"Could not save results: {e}")
 
-    print("\n=== End of simulation ===")
     return result
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Asteroid impact simulation")
+    sub = parser.add_subparsers(dest="command")
+    batch = sub.add_parser("batch", help="Run a scenario file (asteroids x impact sites)")
+    batch.add_argument("scenarios", help="Scenario file (.json, .ndjson or .csv)")
+    batch.add_argument("--out", required=True, help="Output file (.ndjson, .parquet or .arrows)")
+    batch.add_argument("--format", choices=["ndjson", "parquet", "arrow"], help="Defaults to the --out extension")
+    batch.add_argument("--dem-source", default="auto", help="Default DEM source: auto/usgs/srtm/gebco")
+    batch.add_argument("--propagate-days", type=int, default=30, help="Default propagation window")
+    batch.add_argument("--workers", type=int, default=None, help="Worker processes (0 = inline; default SIM_WORKERS)")
+    export = sub.add_parser("export", help="Export stored results or the NEO catalog as Parquet / Arrow")
+    export.add_argument("what", choices=["results", "catalog"])
+    export.add_argument("--out", required=True, help="Output file (.parquet or .arrows)")
+    export.add_argument("--format", choices=["parquet", "arrow"], help="Defaults to the --out extension")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "INFO"), help="DEBUG shows every stage detail")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+
+    if args.command == "batch":
+        from backend.batch import run_batch_file
+        from backend.executor import SIM_WORKERS, ScenarioExecutor
+
+        pool = ScenarioExecutor(SIM_WORKERS if args.workers is None else args.workers)
+        try:
+            run_batch_file(args.scenarios, args.out, args.format, args.dem_source, args.propagate_days, pool)
+        finally:
+            pool.shutdown()
+        return
+
+    if args.command == "export":
+        from backend import columnar
+        from backend.api.neo_catalog import EXPORT_COLUMNS, export_rows
+
+        if args.what == "catalog":
+            count = columnar.write_file(export_rows(), args.out, EXPORT_COLUMNS, args.format)
+        else:
+            count = columnar.write_file(result_store.iter_results(), args.out, STORED_RESULT_COLUMNS, args.format)
+        print(f"✅ Wrote {count} {args.what} records to {args.out}")
+        return
+
     run_simulation(
         asteroid_id="3542519",
         impact_lat=28.5,
@@ -206,3 +289,7 @@ if __name__ == "__main__":
         dem_source="auto",
         propagate_days=30,
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# backend/memo.py
+"""
+In-process memoization for the simulation stages.
+
+Each Memo is a thread-safe LRU with its own size limit (MEMO_<NAME>_SIZE)
+and hit/miss counters. Keys carry the version of whatever the value was
+derived from (element-set hash, NEO record hash, DEM file signature), so
+a changed NEO record or DEM file simply stops matching and its old entries
+age out. A catalog refresh still drops the entries of orbits it knows have
+changed (discard_memos) so they do not hold memory until then.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+_registry = {}
+
+
+class Memo:
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = int(os.getenv(f"MEMO_{name.upper()}_SIZE", maxsize))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _registry[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, else compute() (outside the lock) and remember it."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def discard(self, match) -> int:
+        """Drop every entry whose key satisfies match(key); returns how many."""
+        with self._lock:
+            stale = [k for k in self._data if match(k)]
+            for k in stale:
+                del self._data[k]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+def memo_stats() -> dict:
+    return {name: m.info() for name, m in _registry.items()}
+
+
+def discard_memos(versions) -> int:
+    """Drop entries keyed by (or by a tuple starting with) any of the given versions."""
+    versions = set(versions)
+    if not versions:
+        return 0
+
+    def match(key):
+        head = key[0] if isinstance(key, tuple) and key else key
+        return isinstance(head, str) and head in versions
+
+    return sum(m.discard(match) for m in _registry.values())
+
+
+def clear_memos():
+    for m in _registry.values():
+        m.clear()
+
+
+def merge_memo_stats(snapshots) -> dict:
+    """Sum memo_stats() snapshots from several processes (e.g. pool workers)."""
+    merged = {}
+    for snap in snapshots:
+        for name, st in snap.items():
+            m = merged.setdefault(name, {"hits": 0, "misses": 0, "size": 0, "maxsize": 0})
+            for k in m:
+                m[k] += st[k]
+    for m in merged.values():
+        total = m["hits"] + m["misses"]
+        m["hit_rate"] = round(m["hits"] / total, 4) if total else None
+    return merged
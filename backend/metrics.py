@@ -0,0 +1,165 @@
+# backend/metrics.py
+"""
+Timing spans, Prometheus-style metrics and opt-in profiling.
+
+    with span("orbit"):
+        ...
+
+records the block's duration in the meteor_stage_seconds histogram and,
+inside a trace(), in that trace's list of spans (used for Server-Timing
+headers and to ship worker timings back to the API process). render()
+produces the Prometheus text exposition format served at /metrics; cache
+counters are pulled from register_collector() callbacks at render time.
+No prometheus_client dependency: pool workers report their spans with each
+task result, so everything is aggregated in the API process.
+"""
+import cProfile
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_trace = contextvars.ContextVar("meteor_trace", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, value: float, *labelvalues):
+        with self._lock:
+            s = self._series.setdefault(labelvalues, [0] * len(self.buckets) + [0.0, 0])
+            for k, upper in enumerate(self.buckets):
+                if value <= upper:
+                    s[k] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for values, s in sorted(series.items()):
+            for upper, n in zip(self.buckets, s):
+                lbl = _labels(self.labelnames + ("le",), values + (repr(upper),))
+                lines.append(f"{self.name}_bucket{lbl} {n}")
+            lbl = _labels(self.labelnames + ("le",), values + ("+Inf",))
+            lines.append(f"{self.name}_bucket{lbl} {s[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {s[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {s[-1]}")
+        return lines
+
+
+_metrics = []
+_collectors = []
+
+STAGE_SECONDS = Histogram(
+    "meteor_stage_seconds", "Duration of simulation stages", ["stage"]
+)
+HTTP_SECONDS = Histogram(
+    "meteor_http_request_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+
+
+def register_collector(fn):
+    """
+    fn() -> iterable of (name, type, doc, labels dict, value), evaluated on
+    every render (used for cache counters owned by other modules).
+    """
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines = []
+    for m in _metrics:
+        lines.extend(m.render())
+
+    families = {}
+    for fn in _collectors:
+        try:
+            samples = list(fn())
+        except Exception as e:
+            lines.append(f"# collector {getattr(fn, '__name__', fn)} failed: {_escape(e)}")
+            continue
+        for name, typ, doc, labels, value in samples:
+            fam = families.setdefault(name, (typ, doc, []))
+            fam[2].append((labels, value))
+    for name, (typ, doc, samples) in families.items():
+        lines.append(f"# HELP {name} {doc}")
+        lines.append(f"# TYPE {name} {typ}")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------------
+# Spans
+# -------------------------
+@contextmanager
+def trace():
+    """Collect the spans recorded in this context; yields the (growing) list."""
+    spans = []
+    token = _current_trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(stage, time.perf_counter() - t0)
+
+
+def record_span(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage)
+    spans = _current_trace.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+def server_timing(spans) -> str:
+    """Server-Timing header value for a list of (stage, seconds)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in spans)
+
+
+# -------------------------
+# Profiling
+# -------------------------
+@contextmanager
+def profiled(out_path):
+    """cProfile the block and dump pstats data to out_path (None: no profiling)."""
+    if out_path is None:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(str(out_path))
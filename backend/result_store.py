@@ -0,0 +1,257 @@
+# backend/result_store.py
+"""
+Content-addressed store for simulation results.
+
+Each result is saved under a hash of its normalized inputs (the asteroid
+record version, impact lat/lon, DEM source and file signature, and the
+propagation window), so identical requests are answered from disk and
+concurrent runs never write the same file. Writes go to a temp file and are renamed into place. When
+the store grows past RESULT_STORE_MAX_BYTES the least recently used
+results are evicted. Results saved with an asteroid id are also listed in
+by_asteroid/<id>.keys, so a catalog refresh can drop exactly the results
+of the NEOs that changed.
+
+Serialization is orjson when it is installed (compact JSON, much faster
+than json.dump(indent=2)); RESULT_STORE_FORMAT=msgpack selects msgpack.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from backend.config import RESULTS_DIR
+
+logger = logging.getLogger(__name__)
+
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Evict down to this fraction of the limit so eviction does not run on every write
+EVICT_TO = 0.9
+# Coordinates closer than this are the same impact site
+COORD_DECIMALS = 6
+# Bumped when run_simulation's output changes for the same inputs, so older results are not served
+RESULT_MODEL_VERSION = 2
+
+
+def _default_format() -> str:
+    try:
+        import orjson  # noqa: F401
+        return "orjson"
+    except ImportError:
+        return "json"
+
+
+RESULT_STORE_FORMAT = os.getenv("RESULT_STORE_FORMAT", _default_format())
+
+
+def _to_builtin(obj):
+    # NumPy scalars/arrays that leak into results
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+def _canonical(obj) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=_to_builtin).encode()
+
+
+def record_version(key_fields: dict) -> str:
+    """Hash of everything run_simulation reads from a NEO record (extract_key_fields output)."""
+    return hashlib.sha256(_canonical(key_fields)).hexdigest()[:16]
+
+
+def result_key(record_ver: str, impact_lat: float, impact_lon: float, dem_source: str,
+               propagate_days: int, dem_ver: str = "") -> str:
+    inputs = {
+        "record": record_ver,
+        "lat": round(float(impact_lat), COORD_DECIMALS),
+        "lon": round(float(impact_lon), COORD_DECIMALS),
+        "dem_source": str(dem_source).lower(),
+        "propagate_days": int(propagate_days),
+        "dem": dem_ver,
+        "model": RESULT_MODEL_VERSION,
+    }
+    return hashlib.sha256(_canonical(inputs)).hexdigest()
+
+
+class ResultStore:
+    def __init__(self, root: Path = RESULTS_DIR, max_bytes: int = RESULT_STORE_MAX_BYTES,
+                 fmt: str = RESULT_STORE_FORMAT):
+        if fmt not in ("json", "orjson", "msgpack"):
+            raise ValueError(f"Unknown result store format: {fmt}")
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self.ext = ".msgpack" if fmt == "msgpack" else ".json"
+        self._lock = threading.Lock()
+        self._bytes = None  # running estimate; re-measured before evicting
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    # -------------------------
+    # Serialization
+    # -------------------------
+    def _dumps(self, result: dict) -> bytes:
+        if self.fmt == "orjson":
+            import orjson
+            return orjson.dumps(result, default=_to_builtin)
+        if self.fmt == "msgpack":
+            import msgpack
+            return msgpack.packb(result, default=_to_builtin, use_bin_type=True)
+        return json.dumps(result, separators=(",", ":"), default=_to_builtin).encode()
+
+    def _loads(self, data: bytes) -> dict:
+        if self.fmt == "orjson":
+            import orjson
+            return orjson.loads(data)
+        if self.fmt == "msgpack":
+            import msgpack
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
+    # -------------------------
+    # Store
+    # -------------------------
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.ext}"
+
+    def get(self, key: str):
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+            result = self._loads(data)
+        except FileNotFoundError:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        except (OSError, ValueError) as e:
+            # Unreadable or truncated: drop it and recompute
+            logger.warning(f"Discarding unreadable result {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)  # mtime doubles as last-access time for eviction
+        except OSError:
+            pass
+        with self._lock:
+            self.stats["hits"] += 1
+        return result
+
+    def _index_path(self, asteroid_id: str) -> Path:
+        name = str(asteroid_id)
+        if not re.fullmatch(r"[A-Za-z0-9_-]{1,64}", name):
+            name = hashlib.sha256(name.encode()).hexdigest()[:32]
+        return self.root / "by_asteroid" / f"{name}.keys"
+
+    def put(self, key: str, result: dict, asteroid_id: str = None) -> Path:
+        path = self.path_for(key)
+        data = self._dumps(result)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        if asteroid_id is not None:
+            index = self._index_path(asteroid_id)
+            index.parent.mkdir(parents=True, exist_ok=True)
+            # One short O_APPEND write per line, so concurrent workers do not interleave
+            with open(index, "a") as fh:
+                fh.write(key + "\n")
+
+        with self._lock:
+            self.stats["writes"] += 1
+            if self._bytes is not None:
+                self._bytes += len(data)
+            over = self._bytes is None or self._bytes > self.max_bytes
+        if over:
+            self._evict()
+        return path
+
+    def invalidate_asteroid(self, asteroid_id: str) -> int:
+        """Delete every stored result of asteroid_id; returns how many files were removed."""
+        index = self._index_path(asteroid_id)
+        try:
+            keys = set(index.read_text().split())
+        except FileNotFoundError:
+            return 0
+        removed = 0
+        for key in keys:
+            try:
+                size = self.path_for(key).stat().st_size
+                os.unlink(self.path_for(key))
+            except FileNotFoundError:
+                continue  # already evicted
+            removed += 1
+            with self._lock:
+                if self._bytes is not None:
+                    self._bytes -= size
+        index.unlink(missing_ok=True)
+        return removed
+
+    def iter_results(self):
+        """Every stored result (unreadable files are skipped), for bulk export."""
+        for _, _, path in self._entries():
+            try:
+                with open(path, "rb") as fh:
+                    yield self._loads(fh.read())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable result {os.path.basename(path)}: {e}")
+
+    def _entries(self):
+        """(mtime, size, path) for every stored result."""
+        out = []
+        if not self.root.exists():
+            return out
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(self.ext) and not entry.name.startswith("."):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    out.append((st.st_mtime, st.st_size, entry.path))
+        return out
+
+    def _evict(self):
+        # Other worker processes write here too, so measure the directory itself
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TO
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._bytes = total
+            self.stats["evictions"] += evicted
+
+    def info(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            return {
+                **self.stats,
+                "format": self.fmt,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "root": str(self.root),
+            }
+
+
+result_store = ResultStore()
@@ -1,16 +1,20 @@
+import numpy as np
+
+from . import physics
+
+
 def estimate_atmospheric_changes(kinetic_energy: float, impact_lat: float, impact_lon: float) -> dict:
     """
     Estimate simple atmospheric changes after an impact.
     Returns a dict with temperature rise, pressure wave, and wind speed.
+    kinetic_energy may also be an array (values are then arrays too).
     """
     # These are illustrative formulas, not real science!
-    temp_rise = min(kinetic_energy / 1e18, 10)  # Max 10°C rise
-    pressure_wave = min(kinetic_energy / 1e17, 500)  # Max 500 hPa
-    wind_speed = min(kinetic_energy / 1e16, 300)  # Max 300 km/h
+    temp_rise, pressure_wave, wind_speed = physics.atmospheric_effects(kinetic_energy)
 
     return {
-        "temperature_rise_C": round(temp_rise, 2),
-        "pressure_wave_hPa": round(pressure_wave, 2),
-        "wind_speed_kmh": round(wind_speed, 2),
+        "temperature_rise_C": np.round(temp_rise, 2),
+        "pressure_wave_hPa": np.round(pressure_wave, 2),
+        "wind_speed_kmh": np.round(wind_speed, 2),
         "location": (impact_lat, impact_lon)
     }
\ No newline at end of file
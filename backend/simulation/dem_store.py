@@ -0,0 +1,290 @@
+"""
+Memory-mapped, tiled elevation store built from the DEM GeoTIFFs.
+
+Layout of the store file:
+    8 bytes   magic (MAGIC)
+    8 bytes   little-endian uint64 length of the JSON header
+    N bytes   JSON header (layers, transforms, level offsets)
+    ...       tile data, every level aligned to ALIGN bytes
+
+Each raster becomes one layer with a level-of-detail pyramid. Level k is
+the source subsampled by 2**k and stored as (tiles_y, tiles_x, TILE, TILE)
+so it can be viewed zero-copy with numpy.memmap. All worker processes map
+the same file and share the OS page cache. Callers that sample coarsely
+(get_elevations(..., resolution_deg=...), e.g. low-zoom hazard tiles) read
+the matching level, so they touch 4**k times fewer pages.
+
+Build it offline with:
+    python -m backend.simulation.dem_store
+"""
+import argparse
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"MMDEM\x00\x01\x00"
+STORE_VERSION = 1
+TILE = 256
+ALIGN = 4096
+DEFAULT_LEVELS = 4
+
+# Source dtypes that fit losslessly in int16; everything else goes to float32
+_INT16_SAFE = {"int8", "uint8", "int16"}
+
+_store_cache = {}  # str(path) -> (mtime_ns, store dict)
+_store_lock = threading.Lock()
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _level_shape(height: int, width: int, level: int):
+    step = 2 ** level
+    h = (height + step - 1) // step
+    w = (width + step - 1) // step
+    return h, w, (h + TILE - 1) // TILE, (w + TILE - 1) // TILE
+
+
+def _tile_row_strip(tiles: np.ndarray, ty: int) -> np.ndarray:
+    """Rows [ty*TILE, (ty+1)*TILE) of a tiled level as a plain 2D array."""
+    tiles_x = tiles.shape[1]
+    return tiles[ty].transpose(1, 0, 2).reshape(TILE, tiles_x * TILE)
+
+
+def _plan_layer(src, name: str, source_file: Path, levels: int):
+    """Header entry for one raster (offsets are filled in later)."""
+    t = src.transform
+    if t.b != 0 or t.d != 0:
+        print(f"⚠️ Skipping rotated raster {name}")
+        return None
+
+    src_dtype = src.dtypes[0]
+    dtype = "int16" if src_dtype in _INT16_SAFE else "float32"
+    if dtype == "int16":
+        nodata = int(src.nodata) if src.nodata is not None else -32768
+    else:
+        # float layers keep missing values as NaN
+        nodata = None
+
+    st = source_file.stat()
+    return {
+        "source_size": st.st_size,
+        "source_mtime_ns": st.st_mtime_ns,
+        "transform": [t.a, t.b, t.c, t.d, t.e, t.f],
+        "width": src.width,
+        "height": src.height,
+        "dtype": dtype,
+        "nodata": nodata,
+        "levels": [
+            dict(zip(("height", "width", "tiles_y", "tiles_x"), _level_shape(src.height, src.width, k)))
+            for k in range(levels)
+        ],
+    }
+
+
+def _fill_value(layer: dict):
+    return np.nan if layer["nodata"] is None else layer["nodata"]
+
+
+def _write_level0(src, layer: dict, tiles: np.ndarray):
+    """Copy the source band into level 0, one tile row at a time."""
+    from rasterio.windows import Window
+
+    fill = _fill_value(layer)
+    src_nodata = src.nodata
+    for ty in range(tiles.shape[0]):
+        r0 = ty * TILE
+        rows = min(TILE, layer["height"] - r0)
+        data = src.read(1, window=Window(0, r0, layer["width"], rows))
+        strip = np.full((TILE, tiles.shape[1] * TILE), fill, dtype=tiles.dtype)
+        if layer["nodata"] is None and src_nodata is not None:
+            data = data.astype(np.float32)
+            data[data == src_nodata] = np.nan
+        strip[:rows, :layer["width"]] = data
+        tiles[ty] = strip.reshape(TILE, tiles.shape[1], TILE).transpose(1, 0, 2)
+
+
+def _write_level(prev: np.ndarray, tiles: np.ndarray, fill):
+    """Build level k from level k-1 by 2x nearest subsampling."""
+    for ty in range(tiles.shape[0]):
+        strips = [_tile_row_strip(prev, j) for j in (2 * ty, 2 * ty + 1) if j < prev.shape[0]]
+        half = np.concatenate(strips, axis=0)[::2, ::2]
+        strip = np.full((TILE, tiles.shape[1] * TILE), fill, dtype=tiles.dtype)
+        strip[:half.shape[0], :min(half.shape[1], strip.shape[1])] = half[:, :strip.shape[1]]
+        tiles[ty] = strip.reshape(TILE, tiles.shape[1], TILE).transpose(1, 0, 2)
+
+
+def _source_files():
+    """Every raster usgs_data can read, keyed by path relative to DATA_DIR."""
+    from .usgs_data import DATA_DIR, GEBCO_DEM, SRTM_DEM, USGS_DIR
+
+    files = sorted(USGS_DIR.glob("*.tif")) if USGS_DIR.exists() else []
+    files += [p for p in (SRTM_DEM, GEBCO_DEM) if p.exists()]
+    return {p.relative_to(DATA_DIR).as_posix(): p for p in files}
+
+
+def build_dem_store(out_path: Path, levels: int = DEFAULT_LEVELS, sources: dict = None) -> dict:
+    """
+    Convert the DEM GeoTIFFs into a single tiled store at out_path.
+    Written to a temp file and renamed, so readers never see a partial store.
+    """
+    import rasterio
+
+    sources = _source_files() if sources is None else sources
+    header = {"version": STORE_VERSION, "tile": TILE, "layers": {}}
+
+    # Pass 1: read headers and lay out the data section
+    for name, path in sources.items():
+        with rasterio.open(path) as src:
+            layer = _plan_layer(src, name, path, levels)
+        if layer is not None:
+            header["layers"][name] = layer
+
+    # The header length depends on the offsets, so reserve a fixed block
+    header_block = _align(len(json.dumps(header)) + 64 * len(header["layers"]) * levels + 1024)
+    offset = header_block
+    for layer in header["layers"].values():
+        itemsize = np.dtype(layer["dtype"]).itemsize
+        for lvl in layer["levels"]:
+            lvl["offset"] = offset
+            offset = _align(offset + lvl["tiles_y"] * lvl["tiles_x"] * TILE * TILE * itemsize)
+
+    header_bytes = json.dumps(header).encode()
+    if len(header_bytes) + 16 > header_block:
+        raise RuntimeError("DEM store header does not fit its reserved block")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<Q", len(header_bytes)))
+        fh.write(header_bytes)
+        fh.truncate(offset)
+
+    # Pass 2: fill the levels through a writable memmap
+    for name, layer in header["layers"].items():
+        print(f"Building {name} ({layer['width']}x{layer['height']}, {layer['dtype']})")
+        views = [_level_view(tmp, layer, k, mode="r+") for k in range(len(layer["levels"]))]
+        with rasterio.open(sources[name]) as src:
+            _write_level0(src, layer, views[0])
+        for k in range(1, len(views)):
+            _write_level(views[k - 1], views[k], _fill_value(layer))
+        for v in views:
+            v.flush()
+        del views
+
+    os.replace(tmp, out_path)
+    print(f"✅ DEM store written to {out_path} ({offset / 1e6:.1f} MB)")
+    return header
+
+
+def _level_view(path: Path, layer: dict, level: int, mode: str = "r") -> np.memmap:
+    lvl = layer["levels"][level]
+    return np.memmap(
+        path,
+        dtype=layer["dtype"],
+        mode=mode,
+        offset=lvl["offset"],
+        shape=(lvl["tiles_y"], lvl["tiles_x"], TILE, TILE),
+    )
+
+
+def open_dem_store(path: Path):
+    """
+    Return the mapped store at path, or None if it has not been built.
+    Kept open per process and remapped when the file is replaced.
+    """
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    key = str(path)
+    with _store_lock:
+        cached = _store_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, "rb") as fh:
+            if fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path.name} is not a DEM store")
+            (hlen,) = struct.unpack("<Q", fh.read(8))
+            header = json.loads(fh.read(hlen))
+
+        store = {"header": header, "views": {}}
+        for name, layer in header["layers"].items():
+            store["views"][name] = [_level_view(path, layer, k) for k in range(len(layer["levels"]))]
+        _store_cache[key] = (mtime, store)
+        return store
+
+
+def store_layer(store, name: str, source_file: Path):
+    """
+    The store layer for a source raster, or None if it is missing or
+    the GeoTIFF changed after the store was built.
+    """
+    if store is None:
+        return None
+    layer = store["header"]["layers"].get(name)
+    if layer is None:
+        return None
+    st = source_file.stat()
+    if st.st_size != layer["source_size"] or st.st_mtime_ns != layer["source_mtime_ns"]:
+        return None
+    return layer
+
+
+def store_level(layer: dict, resolution_deg: float = None) -> int:
+    """
+    Coarsest level of a layer whose pixels are no larger than
+    resolution_deg (0, full resolution, when it is None).
+    """
+    if not resolution_deg:
+        return 0
+    pixel = min(abs(layer["transform"][0]), abs(layer["transform"][4]))
+    level = 0
+    while level + 1 < len(layer["levels"]) and pixel * 2 ** (level + 1) <= resolution_deg:
+        level += 1
+    return level
+
+
+def read_store_points(store, name: str, lats, lons, level: int = 0) -> np.ndarray:
+    """
+    Elevations for many points from one layer, read straight from the map.
+    NaN outside the raster or on nodata. Level k samples every 2**k-th
+    source pixel (see store_level()).
+    """
+    layer = store["header"]["layers"][name]
+    tiles = store["views"][name][level]
+    lvl = layer["levels"][level]
+    a, _, c, _, e, f = layer["transform"]
+    step = 2 ** level
+
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    rows = np.floor((lats - f) / (e * step)).astype(np.int64)
+    cols = np.floor((lons - c) / (a * step)).astype(np.int64)
+
+    out = np.full(lats.shape, np.nan)
+    inside = (rows >= 0) & (rows < lvl["height"]) & (cols >= 0) & (cols < lvl["width"])
+    r, cl = rows[inside], cols[inside]
+    vals = tiles[r // TILE, cl // TILE, r % TILE, cl % TILE].astype(np.float64)
+    if layer["nodata"] is not None:
+        vals[vals == layer["nodata"]] = np.nan
+    out[inside] = vals
+    return out
+
+
+if __name__ == "__main__":
+    from .usgs_data import DEM_STORE
+
+    parser = argparse.ArgumentParser(description="Build the memory-mapped DEM store")
+    parser.add_argument("--out", type=Path, default=DEM_STORE)
+    parser.add_argument("--levels", type=int, default=DEFAULT_LEVELS)
+    args = parser.parse_args()
+    build_dem_store(args.out, levels=args.levels)
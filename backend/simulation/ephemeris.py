@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.config import CACHE_DIR
+from .propagator import ELEMENT_KEYS, elements_from_orbital_data, propagate_elements
+
+logger = logging.getLogger(__name__)
+
+EPHEMERIS_DIR = CACHE_DIR / "ephemeris"
+EPHEMERIS_CACHE_SIZE = int(os.getenv("EPHEMERIS_CACHE_SIZE", "256"))
+EPHEMERIS_DISK_MAX_BYTES = int(os.getenv("EPHEMERIS_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+# Evict down to this fraction of the limit so eviction does not run on every write
+EVICT_TO = 0.9
+MAX_SAMPLES = 20000
+
+UNIX_EPOCH_JD = 2440587.5
+
+_cache = OrderedDict()  # key -> (T, 3) float32 positions
+_cache_lock = threading.Lock()
+_cache_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+_disk_bytes = None  # running estimate; re-measured before evicting
+
+
+def element_set_hash(orbital_data: dict) -> str:
+    """Stable hash of the elements the propagator uses (not the raw strings)."""
+    el = elements_from_orbital_data([orbital_data])
+    canon = json.dumps([repr(float(el[k][0])) for k in ELEMENT_KEYS])
+    return hashlib.sha1(canon.encode()).hexdigest()[:16]
+
+
+def to_jd(value) -> float:
+    """Julian date from a JD number or an ISO-8601 date/datetime string (UTC)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    dt = datetime.fromisoformat(str(value))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return UNIX_EPOCH_JD + dt.timestamp() / 86400.0
+
+
+def jd_to_iso(jd: float) -> str:
+    """ISO-8601 UTC timestamp (to the second) for a Julian date."""
+    dt = datetime.fromtimestamp((jd - UNIX_EPOCH_JD) * 86400.0, tz=timezone.utc)
+    return dt.isoformat(timespec="seconds")
+
+
+def now_jd() -> float:
+    return UNIX_EPOCH_JD + datetime.now(timezone.utc).timestamp() / 86400.0
+
+
+def today_jd() -> float:
+    """Julian date of 0h UTC today: a default start that stays the same all day (and so caches)."""
+    return float(np.floor(now_jd() - 0.5) + 0.5)
+
+
+def time_grid(start_jd: float, stop_jd: float, step_days: float) -> np.ndarray:
+    if step_days <= 0:
+        raise ValueError("step must be positive")
+    if stop_jd < start_jd:
+        raise ValueError("stop must not be before start")
+    count = int(np.floor((stop_jd - start_jd) / step_days + 1e-9)) + 1
+    if count > MAX_SAMPLES:
+        raise ValueError(f"Time grid has {count} samples, max is {MAX_SAMPLES}")
+    return start_jd + step_days * np.arange(count)
+
+
+def _key(element_hash: str, start_jd: float, stop_jd: float, step_days: float) -> str:
+    return f"{element_hash}_{start_jd:.6f}_{stop_jd:.6f}_{step_days:.6f}"
+
+
+def _disk_path(key: str):
+    return EPHEMERIS_DIR / f"{key}.npy"
+
+
+def _remember(key: str, positions: np.ndarray):
+    # Shared between requests, so nobody may modify it in place
+    positions.flags.writeable = False
+    with _cache_lock:
+        _cache[key] = positions
+        _cache.move_to_end(key)
+        while len(_cache) > EPHEMERIS_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def get_ephemeris(orbital_data: dict, start_jd: float, stop_jd: float, step_days: float):
+    """
+    Sampled heliocentric trajectory for one element set.
+
+    Returns (times_jd, positions, cache) where positions is a (T, 3)
+    float32 array in AU and cache is "memory", "disk" or "miss".
+    Results are cached by (element-set hash, time grid) in memory and as
+    .npy files shared across workers.
+    """
+    times = time_grid(start_jd, stop_jd, step_days)
+    key = _key(element_set_hash(orbital_data), start_jd, stop_jd, step_days)
+
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            _cache_stats["memory_hits"] += 1
+            return times, hit, "memory"
+
+    path = _disk_path(key)
+    if path.exists():
+        try:
+            positions = np.load(path)
+        except (OSError, ValueError):
+            positions = None
+        if positions is not None and positions.shape == (len(times), 3):
+            try:
+                os.utime(path)  # mtime doubles as last-access time for eviction
+            except OSError:
+                pass
+            _remember(key, positions)
+            with _cache_lock:
+                _cache_stats["disk_hits"] += 1
+            return times, positions, "disk"
+
+    with _cache_lock:
+        _cache_stats["misses"] += 1
+    el = elements_from_orbital_data([orbital_data])
+    positions = propagate_elements(*(el[k] for k in ELEMENT_KEYS), times)[0].astype(np.float32)
+    _remember(key, positions)
+
+    try:
+        EPHEMERIS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, positions)
+        os.replace(tmp, path)
+        _account(path.stat().st_size)
+    except OSError as e:
+        logger.warning(f"Could not save ephemeris {key}: {e}")
+    return times, positions, "miss"
+
+
+def _account(nbytes: int):
+    global _disk_bytes
+    with _cache_lock:
+        if _disk_bytes is not None:
+            _disk_bytes += nbytes
+        over = _disk_bytes is None or _disk_bytes > EPHEMERIS_DISK_MAX_BYTES
+    if over:
+        _evict_disk()
+
+
+def _evict_disk():
+    """Drop the least recently used .npy files once the directory is over EPHEMERIS_DISK_MAX_BYTES."""
+    global _disk_bytes
+    # Other worker processes write here too, so measure the directory itself
+    entries = []
+    for entry in os.scandir(EPHEMERIS_DIR):
+        if entry.name.endswith(".npy"):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    if total > EPHEMERIS_DISK_MAX_BYTES:
+        target = EPHEMERIS_DISK_MAX_BYTES * EVICT_TO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+    with _cache_lock:
+        _disk_bytes = total
+        _cache_stats["evictions"] += evicted
+
+
+def invalidate_ephemerides(element_hashes, disk: bool = True) -> int:
+    """Forget cached trajectories (memory, and disk unless disk=False) of the given element sets; returns files removed."""
+    hashes = set(element_hashes)
+    if not hashes:
+        return 0
+    with _cache_lock:
+        for key in [k for k in _cache if k.split("_", 1)[0] in hashes]:
+            del _cache[key]
+    removed = 0
+    if disk and EPHEMERIS_DIR.exists():
+        for entry in os.scandir(EPHEMERIS_DIR):
+            if entry.name.split("_", 1)[0] in hashes:
+                try:
+                    os.unlink(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
+
+
+def ephemeris_cache_info() -> dict:
+    with _cache_lock:
+        return {**_cache_stats, "size": len(_cache), "maxsize": EPHEMERIS_CACHE_SIZE,
+                "disk_max_bytes": EPHEMERIS_DISK_MAX_BYTES}
@@ -0,0 +1,390 @@
+"""
+Gridded hazard fields around an impact site, served as XYZ map tiles.
+
+A hazard scenario (asteroid record + impact site) is evaluated per tile
+pixel instead of per clicked point:
+
+- overpressure: peak blast overpressure (hPa), physics.overpressure_hpa()
+- tsunami:      wave height (m) from physics.tsunami_height_m(), only over
+                sea and only for ocean impacts
+- crater:       the transient crater footprint
+
+Land and sea come from one get_elevations() call per tile. Tiles are Web
+Mercator (z/x/y, 256 px) and rendered either as coloured RGBA PNGs for
+the map or as float32 GeoTIFFs of the raw values. Every rendered tile is
+written under HAZARD_TILE_DIR/<scenario key>/<layer>/<z>/<x>/<y>.<ext>;
+the scenario key hashes the NEO record version, the site, the DEM files
+and HAZARD_VERSION, so cached tiles never go stale, they just stop being
+requested. Tiles beyond the scenario's extent are answered with a shared
+empty tile without evaluating anything.
+
+    python -m backend.simulation.hazard_map 2099942 --lat 29.5 --lon -89.5 --zooms 0-6
+
+pre-renders a scenario's tiles.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from backend.config import CACHE_DIR
+from backend.memo import Memo
+from . import physics
+from .usgs_data import dem_version, get_elevation, get_elevations
+
+# Bump when the models or colouring change so old tiles are not reused
+HAZARD_VERSION = "1"
+HAZARD_TILE_DIR = Path(os.getenv("HAZARD_TILE_DIR", CACHE_DIR / "hazard_tiles"))
+TILE_SIZE = 256
+MAX_ZOOM = int(os.getenv("HAZARD_MAX_ZOOM", "12"))
+# Elevation is read every ELEVATION_STEP pixels; the land/sea mask is upsampled
+ELEVATION_STEP = 2
+EARTH_RADIUS_KM = 6371.0
+MAX_EXTENT_KM = math.pi * EARTH_RADIUS_KM
+
+# Values below "floor" are transparent; colours run over [floor, ceiling] (log scale)
+LAYERS = {
+    "overpressure": {"unit": "hPa", "floor": 1.0, "ceiling": 1e4,
+                     "colors": [(255, 255, 178), (254, 178, 76), (240, 59, 32), (128, 0, 38)]},
+    "tsunami": {"unit": "m", "floor": 0.05, "ceiling": 50.0,
+                "colors": [(198, 219, 239), (107, 174, 214), (33, 113, 181), (8, 48, 107)]},
+    "crater": {"unit": "", "floor": 0.5, "ceiling": 1.0,
+               "colors": [(90, 60, 40), (90, 60, 40)]},
+}
+FORMATS = {"png": "image/png", "tif": "image/tiff"}
+
+scenario_memo = Memo("hazard_scenario", 64)
+
+
+class UnknownScenario(KeyError):
+    """No hazard scenario is stored under this key."""
+
+
+# -------------------------
+# Scenario
+# -------------------------
+def great_circle_km(lat0, lon0, lats, lons):
+    """Haversine distance (km) from (lat0, lon0) to every point."""
+    p0, p = np.radians(lat0), np.radians(lats)
+    dlat = p - p0
+    dlon = np.radians(np.subtract(lons, lon0))
+    a = np.sin(dlat / 2) ** 2 + np.cos(p0) * np.cos(p) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def hazard_extent_km(energy_j: float, ocean_impact: bool) -> float:
+    """Distance beyond which every layer is below its floor."""
+    d = np.geomspace(0.01, MAX_EXTENT_KM, 2000)
+    reach = d[physics.overpressure_hpa(energy_j, d) >= LAYERS["overpressure"]["floor"]]
+    extent = reach.max() if reach.size else 0.0
+    if ocean_impact:
+        reach = d[physics.tsunami_height_m(energy_j, d) >= LAYERS["tsunami"]["floor"]]
+        if reach.size:
+            extent = max(extent, reach.max())
+    return float(min(max(extent, physics.crater_diameter_km(energy_j) / 2), MAX_EXTENT_KM))
+
+
+def scenario_key(record_ver: str, impact_lat: float, impact_lon: float, dem_source: str, dem_ver: str) -> str:
+    inputs = [HAZARD_VERSION, record_ver, round(float(impact_lat), 6), round(float(impact_lon), 6),
+              str(dem_source).lower(), dem_ver]
+    return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()[:32]
+
+
+def build_scenario(key_fields: dict, impact_lat: float, impact_lon: float, dem_source: str = "auto") -> dict:
+    """
+    Hazard scenario for an extract_key_fields() record and an impact site
+    (same diameter/velocity choice as run_simulation). Stored on disk so
+    tile requests only need its key.
+    """
+    from backend.result_store import record_version
+
+    if not (-90 <= impact_lat <= 90 and -180 <= impact_lon <= 180):
+        raise ValueError("impact_lat must be in [-90, 90] and impact_lon in [-180, 180]")
+    key = scenario_key(record_version(key_fields), impact_lat, impact_lon, dem_source, dem_version())
+    cached = load_scenario(key, missing_ok=True)
+    if cached is not None:
+        return cached
+
+    diameter_km = float(key_fields.get("diameter_km", 0.0))
+    approaches = key_fields.get("close_approach") or [{}]
+    vel_kps = float(approaches[0].get("velocity_kps", 0.0))
+    phys = physics.impact_consequences(diameter_km, vel_kps)
+    energy_j = float(phys["energy_j"])
+
+    try:
+        site_elevation = get_elevation(impact_lat, impact_lon, dem_source)
+    except Exception:
+        site_elevation = None
+    ocean_impact = site_elevation is not None and site_elevation < 0
+
+    scenario = {
+        "key": key,
+        "asteroid": {"id": key_fields.get("id"), "name": key_fields.get("name"),
+                     "diameter_km": diameter_km, "velocity_kps": vel_kps},
+        "impact_lat": float(impact_lat),
+        "impact_lon": float(impact_lon),
+        "dem_source": dem_source,
+        "site_elevation_m": site_elevation,
+        "ocean_impact": ocean_impact,
+        "energy_j": energy_j,
+        "energy_mt": float(phys["energy_mt"]),
+        "crater_km": float(phys["crater_km"]),
+        "extent_km": hazard_extent_km(energy_j, ocean_impact),
+    }
+    path = HAZARD_TILE_DIR / key / "scenario.json"
+    _write_atomic(path, json.dumps(scenario, indent=2).encode())
+    scenario_memo.put(key, scenario)
+    return scenario
+
+
+def valid_scenario_key(key: str) -> bool:
+    """Whether key looks like a scenario_key() (32 lowercase hex), so it is safe in a path."""
+    return len(key) == 32 and all(c in "0123456789abcdef" for c in key)
+
+
+def load_scenario(key: str, missing_ok: bool = False):
+    if not valid_scenario_key(key):
+        if missing_ok:
+            return None
+        raise UnknownScenario(key)
+    scenario = scenario_memo.get(key)
+    if scenario is not None:
+        return scenario
+    try:
+        scenario = json.loads((HAZARD_TILE_DIR / key / "scenario.json").read_text())
+    except (OSError, ValueError):
+        if missing_ok:
+            return None
+        raise UnknownScenario(key)
+    scenario_memo.put(key, scenario)
+    return scenario
+
+
+# -------------------------
+# Fields
+# -------------------------
+def hazard_fields(scenario: dict, lats, lons, elevation) -> dict:
+    """Every layer's values at the given points (NaN where a layer does not apply)."""
+    dist = great_circle_km(scenario["impact_lat"], scenario["impact_lon"], lats, lons)
+    energy = scenario["energy_j"]
+    sea = np.asarray(elevation) < 0  # NaN (no DEM) counts as land
+
+    tsunami = np.full(dist.shape, np.nan)
+    if scenario["ocean_impact"]:
+        with np.errstate(divide="ignore"):
+            tsunami[sea] = physics.tsunami_height_m(energy, np.maximum(dist[sea], 0.01))
+    return {
+        "overpressure": physics.overpressure_hpa(energy, dist),
+        "tsunami": tsunami,
+        "crater": np.where(dist <= scenario["crater_km"] / 2, 1.0, np.nan),
+    }
+
+
+def tile_lonlat(z: int, x: int, y: int, size: int = TILE_SIZE):
+    """Lat/lon grids (size x size) of the pixel centres of a Web Mercator tile."""
+    n = 2 ** z
+    f = (np.arange(size) + 0.5) / size
+    lons = (x + f) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + f) / n))))
+    return np.meshgrid(lats, lons, indexing="ij")
+
+
+def tile_bounds(z: int, x: int, y: int):
+    """(west, south, east, north) of a tile in degrees."""
+    n = 2 ** z
+    west, east = x / n * 360.0 - 180.0, (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+
+def tile_in_extent(scenario: dict, z: int, x: int, y: int) -> bool:
+    """Whether the tile comes within the scenario's extent (nearest point of its box)."""
+    west, south, east, north = tile_bounds(z, x, y)
+    lat0, lon0 = scenario["impact_lat"], scenario["impact_lon"]
+    # Bring the impact longitude next to the tile before clamping
+    mid = (west + east) / 2
+    lon0 = lon0 + 360.0 * round((mid - lon0) / 360.0)
+    lat = min(max(lat0, south), north)
+    lon = min(max(lon0, west), east)
+    return float(great_circle_km(lat0, lon0, lat, lon)) <= scenario["extent_km"] * 1.01
+
+
+def _tile_elevation(lats, lons, dem_source: str):
+    step = ELEVATION_STEP
+    # Sample spacing along the tile's columns, so low zooms read a coarse DEM level
+    spacing = abs(float(lons[0, -1] - lons[0, 0])) / max(lons.shape[1] - 1, 1) * step
+    coarse = get_elevations(lats[::step, ::step], lons[::step, ::step], dem_source, resolution_deg=spacing)
+    return np.repeat(np.repeat(coarse, step, axis=0), step, axis=1)[: lats.shape[0], : lats.shape[1]]
+
+
+# -------------------------
+# Tiles
+# -------------------------
+def colorize(values, layer: str) -> np.ndarray:
+    """(4, h, w) uint8 RGBA; transparent below the layer's floor and at NaN."""
+    spec = LAYERS[layer]
+    colors = np.array(spec["colors"], dtype=np.float64)
+    lo, hi = math.log10(spec["floor"]), math.log10(spec["ceiling"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (np.log10(values) - lo) / (hi - lo) if hi > lo else np.ones_like(values)
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    stops = np.linspace(0.0, 1.0, len(colors))
+    rgba = np.empty((4,) + np.shape(values), dtype=np.uint8)
+    for c in range(3):
+        rgba[c] = np.interp(t, stops, colors[:, c]).round()
+    visible = np.isfinite(values) & (np.nan_to_num(values, nan=0.0) >= spec["floor"])
+    rgba[3] = np.where(visible, 200, 0)
+    return rgba
+
+
+def _encode(data: np.ndarray, fmt: str, z: int, x: int, y: int) -> bytes:
+    from rasterio.errors import NotGeoreferencedWarning
+    from rasterio.io import MemoryFile
+    from rasterio.transform import from_bounds
+
+    if fmt == "png":
+        profile = {"driver": "PNG"}
+    else:
+        # Web Mercator georeferencing so GIS tools can read the raw values
+        half = math.pi * 6378137.0
+        n = 2 ** z
+        w, e = -half + 2 * half * x / n, -half + 2 * half * (x + 1) / n
+        north, south = half - 2 * half * y / n, half - 2 * half * (y + 1) / n
+        profile = {
+            "driver": "GTiff", "crs": "EPSG:3857", "nodata": np.nan, "compress": "deflate",
+            "transform": from_bounds(w, south, e, north, TILE_SIZE, TILE_SIZE),
+        }
+    bands = data if data.ndim == 3 else data[None]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", NotGeoreferencedWarning)
+        with MemoryFile() as mem:
+            with mem.open(width=bands.shape[2], height=bands.shape[1], count=bands.shape[0],
+                          dtype=bands.dtype.name, **profile) as dst:
+                dst.write(bands)
+            return mem.read()
+
+
+_empty_tiles = {}
+
+
+def _empty_tile(fmt: str) -> bytes:
+    if fmt not in _empty_tiles:
+        if fmt == "png":
+            data = np.zeros((4, TILE_SIZE, TILE_SIZE), dtype=np.uint8)
+        else:
+            data = np.full((TILE_SIZE, TILE_SIZE), np.nan, dtype=np.float32)
+        _empty_tiles[fmt] = _encode(data, fmt, 0, 0, 0)
+    return _empty_tiles[fmt]
+
+
+def tile_path(key: str, layer: str, z: int, x: int, y: int, fmt: str) -> Path:
+    return HAZARD_TILE_DIR / key / layer / str(z) / str(x) / f"{y}.{fmt}"
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def render_tile(scenario: dict, layer: str, z: int, x: int, y: int, fmt: str = "png") -> bytes:
+    """Encoded tile for one layer, from the disk cache or freshly rendered."""
+    if layer not in LAYERS:
+        raise ValueError(f"Unknown layer: {layer}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown tile format: {fmt}")
+    n = 2 ** z
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tile {z}/{x}/{y} out of range (max zoom {MAX_ZOOM})")
+    if not tile_in_extent(scenario, z, x, y):
+        return _empty_tile(fmt)
+
+    path = tile_path(scenario["key"], layer, z, x, y, fmt)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+
+    lats, lons = tile_lonlat(z, x, y)
+    # Only the tsunami layer needs the land/sea mask
+    if layer == "tsunami" and scenario["ocean_impact"]:
+        elevation = _tile_elevation(lats, lons, scenario["dem_source"])
+    else:
+        elevation = np.full(lats.shape, np.nan)
+    values = hazard_fields(scenario, lats, lons, elevation)[layer]
+    if fmt == "png":
+        data = _encode(colorize(values, layer), fmt, z, x, y)
+    else:
+        data = _encode(values.astype(np.float32), fmt, z, x, y)
+    _write_atomic(path, data)
+    return data
+
+
+def tiles_for_extent(scenario: dict, z: int):
+    """(x, y) of every tile at zoom z that intersects the scenario's extent."""
+    n = 2 ** z
+    lat0, lon0, r = scenario["impact_lat"], scenario["impact_lon"], scenario["extent_km"]
+    dlat = math.degrees(r / EARTH_RADIUS_KM)
+    north, south = min(lat0 + dlat, 85.05), max(lat0 - dlat, -85.05)
+    y0 = int((1 - math.asinh(math.tan(math.radians(north))) / math.pi) / 2 * n)
+    y1 = int((1 - math.asinh(math.tan(math.radians(south))) / math.pi) / 2 * n)
+    # Longitude span at the extent's widest latitude, unless it wraps the globe
+    widest = max(abs(north), abs(south))
+    dlon = dlat / max(math.cos(math.radians(widest)), 1e-9)
+    if dlon >= 180:
+        xs = range(n)
+    else:
+        x0 = math.floor((lon0 - dlon + 180.0) / 360.0 * n)
+        x1 = math.floor((lon0 + dlon + 180.0) / 360.0 * n)
+        xs = sorted({x % n for x in range(x0, x1 + 1)})
+    for y in range(max(y0, 0), min(y1, n - 1) + 1):
+        for x in xs:
+            if tile_in_extent(scenario, z, x, y):
+                yield x, y
+
+
+def pregenerate(scenario: dict, zooms, layers=tuple(LAYERS), fmt: str = "png") -> int:
+    """Render (and cache) every tile of the scenario at the given zooms. Returns the count."""
+    count = 0
+    for z in zooms:
+        for x, y in tiles_for_extent(scenario, z):
+            for layer in layers:
+                render_tile(scenario, layer, z, x, y, fmt)
+                count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render hazard map tiles for an impact scenario")
+    parser.add_argument("asteroid_id")
+    parser.add_argument("--lat", type=float, required=True)
+    parser.add_argument("--lon", type=float, required=True)
+    parser.add_argument("--dem-source", default="auto")
+    parser.add_argument("--zooms", default="0-5", help="Zoom range, e.g. 0-6")
+    parser.add_argument("--layers", default=",".join(LAYERS))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="png")
+    args = parser.parse_args(argv)
+
+    from backend.api.nasa_api import extract_key_fields
+    from backend.api.neo_catalog import get_neo
+
+    lo, _, hi = args.zooms.partition("-")
+    zooms = range(int(lo), int(hi or lo) + 1)
+    scenario = build_scenario(extract_key_fields(get_neo(args.asteroid_id)),
+                              args.lat, args.lon, args.dem_source)
+    n = pregenerate(scenario, zooms, args.layers.split(","), args.format)
+    print(f"✅ {n} tiles for scenario {scenario['key']} "
+          f"(extent {scenario['extent_km']:.0f} km) in {HAZARD_TILE_DIR / scenario['key']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import math
+from . import physics
 
 def estimate_mass(diameter_km: float, density: float = 3000.0) -> float:
     """
@@ -11,10 +11,7 @@ def estimate_mass(diameter_km: float, density: float = 3000.0) -> float:
     Returns:
         Mass in kilograms
     """
-    diameter_m = diameter_km * 1000  # convert km → m
-    radius_m = diameter_m / 2
-    volume = (4/3) * math.pi * (radius_m ** 3)  # m³
-    return volume * density  # kg
+    return physics.asteroid_mass(diameter_km, density)
 
 
 def impact_energy(mass: float, velocity_kps: float) -> float:
@@ -28,8 +25,7 @@ def impact_energy(mass: float, velocity_kps: float) -> float:
     Returns:
         Energy in Joules
     """
-    velocity_ms = velocity_kps * 1000  # km/s → m/s
-    return 0.5 * mass * (velocity_ms ** 2)
+    return physics.kinetic_energy(mass, velocity_kps)
 
 
 def energy_megatons(energy_joules: float) -> float:
@@ -37,7 +33,7 @@ def energy_megatons(energy_joules: float) -> float:
     Convert Joules → Megatons of TNT equivalent.
     1 megaton TNT ≈ 4.184e15 Joules
     """
-    return energy_joules / 4.184e15
+    return energy_joules / physics.JOULES_PER_MT
 
 def classify_risk(energy_mt: float) -> str:
     """
@@ -1,22 +1,29 @@
-import math
+import numpy as np
+
+from . import physics
 
 # Approximate density of typical stony asteroid
-ASTEROID_DENSITY = 3000  # kg/m³
+ASTEROID_DENSITY = physics.DEFAULT_DENSITY  # kg/m³
 
 # TNT conversion
-JOULES_TO_KT = 4.184e12       # 1 kt TNT
-JOULES_TO_MT = 4.184e15       # 1 MT TNT
+JOULES_TO_KT = physics.JOULES_PER_KT       # 1 kt TNT
+JOULES_TO_MT = physics.JOULES_PER_MT       # 1 MT TNT
 
 def compute_kinetic_energy(diameter_km: float, velocity_kms: float, density=ASTEROID_DENSITY):
     """
-    Compute kinetic energy in Joules of an asteroid.
+    Compute kinetic energy in Joules of an asteroid; accepts arrays.
     """
-    D = diameter_km * 1000  # km → m
-    v = velocity_kms * 1000  # km/s → m/s
+    return physics.kinetic_energy(physics.asteroid_mass(diameter_km, density), velocity_kms)
+
+
+# Upper energy bounds of the classify_risk() classes (the last is open-ended)
+RISK_CLASSES = ["Low", "Moderate", "High", "Catastrophic"]
+RISK_THRESHOLDS_J = [50 * JOULES_TO_KT, 1 * JOULES_TO_MT, 100 * JOULES_TO_MT]
+
 
-    mass = (4/3) * math.pi * (D/2)**3 * density
-    energy_joules = 0.5 * mass * v**2
-    return energy_joules
+def risk_class_index(energy_joules):
+    """Index into RISK_CLASSES for scalar or array energies (same bins as classify_risk)."""
+    return np.searchsorted(RISK_THRESHOLDS_J, energy_joules, side="right")
 
 
 def classify_risk(energy_joules: float) -> str:
@@ -0,0 +1,136 @@
+"""
+Monte Carlo impact uncertainty.
+
+Samples diameter, bulk density and impact velocity, then runs the energy,
+crater, seismic, tsunami and atmospheric models over every sample in one
+NumPy pass and summarizes the spread as percentiles and risk-class
+probabilities.
+"""
+import time
+
+import numpy as np
+
+from .impact_energy import RISK_CLASSES, risk_class_index
+from .physics import impact_consequences
+
+# Bulk density (kg/m³) and prior weight per taxonomic class
+DENSITY_CLASSES = {
+    "C-type": (1400.0, 0.40),
+    "S-type": (2700.0, 0.50),
+    "M-type": (5300.0, 0.10),
+}
+
+# 1-sigma relative spread applied around each close-approach velocity
+VELOCITY_SPREAD = 0.10
+
+PERCENTILES = [5, 25, 50, 75, 95]
+MAX_SAMPLES = 2_000_000
+
+
+def sample_inputs(
+    diameter_min_km: float,
+    diameter_max_km: float,
+    velocities_kps,
+    n_samples: int,
+    seed=None,
+    density_classes: dict = DENSITY_CLASSES,
+    velocity_spread: float = VELOCITY_SPREAD,
+) -> dict:
+    """
+    Draw n_samples of (diameter_km, density, velocity_kms).
+
+    - diameter: log-uniform between the NeoWs min/max estimates
+    - density: one of density_classes, by weight
+    - velocity: a random close-approach velocity with Gaussian jitter
+    """
+    rng = np.random.default_rng(seed)
+
+    lo, hi = sorted((float(diameter_min_km), float(diameter_max_km)))
+    if lo <= 0:
+        lo = hi
+    diameter = np.exp(rng.uniform(np.log(lo), np.log(hi), n_samples))
+
+    rho, weights = zip(*density_classes.values())
+    weights = np.asarray(weights) / np.sum(weights)
+    density = np.asarray(rho)[rng.choice(len(rho), size=n_samples, p=weights)]
+
+    v = np.asarray(velocities_kps, dtype=np.float64)
+    if v.size == 0:
+        raise ValueError("No close-approach velocity to sample from")
+    velocity = v[rng.integers(0, v.size, n_samples)]
+    velocity = velocity * (1 + velocity_spread * rng.standard_normal(n_samples))
+    velocity = np.clip(velocity, 0.1, None)
+
+    return {"diameter_km": diameter, "density": density, "velocity_kms": velocity}
+
+
+def run_models(samples: dict, impact_lat: float = 0.0, impact_lon: float = 0.0) -> dict:
+    """
+    Every consequence model over all samples at once (arrays in, arrays out).
+    The models are location-independent today; impact_lat/lon are kept for
+    callers that pass them.
+    """
+    phys = impact_consequences(
+        samples["diameter_km"], samples["velocity_kms"], samples["density"], tsunami_distance_km=200
+    )
+    return {
+        "energy_j": phys["energy_j"],
+        "energy_mt": phys["energy_mt"],
+        "crater_km": phys["crater_km"],
+        "seismic_mw": phys["seismic_mw"],
+        "tsunami_m_at_200km": phys["tsunami_m"],
+        "temperature_rise_C": phys["temperature_rise_C"],
+        "pressure_wave_hPa": phys["pressure_wave_hPa"],
+        "wind_speed_kmh": phys["wind_speed_kmh"],
+    }
+
+
+def summarize(outputs: dict) -> dict:
+    """Percentiles and mean of each output, plus risk-class probabilities."""
+    stats = {}
+    for name, values in outputs.items():
+        pct = np.percentile(values, PERCENTILES)
+        stats[name] = {f"p{p}": float(x) for p, x in zip(PERCENTILES, pct)}
+        stats[name]["mean"] = float(values.mean())
+
+    counts = np.bincount(risk_class_index(outputs["energy_j"]), minlength=len(RISK_CLASSES))
+    probs = counts / counts.sum()
+    return {
+        "percentiles": stats,
+        "risk_probabilities": {c: float(p) for c, p in zip(RISK_CLASSES, probs)},
+    }
+
+
+def run_monte_carlo(
+    key_fields: dict,
+    diameter_min_km: float,
+    n_samples: int = 100_000,
+    seed=None,
+    impact_lat: float = 0.0,
+    impact_lon: float = 0.0,
+) -> dict:
+    """
+    Monte Carlo run for one asteroid.
+
+    key_fields is extract_key_fields() output (diameter_km is the NeoWs
+    maximum); diameter_min_km is the matching minimum estimate.
+    """
+    if not 1 <= n_samples <= MAX_SAMPLES:
+        raise ValueError(f"n_samples must be between 1 and {MAX_SAMPLES}")
+
+    t0 = time.perf_counter()
+    velocities = [ca["velocity_kps"] for ca in key_fields.get("close_approach", [])]
+    samples = sample_inputs(diameter_min_km, key_fields["diameter_km"], velocities, n_samples, seed)
+    summary = summarize(run_models(samples, impact_lat, impact_lon))
+
+    return {
+        "n_samples": n_samples,
+        "seed": seed,
+        "inputs": {
+            "diameter_km": [min(diameter_min_km, key_fields["diameter_km"]), key_fields["diameter_km"]],
+            "density_classes": {k: {"kg_m3": r, "weight": w} for k, (r, w) in DENSITY_CLASSES.items()},
+            "velocity_kps": {"close_approaches": len(velocities), "relative_spread": VELOCITY_SPREAD},
+        },
+        **summary,
+        "elapsed_s": round(time.perf_counter() - t0, 4),
+    }
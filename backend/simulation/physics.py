@@ -0,0 +1,90 @@
+"""
+Array-native impact physics.
+
+Every function takes scalars or NumPy arrays and broadcasts. Mass and
+energy are computed once in impact_consequences() and fed to the crater,
+seismic, tsunami and atmospheric models; the scalar helpers in impact.py,
+impact_energy.py, consequences.py and atmosphere.py are thin wrappers
+around the functions here.
+"""
+import numpy as np
+
+DEFAULT_DENSITY = 3000.0   # kg/m³, typical stony asteroid
+JOULES_PER_KT = 4.184e12
+JOULES_PER_MT = 4.184e15
+
+# Blast-wave fit for a 1 kt surface burst (Collins, Melosh & Marcus 2005)
+OVERPRESSURE_PX_PA = 75_000.0
+OVERPRESSURE_RX_M = 290.0
+
+
+def asteroid_mass(diameter_km, density=DEFAULT_DENSITY):
+    """Mass (kg) of a spherical body."""
+    radius_m = np.multiply(diameter_km, 500.0)  # km -> m, halved
+    return (4.0 / 3.0) * np.pi * radius_m ** 3 * density
+
+
+def kinetic_energy(mass_kg, velocity_kms):
+    """Kinetic energy (J)."""
+    v = np.multiply(velocity_kms, 1000.0)
+    return 0.5 * mass_kg * v ** 2
+
+
+def crater_diameter_km(energy_j):
+    """Simplified scaling law for transient crater diameter (km)."""
+    return 1.8 * np.power(energy_j, 0.22) / 1000.0
+
+
+def seismic_magnitude(energy_j):
+    """Rough moment magnitude from impact energy."""
+    return (np.log10(energy_j) - 4.8) / 1.5
+
+
+def tsunami_height_m(energy_j, distance_km=100.0):
+    """Very rough tsunami height (m) at distance_km, decaying as 1/sqrt(d)."""
+    h0 = np.power(energy_j, 0.25) / 1e5
+    return h0 / np.sqrt(distance_km)
+
+
+def atmospheric_effects(energy_j):
+    """
+    Illustrative temperature rise (°C), pressure wave (hPa) and wind
+    speed (km/h), capped at 10 °C, 500 hPa and 300 km/h.
+    """
+    temp_rise = np.minimum(np.divide(energy_j, 1e18), 10.0)
+    pressure_wave = np.minimum(np.divide(energy_j, 1e17), 500.0)
+    wind_speed = np.minimum(np.divide(energy_j, 1e16), 300.0)
+    return temp_rise, pressure_wave, wind_speed
+
+
+def overpressure_hpa(energy_j, distance_km):
+    """
+    Peak blast overpressure (hPa) at distance_km from the impact point,
+    from the 1 kt fit scaled by the cube root of the yield.
+    """
+    yield_kt = np.divide(energy_j, JOULES_PER_KT)
+    r1 = np.maximum(np.multiply(distance_km, 1000.0), 1.0) / np.cbrt(yield_kt)
+    pressure_pa = OVERPRESSURE_PX_PA * OVERPRESSURE_RX_M / (4.0 * r1) * (1.0 + 3.0 * (OVERPRESSURE_RX_M / r1) ** 1.3)
+    return pressure_pa / 100.0
+
+
+def impact_consequences(diameter_km, velocity_kms, density=DEFAULT_DENSITY, tsunami_distance_km=200.0):
+    """
+    All physics outputs for (arrays of) diameters, velocities and densities.
+    Inputs broadcast against each other; every value in the result has
+    the broadcast shape.
+    """
+    mass = asteroid_mass(diameter_km, density)
+    energy = kinetic_energy(mass, velocity_kms)
+    temp_rise, pressure_wave, wind_speed = atmospheric_effects(energy)
+    return {
+        "mass_kg": np.broadcast_to(mass, np.shape(energy)),
+        "energy_j": energy,
+        "energy_mt": energy / JOULES_PER_MT,
+        "crater_km": crater_diameter_km(energy),
+        "seismic_mw": seismic_magnitude(energy),
+        "tsunami_m": tsunami_height_m(energy, tsunami_distance_km),
+        "temperature_rise_C": temp_rise,
+        "pressure_wave_hPa": pressure_wave,
+        "wind_speed_kmh": wind_speed,
+    }
@@ -0,0 +1,151 @@
+"""
+Vectorized two-body propagation for many asteroids at once.
+
+Works on plain NumPy arrays of the classical elements that
+orbit_from_elements() reads, so a whole catalog over a time grid is one
+Kepler solve over an (N, T) array instead of N poliastro Orbit objects.
+Positions agree with poliastro's Orbit.from_classical(...).propagate(...)
+to better than 1e-8 AU for elliptic orbits (see
+backend/benchmarks/bench_propagation.py).
+"""
+import numpy as np
+
+# Same Sun GM as poliastro.bodies.Sun.k
+GM_SUN = 1.32712442099e20  # m^3 / s^2
+AU_M = 1.495978707e11      # m
+DAY_S = 86400.0            # s
+
+# NeoWs orbital_data keys, in the order propagate_elements() takes them
+ELEMENT_KEYS = [
+    "semi_major_axis",           # AU
+    "eccentricity",
+    "inclination",               # deg
+    "ascending_node_longitude",  # deg
+    "perihelion_argument",       # deg
+    "mean_anomaly",              # deg
+    "epoch_osculation",          # JD
+]
+
+
+def _to_float(value, default=0.0):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def elements_from_orbital_data(records) -> dict:
+    """
+    Stack NeoWs `orbital_data` dicts into arrays keyed like ELEMENT_KEYS.
+    Missing or empty values become 0.0, as in orbit_from_elements().
+    """
+    return {
+        k: np.array([_to_float(r.get(k)) for r in records], dtype=np.float64)
+        for k in ELEMENT_KEYS
+    }
+
+
+def solve_kepler(M, e, tol: float = 1e-12, max_iter: int = 30):
+    """
+    Eccentric anomaly E from mean anomaly M (rad), any broadcastable shape.
+
+    Newton's method from Danby's starting guess; after each step only the
+    elements that have not converged yet are iterated again.
+    """
+    M, e = np.broadcast_arrays(np.asarray(M, dtype=np.float64), np.asarray(e, dtype=np.float64))
+    shape = M.shape
+    M = np.remainder(M.ravel() + np.pi, 2 * np.pi) - np.pi
+    e = e.ravel()
+
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    active = np.arange(M.size)
+    Ma, ea, Ea = M, e, E
+    for _ in range(max_iter):
+        dE = (Ea - ea * np.sin(Ea) - Ma) / (1 - ea * np.cos(Ea))
+        Ea = Ea - dE
+        E[active] = Ea
+        # NaN elements (non-elliptic orbits) drop out here too
+        keep = np.nonzero(np.abs(dE) > tol)[0]
+        if keep.size == 0:
+            break
+        active, Ma, ea, Ea = active[keep], Ma[keep], ea[keep], Ea[keep]
+    return E.reshape(shape)
+
+
+def true_anomaly(M, e):
+    """True anomaly (rad) from mean anomaly (rad) for elliptic orbits."""
+    E = solve_kepler(M, e)
+    return 2 * np.arctan2(np.sqrt(1 + e) * np.sin(E / 2), np.sqrt(1 - e) * np.cos(E / 2))
+
+
+def propagate_elements(a_au, ecc, inc_deg, raan_deg, argp_deg, mean_anom_deg, epoch_jd, times_jd):
+    """
+    Heliocentric positions (AU) of N objects at T epochs.
+
+    Element arguments are length-N arrays (or scalars); times_jd is a
+    length-T array of Julian dates. Returns an (N, T, 3) array. Objects
+    with e >= 1 or a <= 0 are not elliptic and come back as NaN.
+    """
+    a = np.atleast_1d(np.asarray(a_au, dtype=np.float64))[:, None]
+    e = np.atleast_1d(np.asarray(ecc, dtype=np.float64))[:, None]
+    i = np.radians(np.atleast_1d(inc_deg))[:, None]
+    raan = np.radians(np.atleast_1d(raan_deg))[:, None]
+    argp = np.radians(np.atleast_1d(argp_deg))[:, None]
+    M0 = np.radians(np.atleast_1d(mean_anom_deg))[:, None]
+    epoch = np.atleast_1d(np.asarray(epoch_jd, dtype=np.float64))[:, None]
+    t = np.atleast_1d(np.asarray(times_jd, dtype=np.float64))[None, :]
+
+    elliptic = (e < 1) & (a > 0)
+    a = np.where(elliptic, a, np.nan)
+    e = np.where(elliptic, e, np.nan)
+
+    # Mean motion (rad/day) and mean anomaly over the (N, T) grid
+    n = np.sqrt(GM_SUN / (a * AU_M) ** 3) * DAY_S
+    E = solve_kepler(M0 + n * (t - epoch), e)
+    return _positions(a, e, i, raan, argp, E)
+
+
+def _positions(a, e, i, raan, argp, E):
+    """(N, K, 3) positions from (N, 1) elements (angles in rad) and (N, K) eccentric anomalies."""
+    # Position in the perifocal frame
+    xp = a * (np.cos(E) - e)
+    yp = a * np.sqrt(1 - e * e) * np.sin(E)
+
+    # Rotate perifocal -> reference frame (P, Q unit vectors per object)
+    cO, sO = np.cos(raan), np.sin(raan)
+    cw, sw = np.cos(argp), np.sin(argp)
+    ci, si = np.cos(i), np.sin(i)
+    P = (cO * cw - sO * sw * ci, sO * cw + cO * sw * ci, sw * si)
+    Q = (-cO * sw - sO * cw * ci, -sO * sw + cO * cw * ci, cw * si)
+
+    out = np.empty(E.shape + (3,))
+    for k in range(3):
+        out[..., k] = xp * P[k] + yp * Q[k]
+    return out
+
+
+def orbit_track(a_au, ecc, inc_deg, raan_deg, argp_deg, samples: int = 360):
+    """
+    Positions (AU) at `samples` evenly spaced eccentric anomalies around
+    each orbit: the orbit's shape in space, independent of timing.
+    Returns an (N, samples, 3) array, NaN for non-elliptic orbits.
+    """
+    a = np.atleast_1d(np.asarray(a_au, dtype=np.float64))[:, None]
+    e = np.atleast_1d(np.asarray(ecc, dtype=np.float64))[:, None]
+    elliptic = (e < 1) & (a > 0)
+    a = np.where(elliptic, a, np.nan)
+    e = np.where(elliptic, e, np.nan)
+    E = np.broadcast_to(np.linspace(0, 2 * np.pi, samples, endpoint=False)[None, :], (a.shape[0], samples))
+    return _positions(
+        a, e,
+        np.radians(np.atleast_1d(inc_deg))[:, None],
+        np.radians(np.atleast_1d(raan_deg))[:, None],
+        np.radians(np.atleast_1d(argp_deg))[:, None],
+        E,
+    )
+
+
+def propagate_orbital_data(records, times_jd):
+    """propagate_elements() straight from a list of NeoWs orbital_data dicts."""
+    el = elements_from_orbital_data(records)
+    return propagate_elements(*(el[k] for k in ELEMENT_KEYS), times_jd)
@@ -0,0 +1,198 @@
+import json
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# On-disk bounds index for a folder of DEM tiles
+# -------------------------------
+INDEX_NAME = ".tile_index.json"
+INDEX_VERSION = 1
+# Written by backend.usgs: one verified entry (size, sha256, bounds...) per downloaded tile
+MANIFEST_NAME = ".manifest.json"
+
+_index_cache = {}  # str(tile_dir) -> (dir_mtime_ns, index)
+_index_lock = threading.Lock()
+_manifest_lock = threading.Lock()
+
+
+def _dir_signature(tile_dir: Path) -> list:
+    """(name, size, mtime_ns) for every GeoTIFF in the folder, sorted by name."""
+    sig = []
+    for tif in sorted(tile_dir.glob("*.tif")):
+        st = tif.stat()
+        sig.append([tif.name, st.st_size, st.st_mtime_ns])
+    return sig
+
+
+def _cell_key(lat: int, lon: int) -> str:
+    return f"{lat},{lon}"
+
+
+def _cells_for_bounds(left, bottom, right, top):
+    """Yield the 1x1 degree cells a bounding box touches (edges inclusive)."""
+    for lat in range(math.floor(bottom), math.floor(top) + 1):
+        for lon in range(math.floor(left), math.floor(right) + 1):
+            yield _cell_key(lat, lon)
+
+
+def read_manifest(tile_dir: Path) -> dict:
+    """name -> manifest entry for the tiles backend.usgs downloaded into tile_dir."""
+    try:
+        with open(tile_dir / MANIFEST_NAME) as fh:
+            return json.load(fh).get("tiles", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def update_manifest(tile_dir: Path, name: str, entry: dict):
+    """Record (or replace) one tile's entry; the file is rewritten atomically."""
+    path = tile_dir / MANIFEST_NAME
+    with _manifest_lock:
+        tiles = read_manifest(tile_dir)
+        tiles[name] = entry
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as fh:
+            json.dump({"version": 1, "tiles": tiles}, fh, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+
+def _header_bounds(path: Path):
+    import rasterio
+
+    with rasterio.open(path) as src:
+        b = src.bounds
+        return [b.left, b.bottom, b.right, b.top], list(src.res)
+
+
+def build_tile_index(tile_dir: Path) -> dict:
+    """
+    Bucket the bounds of every tile into 1x1 degree cells, so a point
+    lookup is a single dict access. Bounds come from the download manifest
+    when it still matches the file; other tiles have their header read.
+    """
+    manifest = read_manifest(tile_dir)
+    tiles = []
+    cells = {}
+    for name, size, mtime_ns in _dir_signature(tile_dir):
+        entry = manifest.get(name)
+        if entry and entry.get("size") == size and entry.get("mtime_ns") == mtime_ns and "bounds" in entry:
+            bounds, res = entry["bounds"], entry["res"]
+        else:
+            try:
+                bounds, res = _header_bounds(tile_dir / name)
+            except Exception as e:
+                # Half-written or corrupt tiles are skipped until they change
+                logger.warning(f"Could not index {name}: {e}")
+                continue
+
+        idx = len(tiles)
+        tiles.append({
+            "name": name,
+            "bounds": bounds,
+            "res": [res[0], res[1]],
+        })
+        for key in _cells_for_bounds(*bounds):
+            cells.setdefault(key, []).append(idx)
+
+    # Finest resolution first when tiles overlap
+    for key in cells:
+        cells[key].sort(key=lambda i: tiles[i]["res"][0])
+
+    return {
+        "version": INDEX_VERSION,
+        "signature": _dir_signature(tile_dir),
+        "tiles": tiles,
+        "cells": cells,
+    }
+
+
+def _write_index(tile_dir: Path, index: dict):
+    path = tile_dir / INDEX_NAME
+    tmp = path.with_suffix(".tmp")
+    try:
+        with open(tmp, "w") as fh:
+            json.dump(index, fh)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not save tile index: {e}")
+
+
+def _read_index(tile_dir: Path):
+    try:
+        with open(tile_dir / INDEX_NAME) as fh:
+            index = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    if index.get("signature") != _dir_signature(tile_dir):
+        return None
+    return index
+
+
+def load_tile_index(tile_dir: Path) -> dict:
+    """
+    Return the tile index for a folder.
+
+    Kept in memory while the folder's mtime is unchanged; otherwise
+    reloaded from INDEX_NAME, or rebuilt from tile headers if the
+    tiles on disk no longer match the stored signature.
+    """
+    key = str(tile_dir)
+    dir_mtime = tile_dir.stat().st_mtime_ns
+    with _index_lock:
+        cached = _index_cache.get(key)
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+
+        index = _read_index(tile_dir)
+        if index is None:
+            index = build_tile_index(tile_dir)
+            _write_index(tile_dir, index)
+
+        # Writing the index touches the folder, so stat it again
+        _index_cache[key] = (tile_dir.stat().st_mtime_ns, index)
+        return index
+
+
+def find_tiles(tile_dir: Path, lat: float, lon: float) -> list:
+    """Paths of the tiles whose bounds contain lat/lon (finest first)."""
+    index = load_tile_index(tile_dir)
+    key = _cell_key(math.floor(lat), math.floor(lon))
+    found = []
+    for i in index["cells"].get(key, []):
+        tile = index["tiles"][i]
+        left, bottom, right, top = tile["bounds"]
+        if left <= lon < right and bottom < lat <= top:
+            found.append(tile_dir / tile["name"])
+    return found
+
+
+def list_tiles(tile_dir: Path) -> list:
+    """Name and (left, bottom, right, top) bounds of every indexed tile."""
+    index = load_tile_index(tile_dir)
+    return [{"name": t["name"], "bounds": t["bounds"]} for t in index["tiles"]]
+
+
+def tiles_for_points(tile_dir: Path, lats, lons) -> list:
+    """
+    (path, bounds) of every tile touching the cells of the given points,
+    finest resolution first. Callers do the exact bounds test vectorized.
+    NaN/inf points touch no tile (their result stays nodata).
+    """
+    index = load_tile_index(tile_dir)
+    lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    finite = np.isfinite(lats) & np.isfinite(lons)
+    cells = zip(np.floor(lats[finite]).astype(int).tolist(), np.floor(lons[finite]).astype(int).tolist())
+    seen = set()
+    for lat, lon in set(cells):
+        seen.update(index["cells"].get(_cell_key(lat, lon), []))
+    ordered = sorted(seen, key=lambda i: index["tiles"][i]["res"][0])
+    return [(tile_dir / index["tiles"][i]["name"], index["tiles"][i]["bounds"]) for i in ordered]
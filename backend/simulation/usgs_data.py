@@ -1,43 +1,251 @@
-import rasterio
+import math
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 
+import numpy as np
+
+from .dem_store import open_dem_store, read_store_points, store_layer, store_level
+from .tile_index import find_tiles, tiles_for_points
+
 # -------------------------------
 # Paths to DEM folders
 # -------------------------------
-DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+# Overridable so benchmarks and tests can point at synthetic rasters
+DATA_DIR = Path(os.getenv("DEM_DATA_DIR", Path(__file__).resolve().parents[1] / "data"))
 
 USGS_DIR = DATA_DIR / "usgs"   # contains multiple .tif tiles
 SRTM_DEM = DATA_DIR / "srtm" / "srtm_sample.tif"
 GEBCO_DEM = DATA_DIR / "gebco" / "gebco_sample.tif"
 
+# Memory-mapped copy of the rasters above (built by backend.simulation.dem_store)
+DEM_STORE = Path(os.getenv("DEM_STORE_PATH", DATA_DIR / "dem_store.bin"))
+
+# Batch reads larger than this many pixels are split into chunks
+BATCH_WINDOW_MAX_PIXELS = 4_000_000
+BATCH_CHUNK = 1024
+
+
+# -------------------------------
+# Open-dataset cache
+# -------------------------------
+# Max number of GeoTIFF handles kept open per process (LRU eviction)
+RASTER_CACHE_SIZE = int(os.getenv("RASTER_CACHE_SIZE", "32"))
+
+_raster_cache = OrderedDict()  # (path, mtime_ns) -> _RasterHandle
+_raster_cache_lock = threading.Lock()
+_raster_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+class _RasterHandle:
+    """An open dataset, the lock serializing its reads, and how many readers hold it."""
+
+    def __init__(self, src):
+        self.src = src
+        self.lock = threading.Lock()
+        self.refs = 0
+        self.evicted = False
+
+
+def _close_if_unused(handle: _RasterHandle):
+    # Caller holds _raster_cache_lock; the last reader of an evicted handle closes it
+    if handle.evicted and handle.refs == 0:
+        handle.src.close()
+
+
+@contextmanager
+def _open_raster(filepath: Path):
+    """
+    Cached (dataset, lock) pair for a GeoTIFF, held for the with block.
+    Handles are keyed on path + mtime so a replaced file is reopened. An
+    evicted handle stays open until the readers still holding it finish.
+    """
+    key = (str(filepath), filepath.stat().st_mtime_ns)
+    with _raster_cache_lock:
+        handle = _raster_cache.get(key)
+        if handle is not None:
+            _raster_cache.move_to_end(key)
+            _raster_cache_stats["hits"] += 1
+        else:
+            _raster_cache_stats["misses"] += 1
+            # Imported here so the API starts without loading GDAL
+            import rasterio
+
+            handle = _RasterHandle(rasterio.open(filepath))
+            _raster_cache[key] = handle
+
+            while len(_raster_cache) > RASTER_CACHE_SIZE:
+                _, old = _raster_cache.popitem(last=False)
+                old.evicted = True
+                _close_if_unused(old)
+                _raster_cache_stats["evictions"] += 1
+        handle.refs += 1
+    try:
+        yield handle.src, handle.lock
+    finally:
+        with _raster_cache_lock:
+            handle.refs -= 1
+            _close_if_unused(handle)
+
+
+def raster_cache_info() -> dict:
+    """Hit/miss/eviction counters and current size of the raster handle cache."""
+    with _raster_cache_lock:
+        return {
+            **_raster_cache_stats,
+            "size": len(_raster_cache),
+            "maxsize": RASTER_CACHE_SIZE,
+        }
+
+
+def clear_raster_cache():
+    """Drop every cached raster handle (closed once unused) and reset the counters."""
+    with _raster_cache_lock:
+        while _raster_cache:
+            _, handle = _raster_cache.popitem()
+            handle.evicted = True
+            _close_if_unused(handle)
+        for k in _raster_cache_stats:
+            _raster_cache_stats[k] = 0
+
+
+def dem_version() -> str:
+    """
+    Cheap signature of the DEM files on disk (USGS folder mtime plus size and
+    mtime of the SRTM/GEBCO rasters and the DEM store). It changes whenever
+    a tile is added, removed or replaced, so caches keyed on it go stale.
+    """
+    parts = []
+    for path in (USGS_DIR, SRTM_DEM, GEBCO_DEM, DEM_STORE):
+        try:
+            st = path.stat()
+            parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append("-")
+    return "|".join(parts)
+
+
+def _store_lookup(filepath: Path):
+    """(store, layer name) if the DEM store holds an up-to-date copy of filepath"""
+    store = open_dem_store(DEM_STORE)
+    if store is None:
+        return None
+    try:
+        name = filepath.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        return None
+    if store_layer(store, name, filepath) is None:
+        return None
+    return store, name
+
 
 def _read_raster(filepath: Path, lat: float, lon: float) -> float:
     """Helper: read raster value at lat/lon from a single GeoTIFF"""
-    with rasterio.open(filepath) as src:
-        try:
-            row, col = src.index(lon, lat)
-            val = src.read(1)[row, col]
-            if val == src.nodata:
-                raise ValueError(f"No data at {lat},{lon} in {filepath.name}")
-            return float(val)
-        except IndexError:
+    hit = _store_lookup(filepath)
+    if hit is not None:
+        val = read_store_points(*hit, [lat], [lon])[0]
+        if math.isnan(val):
+            raise ValueError(f"No data at {lat},{lon} in {filepath.name}")
+        return float(val)
+
+    # rasterio datasets are not thread-safe, serialize reads per handle
+    with _open_raster(filepath) as (src, lock), lock:
+        row, col = src.index(lon, lat)
+        if not (0 <= row < src.height and 0 <= col < src.width):
             # Point is outside raster extent
             raise ValueError(f"Point outside raster {filepath.name}")
+        # Only decode the block holding this pixel, not the whole band
+        val = src.read(1, window=((row, row + 1), (col, col + 1)))[0, 0]
+        nodata = src.nodata
+
+    if (nodata is not None and val == nodata) or math.isnan(val):
+        raise ValueError(f"No data at {lat},{lon} in {filepath.name}")
+    return float(val)
+
+
+def _read_window_points(src, rows, cols) -> np.ndarray:
+    """Read the pixels at rows/cols with one window spanning all of them."""
+    r0, c0 = rows.min(), cols.min()
+    window = ((r0, rows.max() + 1), (c0, cols.max() + 1))
+    return src.read(1, window=window)[rows - r0, cols - c0]
+
+
+def _read_raster_many(filepath: Path, lats: np.ndarray, lons: np.ndarray, resolution_deg: float = None) -> np.ndarray:
+    """
+    Batch version of _read_raster: one windowed read for all points.
+    Points outside the raster or on nodata come back as NaN. With
+    resolution_deg the DEM store answers from its matching pyramid level.
+    """
+    hit = _store_lookup(filepath)
+    if hit is not None:
+        store, name = hit
+        level = store_level(store["header"]["layers"][name], resolution_deg)
+        return read_store_points(store, name, lats, lons, level)
+
+    out = np.full(lats.shape, np.nan)
+    with _open_raster(filepath) as (src, lock), lock:
+        # Vectorized equivalent of src.index(lon, lat)
+        cols_f, rows_f = ~src.transform * (lons, lats)
+        rows = np.floor(rows_f).astype(np.int64)
+        cols = np.floor(cols_f).astype(np.int64)
+        inside = (rows >= 0) & (rows < src.height) & (cols >= 0) & (cols < src.width)
+        if not inside.any():
+            return out
+        rows, cols = rows[inside], cols[inside]
+
+        span = (rows.max() - rows.min() + 1) * (cols.max() - cols.min() + 1)
+        if span <= BATCH_WINDOW_MAX_PIXELS:
+            vals = _read_window_points(src, rows, cols)
+        else:
+            # Widely spread points: one read per BATCH_CHUNK block instead
+            vals = np.empty(rows.shape, dtype=src.dtypes[0])
+            chunk_ids = (rows // BATCH_CHUNK) * (src.width // BATCH_CHUNK + 1) + cols // BATCH_CHUNK
+            for cid in np.unique(chunk_ids):
+                m = chunk_ids == cid
+                vals[m] = _read_window_points(src, rows[m], cols[m])
+        nodata = src.nodata
+
+    vals = vals.astype(np.float64)
+    if nodata is not None:
+        vals[vals == nodata] = np.nan
+    out[inside] = vals
+    return out
 
 
 def _search_usgs(lat: float, lon: float) -> float:
-    """Try all USGS tiles until one contains the point"""
+    """Look up the covering USGS tile(s) in the tile index and read the point"""
     if not USGS_DIR.exists():
         raise FileNotFoundError("USGS DEM directory not found.")
 
-    for tif in USGS_DIR.glob("*.tif"):
+    for tif in find_tiles(USGS_DIR, lat, lon):
         try:
             return _read_raster(tif, lat, lon)
-        except Exception:
+        except ValueError:
+            # nodata in an overlap strip, try the next covering tile
             continue
     raise FileNotFoundError(f"No USGS DEM covers location {lat}, {lon}")
 
 
+def _search_usgs_many(lats: np.ndarray, lons: np.ndarray, resolution_deg: float = None) -> np.ndarray:
+    """Batch USGS lookup: points are grouped by covering tile, one read per tile"""
+    out = np.full(lats.shape, np.nan)
+    if not USGS_DIR.exists() or lats.size == 0:
+        return out
+
+    pending = np.ones(lats.shape, dtype=bool)
+    for tif, (left, bottom, right, top) in tiles_for_points(USGS_DIR, lats, lons):
+        m = pending & (lons >= left) & (lons < right) & (lats > bottom) & (lats <= top)
+        if not m.any():
+            continue
+        vals = _read_raster_many(tif, lats[m], lons[m], resolution_deg)
+        out[m] = vals
+        # nodata in an overlap strip stays pending for the next tile
+        pending[m] = np.isnan(vals)
+    return out
+
+
 def get_elevation(lat: float, lon: float, source: str = "auto") -> float:
     """
     Return elevation (m) at a given lat/lon.
@@ -84,3 +292,90 @@ def get_elevation(lat: float, lon: float, source: str = "auto") -> float:
         return _read_raster(GEBCO_DEM, lat, lon)
     else:
         raise ValueError(f"Unknown DEM source: {source}")
+
+
+def get_elevations(lats, lons, source: str = "auto", resolution_deg: float = None) -> np.ndarray:
+    """
+    Vectorized get_elevation for many points.
+
+    Returns a float64 array of elevations (m) shaped like lats, with NaN
+    where no DEM covers the point. In "auto" mode the USGS -> SRTM -> GEBCO
+    fallback is applied per point. resolution_deg is the spacing the caller
+    samples at; when set, the DEM store reads a coarser level of detail.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if lats.shape != lons.shape:
+        raise ValueError("lats and lons must have the same shape")
+    shape = lats.shape
+    lats, lons = lats.ravel(), lons.ravel()
+    source = source.lower()
+
+    if source == "auto":
+        out = np.full(lats.shape, np.nan)
+
+        # USGS for points in the continental U.S.
+        conus = (lats >= 24) & (lats <= 50) & (lons >= -125) & (lons <= -66)
+        if conus.any():
+            out[conus] = _search_usgs_many(lats[conus], lons[conus], resolution_deg)
+
+        # SRTM then GEBCO for whatever is still missing
+        for dem in (SRTM_DEM, GEBCO_DEM):
+            missing = np.isnan(out)
+            if not missing.any():
+                break
+            if dem.exists():
+                out[missing] = _read_raster_many(dem, lats[missing], lons[missing], resolution_deg)
+
+    elif source == "usgs":
+        if not USGS_DIR.exists():
+            raise FileNotFoundError("USGS DEM directory not found.")
+        out = _search_usgs_many(lats, lons, resolution_deg)
+    elif source == "srtm":
+        out = _read_raster_many(SRTM_DEM, lats, lons, resolution_deg)
+    elif source == "gebco":
+        out = _read_raster_many(GEBCO_DEM, lats, lons, resolution_deg)
+    else:
+        raise ValueError(f"Unknown DEM source: {source}")
+
+    return out.reshape(shape)
+
+
+def get_elevation_grid(west: float, south: float, east: float, north: float,
+                       width: int, height: int, source: str = "gebco") -> np.ndarray:
+    """
+    Elevation (m) averaged onto a height x width lat/lon grid covering the
+    box (row 0 at the north edge), from one decimated read of the SRTM or
+    GEBCO raster. Boxes crossing the antimeridian are read in two parts.
+    NaN where the raster has no data.
+    """
+    paths = {"srtm": SRTM_DEM, "gebco": GEBCO_DEM}
+    source = source.lower()
+    if source not in paths:
+        raise ValueError(f"Gridded reads need a single raster source (srtm or gebco), not {source}")
+
+    if west < -180 or east > 180:
+        # Split at the antimeridian on a whole column; the part beyond it wraps by 360 degrees
+        dx = (east - west) / width
+        if east > 180:
+            split = int(round((180.0 - west) / dx))
+            boxes = [(west, 180.0, split), (-180.0, east - 360.0, width - split)]
+        else:
+            split = int(round((-180.0 - west) / dx))
+            boxes = [(west + 360.0, 180.0, split), (-180.0, east, width - split)]
+        parts = [
+            get_elevation_grid(w, south, e, north, n, height, source) if n > 0 else np.empty((height, 0))
+            for w, e, n in boxes
+        ]
+        return np.hstack(parts)
+
+    from rasterio.enums import Resampling
+    from rasterio.windows import from_bounds
+
+    with _open_raster(paths[source]) as (src, lock), lock:
+        window = from_bounds(west, south, east, north, transform=src.transform)
+        data = src.read(
+            1, window=window, out_shape=(height, width), boundless=True, masked=True,
+            resampling=Resampling.average,
+        )
+    return data.astype(np.float64).filled(np.nan)
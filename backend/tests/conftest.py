@@ -0,0 +1,18 @@
+import pytest
+
+from backend.benchmarks.fixtures import make_dem_fixtures
+
+
+@pytest.fixture(scope="session")
+def dem_dir(tmp_path_factory):
+    """Synthetic USGS/SRTM/GEBCO tree (see backend/benchmarks/fixtures.py)."""
+    return make_dem_fixtures(tmp_path_factory.mktemp("dem"))
+
+
+@pytest.fixture
+def gebco(dem_dir, monkeypatch):
+    """Point the elevation module at the synthetic GEBCO raster."""
+    from backend.simulation import usgs_data
+
+    monkeypatch.setattr(usgs_data, "GEBCO_DEM", dem_dir / "gebco" / "gebco_sample.tif")
+    return usgs_data.GEBCO_DEM
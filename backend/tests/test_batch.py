@@ -0,0 +1,57 @@
+import pytest
+
+from backend import batch
+
+NEO = {
+    "name": "(test)",
+    "diameter_km": 0.3,
+    "velocity_kps": 20.0,
+    "miss_distance_km": 1e6,
+    "approach_date": "2029-04-13",
+    "orbital_data": {
+        "semi_major_axis": "0.92", "eccentricity": "0.19", "inclination": "3.3",
+        "ascending_node_longitude": "204", "perihelion_argument": "126",
+        "mean_anomaly": "200", "epoch_osculation": "2460000.5",
+    },
+}
+
+
+def _scenarios(*sources):
+    return [batch.normalize_scenario({"asteroid_id": "1", "lat": 10, "lon": 20, "dem_source": s}) for s in sources]
+
+
+def test_orbit_columns_match_simulate_response():
+    from backend.app import OrbitalElements
+
+    orbit_columns = {c.split(".")[1] for c, _ in batch.RESULT_COLUMNS if c.startswith("orbit.")}
+    assert set(OrbitalElements.model_fields) <= orbit_columns
+    # The only batch-only orbit field is the propagation window
+    assert orbit_columns - set(OrbitalElements.model_fields) == {"propagate_days"}
+
+
+def test_true_anomaly_from_mean_anomaly():
+    (row,) = batch.run_chunk_task(_scenarios("gebco"), 0, {"1": NEO})
+    # M = 200 deg, e = 0.19 -> nu just past aphelion, reported in (-180, 180]
+    assert row["orbit"]["true_anomaly_deg"] == pytest.approx(-166.07, abs=0.01)
+
+
+def test_dem_read_error_marks_only_its_scenarios(monkeypatch):
+    def elevations(lats, lons, source):
+        if source == "srtm":
+            raise RuntimeError("corrupt tile")
+        return lats * 0 + 5.0
+
+    monkeypatch.setattr(batch, "get_elevations", elevations)
+    ok, bad = batch.run_chunk_task(_scenarios("gebco", "srtm"), 0, {"1": NEO})
+    assert "error" not in ok
+    assert ok["consequences"]["impact_location"]["elevation_m"] == 5.0
+    assert bad["scenario"] == 1
+    assert bad["error"] == "DEM read failed: corrupt tile"
+
+
+def test_stored_result_columns_match_simulate_response():
+    from backend.main import STORED_RESULT_COLUMNS
+
+    names = {c for c, _ in STORED_RESULT_COLUMNS}
+    assert {"result_key", "timestamp_utc", "orbit.true_anomaly_deg"} <= names
+    assert not names & batch.BATCH_ONLY_COLUMNS
@@ -0,0 +1,37 @@
+import numpy as np
+
+from backend.benchmarks.fixtures import SRTM_RES
+from backend.simulation import dem_store, usgs_data
+
+
+def _store(dem_dir, tmp_path, monkeypatch):
+    srtm = dem_dir / "srtm" / "srtm_sample.tif"
+    monkeypatch.setattr(usgs_data, "DATA_DIR", dem_dir)
+    monkeypatch.setattr(usgs_data, "SRTM_DEM", srtm)
+    monkeypatch.setattr(usgs_data, "DEM_STORE", tmp_path / "dem_store.bin")
+    dem_store.build_dem_store(usgs_data.DEM_STORE, levels=3, sources={"srtm/srtm_sample.tif": srtm})
+    return dem_store.open_dem_store(usgs_data.DEM_STORE)
+
+
+def test_level_follows_requested_resolution(dem_dir, tmp_path, monkeypatch):
+    layer = _store(dem_dir, tmp_path, monkeypatch)["header"]["layers"]["srtm/srtm_sample.tif"]
+    assert dem_store.store_level(layer, None) == 0
+    assert dem_store.store_level(layer, SRTM_RES * 1.5) == 0
+    assert dem_store.store_level(layer, SRTM_RES * 2) == 1
+    # Never past the coarsest level built
+    assert dem_store.store_level(layer, 10.0) == 2
+
+
+def test_coarse_reads_sample_the_source_grid(dem_dir, tmp_path, monkeypatch):
+    _store(dem_dir, tmp_path, monkeypatch)
+    rng = np.random.default_rng(1)
+    lats, lons = rng.uniform(21, 39, 200), rng.uniform(-99, -81, 200)
+    full = usgs_data.get_elevations(lats, lons, "srtm")
+    coarse = usgs_data.get_elevations(lats, lons, "srtm", resolution_deg=SRTM_RES * 4)
+
+    # Level 2 returns the source pixel at the corner of each 4x4 block
+    rows = np.floor((40.0 - lats) / SRTM_RES).astype(int) // 4 * 4
+    cols = np.floor((lons + 100.0) / SRTM_RES).astype(int) // 4 * 4
+    corner_lats, corner_lons = 40.0 - (rows + 0.5) * SRTM_RES, -100.0 + (cols + 0.5) * SRTM_RES
+    np.testing.assert_array_equal(coarse, usgs_data.get_elevations(corner_lats, corner_lons, "srtm"))
+    assert not np.array_equal(coarse, full)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from backend.benchmarks.fixtures import terrain
+from backend.simulation.usgs_data import get_elevation_grid
+
+
+def _expected(west, south, east, north, width, height):
+    lons = west + (np.arange(width) + 0.5) * (east - west) / width
+    lats = north - (np.arange(height) + 0.5) * (north - south) / height
+    lon_grid, lat_grid = np.meshgrid(lons, lats)
+    return terrain(lat_grid, lon_grid)
+
+
+@pytest.mark.parametrize("west, east", [(170.0, 190.0), (-190.0, -170.0)])
+def test_grid_across_antimeridian(gebco, west, east):
+    grid = get_elevation_grid(west, 10.0, east, 30.0, 20, 20)
+    assert grid.shape == (20, 20)
+    assert np.isfinite(grid).all()
+    # Synthetic terrain is smooth, so 1-degree cell averages stay close to the centre value
+    np.testing.assert_allclose(grid, _expected(west, 10.0, east, 30.0, 20, 20), atol=150)
+
+
+def test_both_antimeridian_directions_agree(gebco):
+    east_side = get_elevation_grid(170.0, 10.0, 190.0, 30.0, 20, 20)
+    west_side = get_elevation_grid(-190.0, 10.0, -170.0, 30.0, 20, 20)
+    np.testing.assert_array_equal(east_side, west_side)
+
+
+@pytest.mark.parametrize("lat, lon", [(20.8, -157.0), (-40.0, -179.9), (-40.0, 179.9)])
+def test_tsunami_near_antimeridian(gebco, tmp_path, monkeypatch, lat, lon):
+    from backend.simulation import tsunami
+
+    monkeypatch.setattr(tsunami, "TSUNAMI_CACHE_DIR", tmp_path)
+    tsunami.grid_memo.clear()
+    result = tsunami.simulate_tsunami(1e19, lat, lon, radius_km=2500, cell_deg=0.5)
+    assert result["travel_time_s"].shape == result["amplitude_m"].shape
@@ -0,0 +1,39 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend import executor as executor_module
+from backend.executor import ScenarioExecutor
+
+
+def crash_on_first_run(chunk, offset, marker):
+    """Kills its worker the first time it is called (marker is a file path)."""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return [(offset, item) for item in chunk]
+
+
+@pytest.fixture
+def pool_executor(monkeypatch):
+    # No warm imports: the workers only need this module
+    monkeypatch.setattr(executor_module, "WORKER_MODULES", [])
+    ex = ScenarioExecutor(max_workers=1, max_pending=2, start_method="spawn")
+    yield ex
+    ex.shutdown()
+
+
+def test_submit_after_a_worker_crash_gets_a_fresh_pool(pool_executor):
+    with pytest.raises(BrokenProcessPool):
+        pool_executor.submit(os._exit, 1).result()
+    assert pool_executor.submit(os.getpid).result() != os.getpid()
+    assert pool_executor.stats["restarts"] == 1
+    assert pool_executor.info()["pending"] == 0
+
+
+def test_map_chunks_retries_a_chunk_lost_to_a_crash(pool_executor, tmp_path):
+    marker = str(tmp_path / "crashed")
+    out = list(pool_executor.map_chunks(crash_on_first_run, [1, 2, 3], 2, marker))
+    assert out == [[(0, 1), (0, 2)], [(2, 3)]]
+    assert pool_executor.stats["restarts"] == 1
@@ -0,0 +1,18 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.simulation.hazard_map import UnknownScenario, load_scenario
+
+
+@pytest.mark.parametrize("key", ["..", "%2e%2e", "abc", "0" * 31 + "g", "A" * 32, "0" * 64])
+def test_malformed_hazard_keys_are_404(key):
+    client = TestClient(app)
+    assert client.get(f"/api/hazard/{key}").status_code == 404
+    assert client.get(f"/api/hazard/{key}/energy/0/0/0.png").status_code == 404
+
+
+def test_load_scenario_refuses_path_like_keys():
+    with pytest.raises(UnknownScenario):
+        load_scenario("../../etc")
+    assert load_scenario("../../etc", missing_ok=True) is None
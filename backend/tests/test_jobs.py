@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from backend import jobs
+from backend.jobs import JobQueue
+
+
+@pytest.fixture
+def queue_pair(tmp_path, monkeypatch):
+    # Workers=0: jobs stay queued, so ownership is all that changes
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_S", 3600)
+    return JobQueue(tmp_path, workers=0), JobQueue(tmp_path, workers=0)
+
+
+def test_live_owner_keeps_its_jobs(queue_pair):
+    first, second = queue_pair
+    job = first.submit("simulate", {"asteroid_id": "1"})
+    second.start()
+    assert second._load(job["id"])["owner"] == first.owner
+    assert job["id"] not in second._live
+
+
+def test_jobs_of_a_dead_owner_are_taken_over_once(queue_pair, monkeypatch):
+    first, second = queue_pair
+    job = first.submit("simulate", {"asteroid_id": "1"})
+    conn = first._conn()
+    with conn:
+        conn.execute("UPDATE jobs SET status = 'running', heartbeat = ?", (time.time() - jobs.JOB_LEASE_S - 1,))
+    second.start()
+    taken = second._load(job["id"])
+    assert taken["owner"] == second.owner
+    assert taken["status"] == "queued"
+    # The new owner's heartbeat is fresh, so a third process leaves it alone
+    third = JobQueue(first.jobs_dir, workers=0)
+    assert third._reclaim() == 0
+
+
+def test_cancel_from_another_process_reaches_the_owner(queue_pair):
+    first, second = queue_pair
+    job = first.submit("simulate", {"asteroid_id": "1"})
+    assert second.cancel(job["id"])
+    # The owner's worker picks the flag up from the store before running it
+    first._run(first._live[job["id"]])
+    assert first._load(job["id"])["status"] == "cancelled"
+
+
+def test_running_simulate_job_cannot_be_cancelled(queue_pair):
+    first, second = queue_pair
+    job = first.submit("simulate", {"asteroid_id": "1"})
+    conn = first._conn()
+    with conn:
+        conn.execute("UPDATE jobs SET status = 'running' WHERE id = ?", (job["id"],))
+    first._live.clear()
+    assert not second.cancel(job["id"])
+    assert not first.cancel(job["id"])
+
+
+def test_batch_grid_without_sites_is_empty():
+    assert jobs.batch_scenarios({"asteroids": ["1"], "sites": None, "dem_source": "auto"}) == []
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from backend.api.http_client import NasaClient, RateLimitExceeded
+from backend.api.neo_cache import NeoCache
+
+
+def _client(handler, **kw):
+    client = NasaClient("KEY", rate_per_hour=3600, backoff=0.01, **kw)
+    client._sync_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_429_past_max_wait_raises_rate_limit():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "3600"})
+
+    client = _client(handler, max_wait=5)
+    with pytest.raises(RateLimitExceeded) as info:
+        client.get_sync("https://api.nasa.gov/neo/rest/v1/neo/1")
+    assert info.value.retry_after == 3600
+    assert len(calls) == 1
+
+
+def test_short_retry_after_is_retried():
+    responses = [httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={"ok": 1})]
+    client = _client(lambda request: responses.pop(0))
+    assert client.get_sync("https://api.nasa.gov/x").json() == {"ok": 1}
+
+
+def test_async_get_reads_sqlite_off_the_event_loop(tmp_path):
+    disk_threads = []
+
+    async def afetch(key, etag, last_modified):
+        return {"id": key}, None, None
+
+    cache = NeoCache(fetch=None, afetch=afetch, db_path=tmp_path / "neo.sqlite")
+    disk_get = cache._disk_get
+
+    def recording_disk_get(key):
+        disk_threads.append(threading.current_thread())
+        return disk_get(key)
+
+    cache._disk_get = recording_disk_get
+
+    async def run():
+        first = await cache.aget("1")
+        cache._mem.clear()
+        second = await cache.aget("1")
+        return first, second, threading.current_thread()
+
+    first, second, main = asyncio.run(run())
+    assert first == second == {"id": "1"}
+    assert cache.stats["disk_hits"] == 1
+    assert disk_threads and main not in disk_threads
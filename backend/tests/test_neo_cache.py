@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+from backend.api.neo_cache import NeoCache
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+class BlockingFetch:
+    """Upstream stub: each call blocks until release is set, then returns the next version."""
+
+    def __init__(self):
+        self.calls = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, key, etag, last_modified):
+        self.calls.append((key, etag))
+        self.entered.set()
+        assert self.release.wait(5)
+        version = len(self.calls)
+        return {"id": key, "version": version}, f"etag-{version}", None
+
+
+def test_concurrent_misses_fetch_upstream_once(tmp_path):
+    fetch = BlockingFetch()
+    cache = NeoCache(fetch, db_path=tmp_path / "neo.sqlite")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("1"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    # Everyone but the fetching thread has joined the in-flight request
+    _wait_for(lambda: cache.stats["coalesced"] == 7)
+    fetch.release.set()
+    for t in threads:
+        t.join()
+
+    assert len(fetch.calls) == 1
+    assert results == [{"id": "1", "version": 1}] * 8
+    assert cache.stats["misses"] == 8
+    assert cache.stats["upstream_fetches"] == 1
+
+
+def test_concurrent_async_misses_fetch_upstream_once():
+    calls = []
+
+    async def afetch(key, etag, last_modified):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return {"id": key}, None, None
+
+    cache = NeoCache(fetch=None, afetch=afetch)
+
+    async def run():
+        return await asyncio.gather(*(cache.aget("1") for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"id": "1"}] * 5
+    assert calls == ["1"]
+    assert cache.stats["coalesced"] == 4
+
+
+def test_expired_entry_is_served_stale_while_refreshing(tmp_path):
+    fetch = BlockingFetch()
+    fetch.release.set()
+    cache = NeoCache(fetch, db_path=tmp_path / "neo.sqlite", ttl=60)
+    assert cache.get("1")["version"] == 1
+
+    # Past its TTL, inside the stale window
+    fetch.release.clear()
+    fetch.entered.clear()
+    cache._mem["1"]["fetched_at"] -= 61
+
+    assert cache.get("1")["version"] == 1
+    assert fetch.entered.wait(5)
+    assert cache.stats["stale_served"] == 1
+    # The refresh is still blocked upstream; readers keep getting the old copy
+    assert cache.get("1")["version"] == 1
+    assert len(fetch.calls) == 2
+    assert fetch.calls[1] == ("1", "etag-1")  # revalidated with the stored ETag
+
+    fetch.release.set()
+    _wait_for(lambda: not cache._inflight)
+    assert cache.get("1")["version"] == 2
+    # The refreshed copy also reached the shared disk tier
+    assert cache._disk_get("1")["value"]["version"] == 2
@@ -0,0 +1,76 @@
+import json
+import threading
+
+from backend.api import neo_catalog
+from backend.benchmarks.fixtures import NEO_FIXTURE
+
+
+def _catalog(tmp_path):
+    db = tmp_path / "catalog.sqlite"
+    conn = neo_catalog.connect(db)
+    with conn:
+        neo_catalog.upsert_neos(conn, [neo_catalog.normalize_neo(json.loads(NEO_FIXTURE.read_text()))])
+    conn.close()
+    return db
+
+
+def test_schema_is_set_up_once(tmp_path, monkeypatch):
+    db = _catalog(tmp_path)
+    scripts = []
+    real_connect = neo_catalog.sqlite3.connect
+
+    class Recording:
+        def __init__(self, conn):
+            self._conn = conn
+
+        def executescript(self, sql):
+            scripts.append(sql)
+            return self._conn.executescript(sql)
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    monkeypatch.setattr(neo_catalog.sqlite3, "connect", lambda *a, **kw: Recording(real_connect(*a, **kw)))
+    neo_catalog.connect(db).close()
+    assert scripts == []
+
+
+def test_readers_are_reused_per_thread(tmp_path):
+    db = _catalog(tmp_path)
+    neo_id = json.loads(NEO_FIXTURE.read_text())["id"]
+    assert neo_catalog.get_catalog_neo(neo_id, db)["id"] == neo_id
+    assert neo_catalog._reader(db) is neo_catalog._reader(db)
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(neo_catalog._reader(db)))
+    t.start()
+    t.join()
+    assert other[0] is not neo_catalog._reader(db)
+    assert neo_catalog.browse_catalog(db_path=db)["page"]["total_elements"] == 1
+
+
+def test_published_refresh_is_applied_on_lookup(tmp_path, monkeypatch):
+    db = _catalog(tmp_path)
+    neo_id = json.loads(NEO_FIXTURE.read_text())["id"]
+    cache = neo_catalog.neo_cache
+    dropped = []
+    monkeypatch.setattr(neo_catalog, "discard_memos", lambda hashes: dropped.append(set(hashes)))
+    monkeypatch.setattr(neo_catalog, "invalidate_ephemerides", lambda hashes, disk=True: dropped.append(disk))
+
+    assert neo_catalog.get_neo(neo_id, db)["id"] == neo_id
+    cache._mem[neo_id] = {"value": {"id": neo_id}}
+
+    # A refresh in another process publishes a new generation
+    conn = neo_catalog.connect(db)
+    with conn:
+        conn.execute(
+            "INSERT INTO invalidations (created_at, asteroid_ids, element_hashes) VALUES (?, ?, ?)",
+            (0.0, json.dumps([neo_id]), json.dumps(["oldhash"])),
+        )
+    conn.close()
+
+    assert neo_catalog.get_neo(neo_id, db)["id"] == neo_id
+    assert neo_id not in cache._mem
+    assert dropped == [{"oldhash"}, False]
+    # Applied once per process
+    assert neo_catalog.sync_invalidations(db) == 0
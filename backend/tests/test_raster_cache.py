@@ -0,0 +1,36 @@
+import threading
+
+import numpy as np
+
+from backend.simulation import usgs_data
+
+
+def test_eviction_does_not_close_handles_in_use(dem_dir, monkeypatch):
+    files = sorted((dem_dir / "usgs").glob("*.tif")) + [
+        dem_dir / "srtm" / "srtm_sample.tif", dem_dir / "gebco" / "gebco_sample.tif",
+    ]
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(28.0, 30.0, 50), rng.uniform(-90.0, -88.0, 50)
+    expected = {f: usgs_data._read_raster_many(f, lats, lons) for f in files}
+
+    # One handle for several files: nearly every open evicts one another thread holds
+    usgs_data.clear_raster_cache()
+    monkeypatch.setattr(usgs_data, "RASTER_CACHE_SIZE", 1)
+    errors = []
+
+    def reader(k):
+        try:
+            for i in range(25):
+                f = files[(k + i) % len(files)]
+                np.testing.assert_array_equal(usgs_data._read_raster_many(f, lats, lons), expected[f])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert usgs_data.raster_cache_info()["evictions"] > 0
+    usgs_data.clear_raster_cache()
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from backend.api import neo_catalog
+from backend.simulation import screening
+from backend.simulation.propagator import ELEMENT_KEYS, propagate_elements
+
+START_JD = 2451545.0  # J2000, where EARTH_ELEMENTS are exact
+DAYS = 365.0
+
+
+def _neo(neo_id: str, diameter_km: float, **elements) -> dict:
+    orbital = {k: str(v) for k, v in {**screening.EARTH_ELEMENTS, **elements}.items()}
+    return {
+        "id": neo_id,
+        "name": f"({neo_id})",
+        "estimated_diameter": {"kilometers": {"estimated_diameter_min": diameter_km,
+                                              "estimated_diameter_max": diameter_km}},
+        "is_potentially_hazardous_asteroid": False,
+        "orbital_data": orbital,
+        "close_approach_data": [],
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """
+    Two objects on Earth's orbit with a larger eccentricity: they pass
+    closest (about a * delta e) twice a year, at perihelion and aphelion.
+    The third never comes inside 1.6 AU of the Sun.
+    """
+    db = tmp_path / "catalog.sqlite"
+    neos = [
+        _neo("1", 0.1, eccentricity=0.04),                                  # ~0.023 AU
+        _neo("2", 1.0, eccentricity=0.055),                                 # ~0.038 AU
+        _neo("3", 1.0, semi_major_axis=2.0, eccentricity=0.2, mean_anomaly=0.0),
+    ]
+    conn = neo_catalog.connect(db)
+    with conn:
+        neo_catalog.upsert_neos(conn, [neo_catalog.normalize_neo(n) for n in neos])
+    conn.close()
+    return db, {n["id"]: n for n in neos}
+
+
+def _brute_force_min(neo: dict) -> float:
+    """Smallest geocentric distance (AU) over the window on a 5-minute grid."""
+    times = START_JD + np.arange(0.0, DAYS, 5 / 1440)
+    args = [np.array([float(neo["orbital_data"][k])]) for k in ELEMENT_KEYS]
+    pos = propagate_elements(*args, times)[0]
+    return float(np.linalg.norm(pos - screening.earth_positions(times), axis=1).min())
+
+
+def test_far_orbit_is_dropped_by_the_geometry_filter(catalog):
+    db, _ = catalog
+    out = screening.screen_catalog(START_JD, START_JD + DAYS, db_path=db)
+    assert out["counts"]["catalog"] == 3
+    assert out["counts"]["near_orbit"] == 2
+    assert {r["id"] for r in out["encounters"]} == {"1", "2"}
+    assert out["counts"]["encounters"] == len(out["encounters"])
+
+
+def test_ranking_by_distance_and_energy(catalog):
+    db, _ = catalog
+    by_distance = screening.screen_catalog(START_JD, START_JD + DAYS, db_path=db)["encounters"]
+    assert by_distance[0]["id"] == "1"
+    assert [r["rank"] for r in by_distance] == list(range(1, len(by_distance) + 1))
+    misses = [r["miss_distance_au"] for r in by_distance]
+    assert misses == sorted(misses)
+
+    by_energy = screening.screen_catalog(START_JD, START_JD + DAYS, rank_by="energy", db_path=db)["encounters"]
+    # Ten times the diameter outweighs the wider miss
+    assert by_energy[0]["id"] == "2"
+    energies = [r["energy_joules"] for r in by_energy]
+    assert energies == sorted(energies, reverse=True)
+
+
+def test_refined_miss_distance_matches_brute_force(catalog):
+    db, neos = catalog
+    out = screening.screen_catalog(START_JD, START_JD + DAYS, db_path=db)
+    for neo_id in ("1", "2"):
+        closest = min(r["miss_distance_au"] for r in out["encounters"] if r["id"] == neo_id)
+        assert closest == pytest.approx(_brute_force_min(neos[neo_id]), abs=1e-6)
+        assert closest < screening.DEFAULT_THRESHOLD_AU
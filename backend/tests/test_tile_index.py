@@ -0,0 +1,12 @@
+import numpy as np
+
+from backend.simulation.tile_index import tiles_for_points
+
+
+def test_non_finite_points_touch_no_tile(dem_dir):
+    usgs = dem_dir / "usgs"
+    lats = np.array([28.5, np.nan, 28.5, np.inf])
+    lons = np.array([-89.5, -89.5, np.nan, -89.5])
+    tiles = tiles_for_points(usgs, lats, lons)
+    assert [path.name for path, _ in tiles] == ["USGS_1_n29w090_synthetic.tif"]
+    assert tiles_for_points(usgs, lats[1:], lons[1:]) == []
@@ -0,0 +1,121 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from backend import usgs
+from backend.benchmarks.fixtures import _write_raster
+from backend.simulation.tile_index import read_manifest
+
+TILE_NAME = "USGS_1_n30w090_stub.tif"
+
+
+class TileHandler(BaseHTTPRequestHandler):
+    """Serves server.tile with Range support; server.drop_first cuts the first full transfer short."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        srv.requests.append(self.headers.get("Range"))
+        if not self.path.endswith(TILE_NAME):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        data, start = srv.tile, 0
+        rng = self.headers.get("Range")
+        if rng:
+            start = int(rng.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if srv.drop_first and not rng:
+            # Connection drops halfway through the first transfer
+            srv.drop_first = False
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(tmp_path):
+    src = tmp_path / "src" / TILE_NAME
+    _write_raster(src, -90.0, 30.0, 0.01, 64, 64, "float32")
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), TileHandler)
+    srv.tile, srv.drop_first, srv.requests = src.read_bytes(), False, []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    srv.url = f"http://127.0.0.1:{srv.server_address[1]}"
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(usgs.time, "sleep", lambda s: None)
+    with httpx.Client(timeout=10) as c:
+        yield c
+
+
+def _item(server, **extra):
+    return {
+        "downloadURL": f"{server.url}/tiles/{TILE_NAME}",
+        "sizeInBytes": len(server.tile),
+        "md5": hashlib.md5(server.tile).hexdigest(),
+        "lastUpdated": "2024-01-01",
+        **extra,
+    }
+
+
+def test_dropped_connection_resumes_with_range(server, client, tmp_path):
+    out = tmp_path / "tiles"
+    out.mkdir()
+    server.drop_first = True
+    result = usgs.download_tile(_item(server), out, client)
+
+    assert result["status"] == "resumed"
+    assert (out / TILE_NAME).read_bytes() == server.tile
+    assert server.requests[0] is None
+    assert server.requests[1] == f"bytes={len(server.tile) // 2}-"
+    assert not usgs._part_path(out / TILE_NAME).exists()
+
+
+def test_size_mismatch_is_rejected(server, client, tmp_path):
+    with pytest.raises(usgs.DownloadError, match="size"):
+        usgs.download_tile(_item(server, sizeInBytes=len(server.tile) + 1), tmp_path, client)
+    assert not (tmp_path / TILE_NAME).exists()
+    assert not usgs._part_path(tmp_path / TILE_NAME).exists()
+
+
+def test_md5_mismatch_is_rejected(server, client, tmp_path):
+    with pytest.raises(usgs.DownloadError, match="md5"):
+        usgs.download_tile(_item(server, md5="0" * 32), tmp_path, client)
+    assert not (tmp_path / TILE_NAME).exists()
+    assert read_manifest(tmp_path) == {}
+
+
+def test_404_is_reported_missing(server, client, tmp_path):
+    item = _item(server, downloadURL=f"{server.url}/tiles/USGS_1_gone.tif")
+    assert usgs.download_tile(item, tmp_path, client)["status"] == "missing"
+
+
+def test_rerun_skips_tiles_in_the_manifest(server, client, tmp_path):
+    item = _item(server)
+    assert usgs.download_tile(item, tmp_path, client)["status"] == "downloaded"
+    assert read_manifest(tmp_path)[TILE_NAME]["last_updated"] == "2024-01-01"
+
+    before = len(server.requests)
+    assert usgs.download_tile(item, tmp_path, client)["status"] == "up_to_date"
+    assert len(server.requests) == before
+    # A republished product is fetched again
+    assert usgs.download_tile(_item(server, lastUpdated="2025-01-01"), tmp_path, client)["status"] == "downloaded"
@@ -1,12 +1,41 @@
+# backend/usgs.py
+"""
+Download USGS NED 1 arc-second tiles into the elevation tile folder.
+
+    python -m backend.usgs [--bbox -85,24,-75,32] [--workers 4] [--out DIR] [--verify]
+
+Tiles are listed through The National Map products API and fetched by a
+bounded pool of threads. Each transfer goes to a hidden ".<name>.part"
+file and is resumed with an HTTP Range request after an interruption;
+only once the size (and checksum, when the API publishes one) check out
+and the file opens as a raster is it renamed into place. Finished tiles
+are recorded in the tile folder's manifest (see
+backend.simulation.tile_index), so reruns skip them and the tile index
+takes their bounds from the manifest instead of re-reading every header.
+
+TNM_PRODUCTS_URL overrides the products endpoint (e.g. a local stub).
+"""
+import argparse
+import hashlib
+import logging
 import os
-import requests
-from tqdm import tqdm
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
-RAW_FOLDER = "data/raw/usgs"
-OUT_FOLDER = "data/usgs"
-os.makedirs(RAW_FOLDER, exist_ok=True)
-os.makedirs(OUT_FOLDER, exist_ok=True)
+import httpx
+
+from backend.simulation.tile_index import load_tile_index, read_manifest, update_manifest
+from backend.simulation.usgs_data import USGS_DIR
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS_URL = os.getenv("TNM_PRODUCTS_URL", "https://tnmaccess.nationalmap.gov/api/v1/products")
+DOWNLOAD_WORKERS = int(os.getenv("USGS_DOWNLOAD_WORKERS", "4"))
+DOWNLOAD_RETRIES = 3
+CHUNK_BYTES = 1024 * 1024
+PAGE_SIZE = 100
 
 # Full U.S. bounding box (xmin, ymin, xmax, ymax)
 US_BBOX = [-85, 24, -75, 32]
@@ -14,55 +43,266 @@ US_BBOX = [-85, 24, -75, 32]
 DATASET = "National Elevation Dataset (NED) 1 arc-second"
 PROD_FORMAT = "GeoTIFF"
 
-def fetch_usgs_tiles(bbox):
-    url = (
-        "https://tnmaccess.nationalmap.gov/api/v1/products"
-        f"?datasets={DATASET}"
-        f"&bbox={','.join(map(str, bbox))}"
-        f"&prodFormats={PROD_FORMAT}&outputFormat=JSON"
-    )
-    resp = requests.get(url)
-    resp.raise_for_status()
-    data = resp.json()
-    return data.get("items", [])
-
-def download_tile(url, output_folder):
-    local_filename = os.path.join(output_folder, url.split("/")[-1])
-    if os.path.exists(local_filename):
-        print(f"Already exists: {local_filename}")
-        return local_filename
+
+class DownloadError(RuntimeError):
+    """A tile could not be downloaded or failed verification."""
+
+
+def fetch_usgs_tiles(bbox, client: httpx.Client = None, products_url: str = None) -> list:
+    """Every product item for the bounding box (the API pages its results)."""
+    own = client is None
+    client = client or httpx.Client(timeout=60, follow_redirects=True)
+    items = []
+    try:
+        while True:
+            resp = client.get(products_url or PRODUCTS_URL, params={
+                "datasets": DATASET,
+                "bbox": ",".join(map(str, bbox)),
+                "prodFormats": PROD_FORMAT,
+                "outputFormat": "JSON",
+                "max": PAGE_SIZE,
+                "offset": len(items),
+            })
+            resp.raise_for_status()
+            data = resp.json()
+            page = data.get("items", [])
+            items.extend(page)
+            if not page or len(items) >= int(data.get("total", 0)):
+                return items
+    finally:
+        if own:
+            client.close()
+
+
+# -------------------------
+# Single tile
+# -------------------------
+def _part_path(dest: Path) -> Path:
+    return dest.with_name(f".{dest.name}.part")
+
+
+def _hash_file(path: Path, h=None):
+    h = h or hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(CHUNK_BYTES), b""):
+            h.update(block)
+    return h
+
+
+def _raster_header(path: Path) -> dict:
+    """Bounds and resolution; raises DownloadError if the file is not a readable raster."""
+    import rasterio
+
     try:
-        resp = requests.get(url, stream=True, timeout=60)
+        with rasterio.open(path) as src:
+            b = src.bounds
+            return {"bounds": [b.left, b.bottom, b.right, b.top], "res": list(src.res)}
+    except Exception as e:
+        raise DownloadError(f"{path.name} is not a readable raster: {e}")
+
+
+def _expected_md5(item: dict):
+    # Not every product carries one; verify when it does
+    return item.get("md5")
+
+
+def _is_current(entry: dict, dest: Path, item: dict) -> bool:
+    """The manifest entry still describes dest and the product has not been republished."""
+    if not entry or not dest.exists():
+        return False
+    st = dest.stat()
+    if entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+        return False
+    return entry.get("last_updated") == item.get("lastUpdated")
+
+
+def _transfer(client: httpx.Client, url: str, part: Path):
+    """
+    Append the rest of url to part (Range request from its current size).
+    Returns (total size the server reported for the resource, whether
+    earlier bytes were kept rather than fetched again).
+    """
+    offset = part.stat().st_size if part.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with client.stream("GET", url, headers=headers) as resp:
+        if resp.status_code == 416:
+            # Nothing left to fetch: the part file already holds everything
+            total = resp.headers.get("content-range", "").rpartition("/")[2]
+            return (int(total) if total.isdigit() else offset), True
         if resp.status_code == 404:
-            print(f"⚠️ Skipping (404 Not Found): {url}")
-            return None
+            raise FileNotFoundError(url)
         resp.raise_for_status()
-        total_size = int(resp.headers.get('content-length', 0))
-        with open(local_filename, 'wb') as f:
-            for chunk in tqdm(resp.iter_content(chunk_size=1024*1024),
-                              total=total_size//(1024*1024) if total_size else None,
-                              unit='MB', desc=os.path.basename(local_filename)):
-                f.write(chunk)
-        print(f"✅ Downloaded: {local_filename}")
-        return local_filename
-    except Exception as e:
-        print(f"⚠️ Failed to download {url}: {e}")
-        return None
-
-def download_usgs_dem(bbox=US_BBOX):
-    items = fetch_usgs_tiles(bbox)
-    print(f"Found {len(items)} DEM tiles")
-    downloaded = []
-    for item in items:
-        print("Downloading:", item["title"])
-        tile = download_tile(item["downloadURL"], OUT_FOLDER)
-        if tile:
-            downloaded.append(tile)
-    print(f"✅ Finished downloading {len(downloaded)} tiles")
-    return downloaded
+
+        if resp.status_code == 206:
+            total = resp.headers.get("content-range", "").rpartition("/")[2]
+            total = int(total) if total.isdigit() else None
+            mode = "ab"
+        else:
+            # Server ignored the Range header: start over
+            length = resp.headers.get("content-length")
+            total = int(length) if length else None
+            mode = "wb"
+
+        with open(part, mode) as fh:
+            # Unsized chunks: bytes are written as they arrive, so a drop loses none of them
+            for chunk in resp.iter_bytes():
+                fh.write(chunk)
+    return (total if total is not None else part.stat().st_size), mode == "ab"
+
+
+def download_tile(item: dict, out_dir: Path, client: httpx.Client, retries: int = DOWNLOAD_RETRIES,
+                  manifest: dict = None) -> dict:
+    """
+    Download one product item into out_dir. Returns {"name", "status", "bytes"}
+    with status up_to_date, downloaded, resumed, adopted or missing; raises
+    DownloadError when the file keeps failing verification or transfer.
+    """
+    url = item["downloadURL"]
+    name = url.rsplit("/", 1)[-1].split("?")[0]
+    dest = out_dir / name
+    part = _part_path(dest)
+    entry = (manifest if manifest is not None else read_manifest(out_dir)).get(name)
+
+    if _is_current(entry, dest, item):
+        return {"name": name, "status": "up_to_date", "bytes": 0}
+    expected_size = int(item["sizeInBytes"]) if item.get("sizeInBytes") else None
+    status = None
+    if dest.exists() and not part.exists():
+        if entry is not None:
+            # Recorded but republished or changed on disk: fetch it again
+            dest.unlink()
+        elif expected_size == dest.stat().st_size:
+            status = "adopted"  # complete file from an older run, just not recorded
+        else:
+            # Unrecorded and short: an old half-written download, continue it
+            os.replace(dest, part)
+
+    resumed = False
+    if status is None:
+        for attempt in range(1, retries + 1):
+            try:
+                # Resumed if any attempt continued from bytes already on disk
+                total, kept = _transfer(client, url, part)
+                resumed = resumed or kept
+                break
+            except FileNotFoundError:
+                part.unlink(missing_ok=True)
+                logger.warning(f"Skipping (404 Not Found): {url}")
+                return {"name": name, "status": "missing", "bytes": 0}
+            except (httpx.HTTPError, OSError) as e:
+                if attempt == retries:
+                    raise DownloadError(f"{name}: {e}")
+                # Keep what arrived; the next attempt resumes from there
+                logger.warning(f"{name}: attempt {attempt} failed ({e}), retrying")
+                time.sleep(min(2 ** attempt, 30))
+
+        size = part.stat().st_size
+        if size != total or (expected_size and size != expected_size):
+            part.unlink(missing_ok=True)
+            raise DownloadError(f"{name}: size {size} does not match expected {expected_size or total}")
+        src = part
+    else:
+        src = dest
+
+    digest = _hash_file(src).hexdigest()
+    md5 = _expected_md5(item)
+    if md5 and _hash_file(src, hashlib.md5()).hexdigest() != md5.lower():
+        src.unlink(missing_ok=True)
+        raise DownloadError(f"{name}: md5 mismatch")
+    try:
+        header = _raster_header(src)
+    except DownloadError:
+        src.unlink(missing_ok=True)
+        raise
+    if src is part:
+        os.replace(part, dest)
+
+    update_manifest(out_dir, name, {
+        "url": url,
+        "size": dest.stat().st_size,
+        "mtime_ns": dest.stat().st_mtime_ns,
+        "sha256": digest,
+        "last_updated": item.get("lastUpdated"),
+        "downloaded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **header,
+    })
+    if status is None:
+        status = "resumed" if resumed else "downloaded"
+    return {"name": name, "status": status, "bytes": dest.stat().st_size}
+
+
+def verify_tiles(out_dir: Path = USGS_DIR) -> list:
+    """Names of manifest tiles whose file is missing or no longer matches its sha256."""
+    bad = []
+    for name, entry in read_manifest(out_dir).items():
+        path = out_dir / name
+        if not path.exists() or _hash_file(path).hexdigest() != entry.get("sha256"):
+            bad.append(name)
+    return bad
+
+
+# -------------------------
+# Whole area
+# -------------------------
+def download_usgs_dem(bbox=US_BBOX, out_dir: Path = USGS_DIR, workers: int = DOWNLOAD_WORKERS,
+                      products_url: str = None) -> list:
+    """
+    Fetch every tile for bbox with at most `workers` concurrent transfers,
+    then refresh the tile index. Returns one result dict per product item
+    (failures carry status "failed" and an "error").
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    limits = httpx.Limits(max_connections=max(1, workers))
+    with httpx.Client(timeout=httpx.Timeout(60, read=300), follow_redirects=True, limits=limits) as client:
+        items = fetch_usgs_tiles(bbox, client, products_url)
+        logger.info(f"Found {len(items)} DEM tiles")
+        manifest = read_manifest(out_dir)
+
+        def one(item):
+            try:
+                result = download_tile(item, out_dir, client, manifest=manifest)
+            except DownloadError as e:
+                logger.warning(str(e))
+                return {"name": item.get("title"), "status": "failed", "bytes": 0, "error": str(e)}
+            logger.info(f"{result['name']}: {result['status']}")
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="usgs-dl") as pool:
+            results = list(pool.map(one, items))
+
+    # Index the new tiles now rather than on the first elevation request
+    if any(r["status"] in ("downloaded", "resumed", "adopted") for r in results):
+        load_tile_index(out_dir)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bbox", default=",".join(map(str, US_BBOX)), help="xmin,ymin,xmax,ymax")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS)
+    parser.add_argument("--out", type=Path, default=USGS_DIR)
+    parser.add_argument("--verify", action="store_true", help="Re-hash recorded tiles instead of downloading")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.verify:
+        bad = verify_tiles(args.out)
+        for name in bad:
+            print(f"⚠️ {name} is missing or corrupt")
+        if not bad:
+            print(f"✅ {len(read_manifest(args.out))} tiles verified")
+        return 1 if bad else 0
+
+    bbox = [float(v) for v in args.bbox.split(",")]
+    results = download_usgs_dem(bbox, args.out, args.workers)
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print("✅ Finished: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())))
+    return 1 if counts.get("failed") else 0
+
 
 if __name__ == "__main__":
-    tiles = download_usgs_dem()
-    print("Downloaded tiles:")
-    for t in tiles:
-        print("-", t)
\ No newline at end of file
+    raise SystemExit(main())
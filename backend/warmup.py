@@ -0,0 +1,86 @@
+# backend/warmup.py
+"""
+Background warm-up of the heavy scientific stack.
+
+The API imports nothing heavier than numpy at start-up, so /health answers
+right away. start_warmup() then imports GDAL/rasterio and astropy/poliastro
+on a daemon thread; /ready reports how far it got. With WARMUP=0 nothing
+is imported ahead of time and the first /ready call does the imports itself.
+"""
+import importlib
+import os
+import threading
+import time
+
+# In the order the simulation path first needs them
+WARM_MODULES = [
+    "rasterio",
+    "astropy.units",
+    "astropy.time",
+    "poliastro.bodies",
+    "poliastro.twobody",
+]
+
+_state = {name: "pending" for name in WARM_MODULES}
+_timings = {}
+_lock = threading.Lock()
+_started = {"at": None, "done": None}
+# Serialises the in-request warm-up used when WARMUP=0
+_inline_lock = threading.Lock()
+
+
+def _enabled() -> bool:
+    return os.getenv("WARMUP", "1") != "0"
+
+
+def _warm():
+    for name in WARM_MODULES:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            status = "loaded"
+        except Exception as e:
+            status = f"failed: {e}"
+        with _lock:
+            _state[name] = status
+            _timings[name] = round(time.perf_counter() - t0, 3)
+    with _lock:
+        _started["done"] = time.perf_counter()
+
+
+def start_warmup():
+    """Start the warm-up thread once (disabled with WARMUP=0)."""
+    if not _enabled():
+        return
+    if _claim():
+        threading.Thread(target=_warm, name="warmup", daemon=True).start()
+
+
+def _claim() -> bool:
+    with _lock:
+        if _started["at"] is not None:
+            return False
+        _started["at"] = time.perf_counter()
+        return True
+
+
+def warmup_status() -> dict:
+    if not _enabled():
+        # No background thread: import on the first call, so /ready still turns ready
+        with _inline_lock:
+            if _claim():
+                _warm()
+    with _lock:
+        # A failed import means this worker cannot run simulations
+        ready = all(s == "loaded" for s in _state.values())
+        took = None
+        if _started["done"] is not None:
+            took = round(_started["done"] - _started["at"], 3)
+        return {
+            "ready": ready,
+            "started": _started["at"] is not None,
+            "finished": _started["done"] is not None,
+            "warmup_seconds": took,
+            "modules": dict(_state),
+            "module_seconds": dict(_timings),
+        }